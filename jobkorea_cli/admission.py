@@ -0,0 +1,165 @@
+# admission.py — 모델별 TPM/RPM 예산 기반 LLM 요청 입장 제어
+from __future__ import annotations
+import os, re, time, asyncio, random, threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional
+
+LLM_TPM = int(os.getenv("LLM_TPM", "200000"))            # 모델별 분당 토큰 한도(기본값)
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))               # 모델별 분당 요청 한도(기본값)
+LLM_EST_COMPLETION_TOKENS = int(os.getenv("LLM_EST_COMPLETION_TOKENS", "300"))  # 응답 토큰 추정치
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4")) # 429 재시도 횟수
+
+# 모델별 한도. 없으면 LLM_TPM/LLM_RPM.
+MODEL_LIMITS: Dict[str, Dict[str, int]] = {
+    "gpt-4o-mini": {"tpm": LLM_TPM, "rpm": LLM_RPM},
+}
+
+# ---------- 토큰 추정 ----------
+_encoder = None
+def _get_encoder():
+    """tiktoken이 있으면 사용, 없으면 False(문자 수 기반 근사)."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoder = False
+    return _encoder
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+def _count_text(s: str) -> int:
+    enc = _get_encoder()
+    if enc:
+        return len(enc.encode(s))
+    # 근사: 영문/기호는 4자당 1토큰, 한글 등 비ASCII는 글자당 1토큰
+    non_ascii = len(_NON_ASCII.findall(s))
+    return non_ascii + (len(s) - non_ascii + 3) // 4
+
+def estimate_tokens(messages: List[Dict[str, str]], completion_tokens: int = LLM_EST_COMPLETION_TOKENS) -> int:
+    """요청 전 추정치 = 메시지 토큰(+메시지당 오버헤드 4) + 응답 토큰 추정."""
+    return sum(_count_text(m.get("content") or "") + 4 for m in messages) + 3 + completion_tokens
+
+def retry_after_sec(headers) -> Optional[float]:
+    """retry-after-ms(OpenAI) → retry-after(초 또는 HTTP-date) 순으로 해석. 없으면 None."""
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try: return max(0.0, float(ms) / 1000)
+        except ValueError: pass
+    ra = headers.get("retry-after")
+    if ra:
+        try:
+            return max(0.0, float(ra))
+        except ValueError:
+            try: return max(0.0, parsedate_to_datetime(ra).timestamp() - time.time())
+            except Exception: pass
+    return None
+
+def backoff_sec(attempt: int, base: float = 1.0, cap: float = 20.0) -> float:
+    return min(cap, base * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+# ---------- 입장 제어 ----------
+class AdmissionController:
+    """
+    모델 1개의 60초 슬라이딩 윈도우 TPM/RPM 예산.
+    - acquire(est): 예산 안에서 들어갈 수 있는 가장 이른 시각을 락 안에서 '예약'하고, 락 밖에서 그때까지 대기.
+      예약 시각은 단조 증가 → 대기자는 도착 순서(FIFO)대로 풀림. (TokenBucket.reserve와 같은 방식)
+    - settle(ticket, actual): 응답의 usage.total_tokens로 추정치를 정정(없으면 실패로 보고 토큰 0).
+    - pause(sec): 429의 Retry-After 동안 새 입장을 막음.
+    threading.Lock을 쓰므로 요청마다 다른 이벤트 루프(Django asyncio.run)에서 호출해도 안전.
+    """
+    def __init__(self, model: str, tpm: int = LLM_TPM, rpm: int = LLM_RPM, window: float = 60.0):
+        self.model = model
+        self.tpm, self.rpm, self.window = max(1, tpm), max(1, rpm), window
+        self.lock = threading.Lock()
+        self._entries: deque = deque()   # [ts, tokens] (ts는 예약된 입장 시각, 오름차순)
+        self._tokens = 0
+        self._pause_until = 0.0
+        self.waiting = 0
+        self.counters = {"admitted": 0, "queued": 0, "wait_ms_total": 0, "max_wait_ms": 0,
+                         "est_tokens": 0, "actual_tokens": 0, "retries_429": 0}
+
+    def _prune(self, now: float):
+        while self._entries and self._entries[0][0] <= now - self.window:
+            self._tokens -= self._entries.popleft()[1]
+
+    def reserve(self, est: int) -> tuple[list, float]:
+        """(ticket, 기다려야 할 초)."""
+        est = min(est, self.tpm)   # 한도보다 큰 요청도 언젠가는 들어가도록
+        with self.lock:
+            now = time.monotonic()
+            self._prune(now)
+            t = max(now, self._pause_until, self._entries[-1][0] if self._entries else now)
+            n, tokens = len(self._entries), self._tokens
+            for ts, tk in self._entries:   # 오래된 것부터 빠진다고 보고 들어갈 자리를 찾음
+                if ts > t - self.window and (n >= self.rpm or tokens + est > self.tpm):
+                    t = ts + self.window
+                    n -= 1; tokens -= tk
+                elif ts <= t - self.window:
+                    n -= 1; tokens -= tk
+                else:
+                    break
+            ticket = [t, est]
+            self._entries.append(ticket)
+            self._tokens += est
+            wait = t - now
+            self.counters["admitted"] += 1
+            self.counters["est_tokens"] += est
+            if wait > 0:
+                self.counters["queued"] += 1
+                self.counters["wait_ms_total"] += int(wait * 1000)
+                self.counters["max_wait_ms"] = max(self.counters["max_wait_ms"], int(wait * 1000))
+            return ticket, wait
+
+    async def acquire(self, est: int) -> list:
+        ticket, wait = self.reserve(est)
+        if wait > 0:
+            with self.lock:
+                self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+        return ticket
+
+    def settle(self, ticket: list, actual: Optional[int]):
+        with self.lock:
+            actual = int(actual or 0)
+            self._prune(time.monotonic())
+            if self._entries and ticket[0] >= self._entries[0][0]:   # 아직 윈도우 안에 있을 때만 합계 정정
+                self._tokens += actual - ticket[1]
+            ticket[1] = actual
+            self.counters["actual_tokens"] += actual
+
+    def pause(self, sec: float):
+        """429 응답 후 sec초 동안 새 입장을 막음."""
+        with self.lock:
+            self._pause_until = max(self._pause_until, time.monotonic() + sec)
+            self.counters["retries_429"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            self._prune(time.monotonic())
+            out = {"tpm": self.tpm, "rpm": self.rpm, "window_tokens": self._tokens,
+                   "window_requests": len(self._entries), "queue_depth": self.waiting}
+            out.update(self.counters)
+        return out
+
+_controllers: Dict[str, AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+def get_admission(model: str) -> AdmissionController:
+    with _controllers_lock:
+        ac = _controllers.get(model)
+        if ac is None:
+            conf = MODEL_LIMITS.get(model, {"tpm": LLM_TPM, "rpm": LLM_RPM})
+            ac = _controllers[model] = AdmissionController(model, **conf)
+    return ac
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    with _controllers_lock:
+        items = list(_controllers.items())
+    return {k: v.snapshot() for k, v in items}
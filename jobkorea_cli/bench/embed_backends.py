@@ -0,0 +1,84 @@
+# bench/embed_backends.py — 임베딩 백엔드 비교: PyTorch(SentenceTransformer) vs ONNX Runtime(int8/fp16/fp32)
+#   python -m jobkorea_cli.bench.embed_backends [--backends local,onnx-int8,onnx-fp16] [--n 512] [--batch 32]
+# 백엔드마다 별도 프로세스에서 측정(RSS가 섞이지 않게): 로딩 시간, 처리량(texts/s), 최대 RSS.
+# 코사인 일치도: 같은 입력에 대한 local 벡터와의 코사인(평균/p5/최소)과 top-1 최근접 일치율.
+# ONNX 모델은 미리 `python -m jobkorea_cli.onnx_embed export --quant int8` 로 만들어 둘 것.
+from __future__ import annotations
+import os, sys, json, time, argparse, pathlib, resource, subprocess, tempfile
+from typing import List
+
+import numpy as np
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+MODEL_ID = os.getenv("EMBED_MODEL", "intfloat/multilingual-e5-base").strip()
+
+def _texts(n: int) -> List[str]:
+    """fixture 스펙 문장(query:) + 그걸 이어 붙인 긴 공고 비슷한 문장(passage:)을 n개까지 반복."""
+    base = []
+    for f in ("specs.jsonl", "spec_rules.jsonl"):
+        p = FIXTURES / f
+        if p.exists():
+            base += [json.loads(l)["text"] for l in p.read_text(encoding="utf-8").splitlines() if l.strip()]
+    texts = [f"query: {t}" for t in base] + [f"passage: {' '.join(base[i:i + 6])}" for i in range(len(base))]
+    return [texts[i % len(texts)] + ("" if i < len(texts) else f" #{i}") for i in range(n)]
+
+def _load(backend: str):
+    if backend == "local":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(MODEL_ID)
+    from ..onnx_embed import OnnxEncoder
+    return OnnxEncoder(MODEL_ID, quant=backend.split("-", 1)[1])
+
+def child(backend: str, n: int, batch: int, out: str):
+    t0 = time.perf_counter()
+    model = _load(backend)
+    load_s = time.perf_counter() - t0
+    texts = _texts(n)
+    model.encode(texts[:batch], batch_size=batch, normalize_embeddings=True, show_progress_bar=False)   # 워밍업
+    t0 = time.perf_counter()
+    vecs = model.encode(texts, batch_size=batch, normalize_embeddings=True, show_progress_bar=False)
+    enc_s = time.perf_counter() - t0
+    np.save(out, np.asarray(vecs, dtype="float32"))
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux: KB
+    print(json.dumps({"backend": backend, "load_s": round(load_s, 2), "texts_per_s": round(n / enc_s, 1),
+                      "ms_per_text": round(enc_s * 1000 / n, 2), "max_rss_mb": round(rss_mb, 1)}))
+
+def _agreement(ref: np.ndarray, vecs: np.ndarray) -> dict:
+    cos = (ref * vecs).sum(axis=1)
+    top1 = float(np.mean((ref @ ref.T).argsort(axis=1)[:, -2] == (vecs @ vecs.T).argsort(axis=1)[:, -2]))
+    return {"cos_mean": round(float(cos.mean()), 5), "cos_p5": round(float(np.percentile(cos, 5)), 5),
+            "cos_min": round(float(cos.min()), 5), "nn_top1_agree": round(top1, 3)}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backends", default="local,onnx-int8,onnx-fp16")
+    ap.add_argument("--n", type=int, default=512)
+    ap.add_argument("--batch", type=int, default=32)
+    ap.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--out", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return child(args.child, args.n, args.batch, args.out)
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    tmp = pathlib.Path(tempfile.mkdtemp(prefix="embed_bench_"))
+    rows, vecs = [], {}
+    for b in backends:
+        out = tmp / f"{b}.npy"
+        r = subprocess.run([sys.executable, "-m", "jobkorea_cli.bench.embed_backends", "--child", b,
+                            "--n", str(args.n), "--batch", str(args.batch), "--out", str(out)],
+                           capture_output=True, text=True)
+        if r.returncode != 0:
+            print(f"{b:<10} 실패: {(r.stderr.strip().splitlines() or ['?'])[-1]}")
+            continue
+        rows.append(json.loads(r.stdout.strip().splitlines()[-1]))
+        vecs[b] = np.load(out)
+    ref = vecs.get("local")
+    for row in rows:
+        b = row["backend"]
+        if ref is not None and b != "local":
+            row.update(_agreement(ref, vecs[b]))
+        print(json.dumps(row, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
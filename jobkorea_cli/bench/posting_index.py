@@ -0,0 +1,67 @@
+# bench/posting_index.py — flat vs ivf 공고 인덱스: 구축/검색 지연, recall@k, 메모리
+#   python -m jobkorea_cli.bench.posting_index [--sizes 10000,100000,1000000] [--dim 768] [--queries 200] [--k 10]
+# 뭉친 무작위 정규화 벡터(e5-base 차원 768) 사용. 1M × 768 float32는 약 3GB이므로 메모리를 확인하고 실행.
+# recall@k는 같은 질의에 대한 flat(정확) 결과 대비 ivf 결과의 겹침 비율.
+from __future__ import annotations
+import os, time, argparse, statistics, tempfile
+from typing import List
+
+import numpy as np
+import faiss
+
+from ..posting_index import PostingIndex
+
+def _unit(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    x = rng.standard_normal((n, dim), dtype="float32")
+    faiss.normalize_L2(x)
+    return x
+
+def _pct(xs: List[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * p))]
+
+def bench(n: int, dim: int, queries: int, k: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # 실제 공고 임베딩처럼 직무별로 뭉친 분포: 중심 n/100개 + 잡음
+    centers = _unit(rng, max(1, n // 100), dim)
+    data = centers[rng.integers(0, len(centers), n)] + 0.6 * _unit(rng, n, dim)
+    faiss.normalize_L2(data)
+    # 질의는 데이터 근처(실제 스펙 질의처럼 가까운 공고가 있는 상황)
+    qs = data[rng.integers(0, n, queries)] + 0.3 * _unit(rng, queries, dim)
+    faiss.normalize_L2(qs)
+    gi = [str(10_000_000 + i) for i in range(n)]
+    truth = None
+    for kind in ("flat", "ivf"):
+        idx = PostingIndex(dim, kind)
+        idx.path = os.path.join(tempfile.mkdtemp(), "bench.faiss")   # delete의 저장 예약이 실제 인덱스를 덮지 않도록
+        t0 = time.perf_counter()
+        idx.add(gi, data)
+        build_s = time.perf_counter() - t0
+        lat, got = [], []
+        for q in qs:
+            t0 = time.perf_counter()
+            got.append({g for g, _ in idx.search(q, k)})
+            lat.append((time.perf_counter() - t0) * 1000)
+        if kind == "flat":
+            truth = got
+        recall = statistics.fmean(len(a & b) / k for a, b in zip(got, truth))
+        mem_mb = faiss.serialize_index(idx.index).nbytes / 2**20
+        t0 = time.perf_counter()
+        idx.delete(gi[:100])
+        del_ms = (time.perf_counter() - t0) * 1000
+        print(f"{n:>9,} {kind:<5} build={build_s:7.2f}s  search p50={_pct(lat, 0.5):7.3f}ms p95={_pct(lat, 0.95):7.3f}ms  "
+              f"recall@{k}={recall:.3f}  mem={mem_mb:8.1f}MB  delete100={del_ms:7.1f}ms  {idx.stats()}")
+        del idx
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10000,100000,1000000")
+    ap.add_argument("--dim", type=int, default=768)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    args = ap.parse_args()
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        bench(n, args.dim, args.queries, args.k)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# bench/ranking.py — 하이브리드 랭킹 지연: 필터 + BM25 색인 구축 + 점수 계산(+ 임베딩 점수 결합)
+#   python -m jobkorea_cli.bench.ranking [--sizes 100,1000,5000] [--repeat 20]
+# 직무/기술/조건 문구를 섞은 합성 공고(본문 약 300자)와 무작위 코사인 점수 사용. 임베딩 모델은 필요 없음.
+from __future__ import annotations
+import time, argparse, statistics
+from typing import List
+
+import numpy as np
+
+from ..models import Spec, Career, PostingDoc
+from ..ranking import rank, BM25Index, RANK_FILTER
+
+_ROLES  = ["백엔드 개발자", "프론트엔드 개발자", "데이터 분석가", "마케팅 담당자", "회계 담당자", "영업 관리", "디자이너"]
+_SKILLS = ["Python", "Django", "FastAPI", "Java", "Spring", "React", "TypeScript", "SQL", "AWS", "Excel", "Figma", "node.js"]
+_WORDS  = ["서비스", "플랫폼", "운영", "개발하고", "분석합니다", "협업", "고객", "데이터를", "설계", "우대합니다", "경험", "업무"]
+_COND   = ["신입/경력", "경력 3년 이상", "학력무관", "대졸 이상", "석사 이상", "정규직", "계약직", "인턴", ""]
+_LOCS   = ["서울 강남구", "서울 마포구", "경기 성남시", "부산 해운대구", "전국", ""]
+
+def _docs(n: int, rng: np.random.Generator) -> List[PostingDoc]:
+    out = []
+    for i in range(n):
+        role = _ROLES[rng.integers(len(_ROLES))]
+        body = " ".join([role, *rng.choice(_SKILLS, 3), *rng.choice(_WORDS, 40), *rng.choice(_COND, 2)])
+        out.append(PostingDoc(gi_no=str(40_000_000 + i), title=f"{role} 채용", url="",
+                              company=f"회사{i % 97}", location=_LOCS[rng.integers(len(_LOCS))], jd_text=body))
+    return out
+
+def _p(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * q))]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="100,1000,5000")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    spec = Spec(location="서울", career=Career(level="신입"), role="백엔드 개발자",
+                skills=["Python", "Django"], employment_type="정규직", education="대졸(4년)")
+    rng = np.random.default_rng(0)
+    for n in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        docs = _docs(n, rng)
+        dense = {d.gi_no: float(c) for d, c in zip(docs, rng.uniform(0.6, 0.9, n))}
+        texts = [d.jd_text for d in docs]
+        build, score, full, hybrid = [], [], [], []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter(); ix = BM25Index(texts)
+            t1 = time.perf_counter(); ix.scores("백엔드 개발자 python django")
+            t2 = time.perf_counter(); st = {}; rank(spec, docs, stats=st)
+            t3 = time.perf_counter(); rank(spec, docs, dense)
+            t4 = time.perf_counter()
+            build.append((t1 - t0) * 1000); score.append((t2 - t1) * 1000)
+            full.append((t3 - t2) * 1000); hybrid.append((t4 - t3) * 1000)
+        print(f"n={n:<6} bm25 build p50 {statistics.median(build):7.2f}ms | score p50 {statistics.median(score):5.2f}ms"
+              f" | rank(bm25) p50 {statistics.median(full):7.2f}ms p95 {_p(full, 0.95):7.2f}ms"
+              f" | rank(hybrid) p50 {statistics.median(hybrid):7.2f}ms | 통과 {st['ranked']}/{n} {RANK_FILTER} {st['filtered']}")
+
+if __name__ == "__main__":
+    main()
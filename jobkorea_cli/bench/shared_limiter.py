@@ -0,0 +1,48 @@
+# bench/shared_limiter.py — SharedTokenBucket 호출당 오버헤드 측정
+#   python -m jobkorea_cli.bench.shared_limiter [--calls 5000] [--procs 4]
+# 속도 한도에 걸리지 않도록 rate를 크게 잡고 reserve()(= take()에서 sleep을 뺀 부분)만 잰다.
+from __future__ import annotations
+import os, time, argparse, tempfile, statistics
+from multiprocessing import Pool
+
+from ..rate_limiter import SharedTokenBucket, TokenBucket
+
+def _run(args) -> list[float]:
+    path, calls = args
+    b = SharedTokenBucket("bench", rate_per_sec=1e9, burst=1e9, path=path)
+    lat = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        b.reserve()
+        lat.append(time.perf_counter() - t0)
+    return lat
+
+def _summary(name: str, lat: list[float]) -> str:
+    lat = sorted(lat)
+    us = lambda x: f"{x*1e6:8.1f}us"
+    return (f"{name:<22} n={len(lat):<6} mean={us(statistics.fmean(lat))} "
+            f"p50={us(lat[len(lat)//2])} p99={us(lat[int(len(lat)*0.99)])} max={us(lat[-1])}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=5000)
+    ap.add_argument("--procs", type=int, default=4)
+    args = ap.parse_args()
+
+    local = TokenBucket(1e9, 1e9)
+    lat = []
+    for _ in range(args.calls):
+        t0 = time.perf_counter(); local.reserve(); lat.append(time.perf_counter() - t0)
+    print(_summary("TokenBucket (local)", lat))
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "ratelimit.sqlite3")
+        print(_summary("Shared x1 process", _run((path, args.calls))))
+        with Pool(args.procs) as pool:
+            lat = [x for r in pool.map(_run, [(path, args.calls)] * args.procs) for x in r]
+        print(_summary(f"Shared x{args.procs} processes", lat))
+        p99 = sorted(lat)[int(len(lat)*0.99)]
+        print(f"목표(p99 < 1ms): {'OK' if p99 < 1e-3 else 'FAIL'}")
+
+if __name__ == "__main__":
+    main()
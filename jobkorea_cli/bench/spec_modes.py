@@ -0,0 +1,80 @@
+# bench/spec_modes.py — parse_spec → map_filters(2회 호출) vs parse_and_map(1회 호출) 비교
+#   python -m jobkorea_cli.bench.spec_modes [--fixtures PATH] [--repeat 1]
+# 지연(ms), 토큰(응답 usage 합계), 두 모드 결과의 일치도를 스펙별/평균으로 출력. OPENAI_API_KEY 필요.
+# 캐시 적중을 막기 위해 호출마다 LLM 캐시를 비움(벤치 전용 임시 DB 사용 권장: LLM_CACHE_DB=/tmp/bench.sqlite3).
+from __future__ import annotations
+import json, time, asyncio, argparse, pathlib, statistics
+from typing import Dict, Any, List, Tuple
+
+from .. import llm, llm_cache
+from ..admission import get_admission
+from ..models import Spec
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures" / "specs.jsonl"
+
+_SPEC_FIELDS = ["role", "location", "education", "employment_type", "industry", "major"]
+_SPEC_LISTS  = ["skills", "certifications", "keywords"]
+_MAP_FIELDS  = ["duty", "region", "industry", "career", "education", "employment"]
+_MAP_LISTS   = ["expanded_roles", "expanded_keywords"]
+
+def _norm(v: Any) -> str:
+    return "".join(str(v or "").lower().split())
+
+def _jaccard(a: List[Any], b: List[Any]) -> float:
+    sa, sb = {_norm(x) for x in a or [] if x}, {_norm(x) for x in b or [] if x}
+    if not sa and not sb:
+        return 1.0
+    return len(sa & sb) / len(sa | sb)
+
+def agreement(a: Tuple[Spec, Dict[str, Any]], b: Tuple[Spec, Dict[str, Any]]) -> Dict[str, float]:
+    """필드 일치율(스칼라는 정확히, 리스트는 Jaccard) — spec/filters/expanded_roles 별도."""
+    (sa, fa), (sb, fb) = a, b
+    da, db = sa.model_dump(), sb.model_dump()
+    spec_scores = [float(_norm(da.get(f)) == _norm(db.get(f))) for f in _SPEC_FIELDS]
+    spec_scores.append(float(_norm(sa.career.level) == _norm(sb.career.level)))
+    spec_scores += [_jaccard(da.get(f), db.get(f)) for f in _SPEC_LISTS]
+    map_scores = [float(_norm(fa.get(f)) == _norm(fb.get(f))) for f in _MAP_FIELDS]
+    map_scores += [_jaccard(fa.get(f), fb.get(f)) for f in _MAP_LISTS]
+    return {"spec": statistics.fmean(spec_scores), "filters": statistics.fmean(map_scores),
+            "expanded_roles": _jaccard(fa.get("expanded_roles"), fb.get("expanded_roles"))}
+
+async def _measure(coro_fn, text: str) -> Tuple[Any, float, int]:
+    llm_cache.get_llm_cache().clear()
+    adm = get_admission(llm.OPENAI_MODEL)
+    tok0 = adm.counters["actual_tokens"]
+    t0 = time.perf_counter()
+    out = await coro_fn(text)
+    return out, (time.perf_counter() - t0) * 1000, adm.counters["actual_tokens"] - tok0
+
+async def run(path: pathlib.Path, repeat: int):
+    texts = [json.loads(l)["text"] for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
+    rows = []
+    for text in texts:
+        for _ in range(repeat):
+            two, two_ms, two_tok = await _measure(lambda t: llm.spec_and_filters(t, mode="two_call"), text)
+            one, one_ms, one_tok = await _measure(llm.parse_and_map, text)
+            ag = agreement(two, one)
+            rows.append((two_ms, one_ms, two_tok, one_tok, ag))
+            print(f"{text[:28]:<30} two={two_ms:7.0f}ms/{two_tok:5d}tok  one={one_ms:7.0f}ms/{one_tok:5d}tok  "
+                  f"agree spec={ag['spec']:.2f} filters={ag['filters']:.2f} roles={ag['expanded_roles']:.2f}")
+    if not rows:
+        return
+    mean = lambda i: statistics.fmean(r[i] for r in rows)
+    saved = lambda base, new: f"{(1 - new / base) * 100:.0f}% 절감" if base else "-"
+    print("\n[평균]")
+    print(f"지연    two_call={mean(0):.0f}ms  combined={mean(1):.0f}ms  ({saved(mean(0), mean(1))})")
+    print(f"토큰    two_call={mean(2):.0f}    combined={mean(3):.0f}    ({saved(mean(2), mean(3))})")
+    for k in ("spec", "filters", "expanded_roles"):
+        print(f"일치도  {k:<15}{statistics.fmean(r[4][k] for r in rows):.3f}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", type=pathlib.Path, default=FIXTURES)
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args()
+    if not llm.OPENAI_API_KEY:
+        raise SystemExit("OPENAI_API_KEY가 필요합니다 (.env).")
+    asyncio.run(run(args.fixtures, args.repeat))
+
+if __name__ == "__main__":
+    main()
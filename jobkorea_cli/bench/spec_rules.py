@@ -0,0 +1,82 @@
+# bench/spec_rules.py — 로컬 규칙 추출(spec_rules)로 parse_spec LLM 호출을 얼마나 줄이는지
+#   python -m jobkorea_cli.bench.spec_rules [--fixtures PATH] [--repeat 50] [--llm]
+# 규칙 단계: LLM 생략 비율, 로컬로 확정한 필드 수, 기대값 대비 정확도, 추출 p50/p95(µs). API 키 불필요.
+# --llm: parse_spec 전체 p50을 규칙 사용/미사용(SPEC_RULES)으로 비교. OPENAI_API_KEY 필요, 호출마다 LLM 캐시를 비움.
+from __future__ import annotations
+import json, time, asyncio, argparse, pathlib, statistics
+from typing import Dict, Any, List
+
+from .. import spec_rules
+from ..models import Spec
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures" / "spec_rules.jsonl"
+
+def _norm(v: Any) -> str:
+    return "".join(str(v or "").lower().split())
+
+def _value(spec: Spec, field: str) -> Any:
+    return spec.career.level if field == "career.level" else getattr(spec, field)
+
+def _correct(got: Any, want: Any) -> bool:
+    """스칼라는 정확히, 리스트는 기대값을 모두 포함하면 정답."""
+    if isinstance(want, list):
+        return {_norm(x) for x in want} <= {_norm(x) for x in got or []}
+    return _norm(got) == _norm(want)
+
+def _pct(xs: List[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * p))] if xs else 0.0
+
+def run_rules(rows: List[Dict[str, Any]], repeat: int):
+    lat_us: List[float] = []
+    skipped = resolved = checked = correct = 0
+    for row in rows:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            rs = spec_rules.extract_spec(row["text"])
+            lat_us.append((time.perf_counter() - t0) * 1e6)
+        skipped += not rs.needs_llm
+        resolved += len(spec_rules.FIELDS) - len(rs.unresolved)
+        wrong = [f for f, want in row.get("expect", {}).items() if not _correct(_value(rs.spec, f), want)]
+        checked += len(row.get("expect", {}))
+        correct += len(row.get("expect", {})) - len(wrong)
+        flag = "skip" if not rs.needs_llm else f"llm({len(rs.unresolved)})"
+        print(f"{row['text'][:30]:<32} {flag:<8} miss={wrong or '-'} residual={rs.residual[:4]}")
+    n = len(rows)
+    print("\n[규칙 단계]")
+    print(f"LLM 생략     {skipped}/{n} ({skipped / n * 100:.0f}%)")
+    print(f"로컬 확정     평균 {resolved / n:.1f}/{len(spec_rules.FIELDS)} 필드")
+    print(f"정확도       {correct}/{checked} ({correct / max(1, checked) * 100:.1f}%)")
+    print(f"추출 지연     p50={_pct(lat_us, 0.5):.0f}µs  p95={_pct(lat_us, 0.95):.0f}µs")
+
+async def run_llm(rows: List[Dict[str, Any]]):
+    from .. import llm, llm_cache
+    out: Dict[bool, List[float]] = {True: [], False: []}
+    for row in rows:
+        for on in (False, True):
+            llm_cache.get_llm_cache().clear()
+            llm.SPEC_RULES = on
+            t0 = time.perf_counter()
+            await llm.parse_spec(row["text"])
+            out[on].append((time.perf_counter() - t0) * 1000)
+    print("\n[parse_spec 전체]")
+    for on in (False, True):
+        print(f"SPEC_RULES={int(on)}  p50={statistics.median(out[on]):.0f}ms  p95={_pct(out[on], 0.95):.0f}ms")
+    print(spec_rules.rules_stats())
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", type=pathlib.Path, default=FIXTURES)
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--llm", action="store_true")
+    args = ap.parse_args()
+    rows = [json.loads(l) for l in args.fixtures.read_text(encoding="utf-8").splitlines() if l.strip()]
+    run_rules(rows, max(1, args.repeat))
+    if args.llm:
+        from .. import llm
+        if not llm.OPENAI_API_KEY:
+            raise SystemExit("OPENAI_API_KEY가 필요합니다 (.env).")
+        asyncio.run(run_llm(rows))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# browser_pool.py — 서버 워커 수명 동안 유지되는 공유 Chromium (컨텍스트 대여/재활용/재기동)
+from __future__ import annotations
+import os, asyncio, atexit, threading
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Awaitable, TypeVar
+
+from playwright.async_api import async_playwright
+
+BROWSER_MAX_CONTEXTS     = int(os.getenv("BROWSER_MAX_CONTEXTS", "4"))     # 동시에 살아 있는 컨텍스트 상한
+BROWSER_CONTEXT_MAX_USES = int(os.getenv("BROWSER_CONTEXT_MAX_USES", "20")) # N번 대여 후 컨텍스트 폐기(메모리/쿠키 누적 방지)
+
+T = TypeVar("T")
+
+class BrowserService:
+    """
+    전용 스레드 + 전용 이벤트 루프에서 Chromium 하나를 띄워 두고 재사용.
+    - Playwright 객체는 생성된 루프에 묶이므로 브라우저를 쓰는 코루틴은 submit()으로 이 루프에서 실행.
+      (Django 뷰처럼 요청마다 asyncio.run을 하는 쪽에서도 그대로 await 가능)
+    - lease_context(): 컨텍스트 대여. 상한(max_contexts)까지만 동시 대여, max_uses회 쓰면 폐기 후 새로 생성.
+    - 브라우저가 죽으면(disconnected) 다음 대여 때 다시 띄움.
+    """
+    def __init__(self, max_contexts: int = BROWSER_MAX_CONTEXTS, max_uses: int = BROWSER_CONTEXT_MAX_USES):
+        self.max_contexts = max(1, max_contexts)
+        self.max_uses = max(1, max_uses)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._pw = None
+        self._browser = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: List[List[Any]] = []   # [context, uses]
+        self.counters = {"launches": 0, "restarts": 0, "leases": 0,
+                         "contexts_created": 0, "contexts_recycled": 0, "active": 0}
+
+    # ---- 스레드/루프 ----
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            ready = threading.Event()
+
+            def _run():
+                self.loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self.loop)
+                self._launch_lock = asyncio.Lock()
+                self._slots = asyncio.Semaphore(self.max_contexts)
+                ready.set()
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name="browser-service", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def on_service_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    async def submit(self, coro: Awaitable[T]) -> T:
+        """coro를 서비스 루프에서 실행하고 결과를 기다림(호출 측 취소는 서비스 쪽 태스크에도 전파)."""
+        self.start()
+        if self.on_service_loop():
+            return await coro
+        fut = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return await asyncio.wrap_future(fut)
+
+    def submit_nowait(self, coro: Awaitable[Any]):
+        """결과를 기다리지 않는 백그라운드 작업(예: stale 공고 갱신)."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    # ---- 브라우저 ----
+    def _on_disconnected(self, *_):
+        self._browser = None
+        self._idle.clear()   # 죽은 브라우저의 컨텍스트는 버림
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            if self.counters["launches"]:
+                self.counters["restarts"] += 1
+            if self._pw is None:
+                self._pw = await async_playwright().start()
+            self._browser = await self._pw.chromium.launch(headless=True)
+            self._browser.on("disconnected", self._on_disconnected)
+            self.counters["launches"] += 1
+            return self._browser
+
+    async def _new_context(self):
+        try:
+            ctx = await (await self._ensure_browser()).new_context()
+        except Exception:
+            # 브라우저가 응답하지 않으면 한 번 재기동 후 재시도
+            self._on_disconnected()
+            ctx = await (await self._ensure_browser()).new_context()
+        self.counters["contexts_created"] += 1
+        return ctx
+
+    @asynccontextmanager
+    async def lease_context(self):
+        """서비스 루프 안에서만 사용(submit으로 넘긴 코루틴 내부)."""
+        await self._slots.acquire()
+        entry = None
+        try:
+            entry = self._idle.pop() if self._idle else [await self._new_context(), 0]
+            entry[1] += 1
+            self.counters["leases"] += 1
+            self.counters["active"] += 1
+            yield entry[0]
+        finally:
+            if entry is not None:
+                self.counters["active"] -= 1
+                alive = self._browser is not None and self._browser.is_connected()
+                if alive and entry[1] < self.max_uses:
+                    self._idle.append(entry)
+                else:
+                    self.counters["contexts_recycled"] += 1
+                    try: await entry[0].close()
+                    except Exception: pass
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        out = dict(self.counters)
+        out.update({"idle_contexts": len(self._idle),
+                    "browser_alive": bool(self._browser is not None and self._browser.is_connected())})
+        return out
+
+    # ---- 종료 ----
+    async def _aclose(self):
+        for ctx, _ in self._idle:
+            try: await ctx.close()
+            except Exception: pass
+        self._idle.clear()
+        if self._browser is not None:
+            try: await self._browser.close()
+            except Exception: pass
+        if self._pw is not None:
+            try: await self._pw.stop()
+            except Exception: pass
+        self._browser = self._pw = None
+
+    def close(self, timeout: float = 10.0):
+        if self.loop is None or self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), self.loop).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+
+_service: Optional[BrowserService] = None
+_service_lock = threading.Lock()
+def get_browser_service() -> BrowserService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = BrowserService()
+            atexit.register(_service.close)
+    return _service
@@ -4,7 +4,9 @@ import asyncio, sys
 
 from .models import Spec
 from .llm import parse_spec, ask_required_batch, map_filters
-from .crawler_rolesearch import crawl_by_roles_multi
+from .pipeline import SpeculativeCrawl, SPECULATIVE_CRAWL
+from .posting_index import POSTING_RERANK, rerank_grouped
+from .ranking import HYBRID_RANK, rank_grouped
 
 def _missing_required(s: Spec) -> list[str]:
     m = []
@@ -14,9 +16,7 @@ def _missing_required(s: Spec) -> list[str]:
     if not s.education: m.append("education")
     return m
 
-async def _interactive_spec() -> Spec:
-    print("예) 서울 거주 신입, 4년제 졸, 파이썬/SQL 가능, 정보처리기사 보유, 통계학 전공")
-    user_text = input("입력> ").strip()
+async def _interactive_spec(user_text: str) -> Spec:
     spec = await parse_spec(user_text)
 
     miss = _missing_required(spec)
@@ -56,10 +56,21 @@ async def main():
     print("=== 잡코리아 역할별 빠른 서치 (expanded_roles 기반) ===")
     print("종료: exit/quit\n")
 
-    spec = await _interactive_spec()
+    print("예) 서울 거주 신입, 4년제 졸, 파이썬/SQL 가능, 정보처리기사 보유, 통계학 전공")
+    user_text = input("입력> ").strip()
+
+    # 질문/LLM 매핑을 기다리는 동안 원문에서 뽑은 잠정 역할로 크롤을 먼저 시작
+    spec_crawl = SpeculativeCrawl(per_role=2)
+    if SPECULATIVE_CRAWL:
+        spec_crawl.start(user_text)
+    try:
+        spec = await _interactive_spec(user_text)
 
-    # LLM 매핑(여기서 expanded_roles 생성)
-    applied = await map_filters(spec)
+        # LLM 매핑(여기서 expanded_roles 생성)
+        applied = await map_filters(spec)
+    except BaseException:
+        await spec_crawl.cancel()
+        raise
 
     print("\n[적용된 키워드]")
     print("- expanded_roles:", applied.get("expanded_roles") or [])
@@ -67,11 +78,20 @@ async def main():
 
     expanded_roles = applied.get("expanded_roles") or []
     if not expanded_roles:
+        await spec_crawl.cancel()
         print("\n[결과] expanded_roles가 비어 있습니다. 입력 문장을 더 구체적으로 써 주세요.")
         return
 
-    # 직무 키워드별 2건씩 수집
-    grouped = await crawl_by_roles_multi(expanded_roles, per_role=2)
+    # 직무 키워드별 2건씩 수집 (추측 크롤 중 맞은 역할은 이어서 쓰고, 빗나간 역할은 취소)
+    grouped = await spec_crawl.reconcile(expanded_roles)
+    if HYBRID_RANK:
+        grouped = await rank_grouped(spec, grouped, applied.get("expanded_keywords"))
+    elif POSTING_RERANK:
+        grouped = await rerank_grouped(spec, grouped)
+    st = spec_crawl.stats
+    if st.get("speculative"):
+        print(f"\n[추측 크롤] 적중 {len(st['hits'])}/{len(st['speculative'])} (hit_rate={st['hit_rate']}), "
+              f"절약 약 {st['latency_saved_ms']}ms")
 
     # 출력
     any_hit = False
@@ -84,7 +104,8 @@ async def main():
             continue
         any_hit = True
         for d in docs:
-            print(f"  - {d.title if d.title else '(제목 없음)'}")
+            score = f" (점수 {d.score:.3f})" if d.score is not None else ""
+            print(f"  - {d.title if d.title else '(제목 없음)'}{score}")
             print(f"    링크: {d.url}")
     if not any_hit:
         print("\n(모든 역할에서 결과 없음)")
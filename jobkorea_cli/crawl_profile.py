@@ -0,0 +1,91 @@
+# crawl_profile.py — 브라우저 수집 시 불필요한 리소스(이미지/폰트/미디어/3rd-party 스크립트) 차단 프로파일
+from __future__ import annotations
+import os
+from typing import Dict, Any, Iterable, Optional
+from urllib.parse import urlsplit
+
+def _env_list(name: str, default: str) -> list[str]:
+    return [x.strip().lower() for x in os.getenv(name, default).split(",") if x.strip()]
+
+CRAWL_BLOCK_RESOURCES = os.getenv("CRAWL_BLOCK_RESOURCES","1")=="1"
+CRAWL_BLOCK_TYPES     = _env_list("CRAWL_BLOCK_TYPES", "image,font,media")
+# 1st-party로 취급(스크립트 허용)할 도메인. 하위 도메인 포함.
+CRAWL_ALLOW_DOMAINS   = _env_list("CRAWL_ALLOW_DOMAINS", "jobkorea.co.kr,jobkorea.kr,jkassets.com")
+# 리소스 종류와 무관하게 항상 차단할 광고/트래커 도메인
+CRAWL_BLOCK_DOMAINS   = _env_list("CRAWL_BLOCK_DOMAINS", ",".join([
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "googleadservices.com",
+    "doubleclick.net", "adservice.google.com", "facebook.net", "facebook.com", "criteo.com", "criteo.net",
+    "wcs.naver.net", "adnxs.com", "taboola.com", "mobon.net", "dable.io", "hotjar.com", "clarity.ms",
+    "scorecardresearch.com", "kakao.com", "daumcdn.net",
+]))
+
+# 차단한 요청의 예상 크기(바이트). 중단된 요청은 실제 크기를 알 수 없어 유형별 평균치로 추정.
+_EST_BYTES = {"image": 35_000, "font": 45_000, "media": 250_000, "script": 60_000,
+              "stylesheet": 25_000, "xhr": 5_000, "fetch": 5_000}
+_EST_BYTES_OTHER = 10_000
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+class CrawlProfile:
+    """
+    컨텍스트 라우트 필터 규칙.
+    - block_types: 도메인 무관 차단할 resource_type (image/font/media ...)
+    - block_domains: 항상 차단할 도메인(광고/트래커)
+    - allow_domains: 1st-party 도메인. 여기에 속하지 않는 스크립트는 3rd-party로 보고 차단.
+    """
+    def __init__(self, block_types: Iterable[str] = CRAWL_BLOCK_TYPES,
+                 block_domains: Iterable[str] = CRAWL_BLOCK_DOMAINS,
+                 allow_domains: Iterable[str] = CRAWL_ALLOW_DOMAINS,
+                 block_third_party_scripts: bool = True):
+        self.block_types = frozenset(t.lower() for t in block_types)
+        self.block_domains = tuple(d.lower() for d in block_domains)
+        self.allow_domains = tuple(d.lower() for d in allow_domains)
+        self.block_third_party_scripts = block_third_party_scripts
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if not host:
+            return False
+        if _host_matches(host, self.block_domains) and not _host_matches(host, self.allow_domains):
+            return True
+        if resource_type in self.block_types:
+            return True
+        if self.block_third_party_scripts and resource_type == "script":
+            return not _host_matches(host, self.allow_domains)
+        return False
+
+class RouteStats:
+    """크롤 1회 동안 차단/통과한 요청 수와 절약 바이트(추정)."""
+    def __init__(self):
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.est_bytes_saved = 0
+
+    def record_block(self, resource_type: str):
+        self.blocked += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.est_bytes_saved += _EST_BYTES.get(resource_type, _EST_BYTES_OTHER)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"requests_allowed": self.allowed, "requests_blocked": self.blocked,
+                "blocked_by_type": dict(self.blocked_by_type), "est_bytes_saved": self.est_bytes_saved}
+
+def default_profile() -> Optional[CrawlProfile]:
+    return CrawlProfile() if CRAWL_BLOCK_RESOURCES else None
+
+async def install_routes(context, profile: CrawlProfile, stats: RouteStats):
+    """context 전체에 라우트 필터 설치. 해제용 핸들러를 반환(context.unroute에 사용)."""
+    async def _handler(route, request):
+        try:
+            if profile.should_block(request.url, request.resource_type):
+                stats.record_block(request.resource_type)
+                await route.abort()
+            else:
+                stats.allowed += 1
+                await route.continue_()
+        except Exception:
+            pass   # 페이지가 이미 닫힌 경우 등
+    await context.route("**/*", _handler)
+    return _handler
@@ -1,14 +1,29 @@
 # crawler_rolesearch.py — expanded_roles 각 키워드로 2건씩 빠른 서치 수집(제목 보강판)
 from __future__ import annotations
-import re
+import os, re, time, asyncio, threading
+from contextlib import asynccontextmanager
 from urllib.parse import quote_plus
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Any, Optional, Callable, AsyncIterator
 
 from playwright.async_api import async_playwright, TimeoutError as PWTimeout
 from .models import PostingDoc
+from .posting_store import PostingStore, get_posting_store, FRESH, MISS
+from . import search_cache, http_fetch
+from .browser_pool import BrowserService, get_browser_service
+from .crawl_profile import CrawlProfile, RouteStats, default_profile, install_routes
+from .jd_extract import JDExtractor
+from .rate_limiter import get_limiter, JOBKOREA_HOST
 
 BASE = "https://www.jobkorea.co.kr"
 
+# 동시에 열어둘 page 수(= 동시 네비게이션 상한). 1이면 기존처럼 순차 수집.
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY","4"))
+# 수집 백엔드: auto(HTTP 우선, 앵커 없으면 브라우저) | http(HTTP만) | browser(Playwright만)
+CRAWL_BACKEND = os.getenv("CRAWL_BACKEND","auto").strip().lower()
+BACKENDS = ("auto", "http", "browser")
+# 1이면 요청마다 Chromium을 띄우지 않고 browser_pool의 공유 브라우저에서 컨텍스트를 대여
+CRAWL_SHARED_BROWSER = os.getenv("CRAWL_SHARED_BROWSER","1")=="1"
+
 def _normalize_gi(url: str) -> str:
     """항상 BASE + /Recruit/GI_Read/{id} 형태로 정규화."""
     if not url:
@@ -21,36 +36,79 @@ def _normalize_gi(url: str) -> str:
         return u
     return BASE + (u if u.startswith("/") else "/" + u)
 
-async def _collect_topk_urls_from_search(page, role_kw: str, per_role: int) -> List[str]:
-    """
-    현재 page에서 role_kw로 검색 후, GI_Read 링크 상위 per_role개 url만 추출
-    """
-    q = quote_plus(role_kw)
-    search_url = f"{BASE}/Search/?stext={q}&tabType=recruit"
-    await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+# 검색 결과 카드 한 번의 DOM 평가로 href/제목/회사/지역/마감일을 같이 뽑는 스크립트.
+# 카드 구조가 바뀌어도 최소한 href + 앵커 텍스트는 남도록 셀렉터는 여러 후보를 둔다.
+_CARDS_JS = """
+els => els.map(a => {
+  const card = a.closest('article, li, tr, .list-item, .list-post, .post, .recruit-info') || a.parentElement;
+  const txt = n => (n && (n.innerText || n.textContent) || '').replace(/\\s+/g, ' ').trim();
+  const pick = sels => {
+    for (const s of sels) {
+      const n = card && card.querySelector(s);
+      const t = txt(n);
+      if (t) return t;
+    }
+    return '';
+  };
+  return {
+    href: a.getAttribute('href') || '',
+    title: (a.getAttribute('title') || txt(a)).trim(),
+    company: pick(['.post-list-corp .name', '.corp-name', '.company', '.name', "a[href*='/Recruit/Co_Read']"]),
+    location: pick(['.option .loc', '.loc', '.location', '.work-place']),
+    deadline: pick(['.option .date', '.date', '.deadline', '.exp']),
+  };
+})
+"""
 
-    hrefs = await page.eval_on_selector_all(
-        "a[href*='/Recruit/GI_Read/']",
-        "els => els.map(e => e.getAttribute('href'))"
-    )
+# 제목으로 쓰면 안 되는 앵커 텍스트(버튼/배지류)
+_NON_TITLE = {"즉시지원", "입사지원", "홈페이지 지원", "스크랩", "지원하기", "관심기업", "new", "NEW"}
 
-    out: List[str] = []
-    seen = set()
-    for href in hrefs or []:
-        if not href:
-            continue
-        norm = _normalize_gi(href)
+def _cards_from_raw(raw: List[Dict[str, str]], per_role: int) -> List[Dict[str, str]]:
+    """
+    카드 원시 목록(앵커 단위) → gi_no 기준으로 합쳐 상위 per_role개.
+    한 카드 안에 같은 공고 앵커가 여러 개(제목/로고/지원버튼)일 수 있어 빈 필드는 뒤 앵커로 보강.
+    """
+    cards: Dict[str, Dict[str, str]] = {}
+    order: List[str] = []
+    for r in raw or []:
+        norm = _normalize_gi((r or {}).get("href") or "")
         m = re.search(r"/Recruit/GI_Read/(\d+)", norm)
         if not m:
             continue
         gid = m.group(1)
-        if gid in seen:
-            continue
-        seen.add(gid)
-        out.append(norm)
-        if len(out) >= per_role:
-            break
-    return out
+        title = re.sub(r"\s+", " ", r.get("title") or "").strip()
+        if title in _NON_TITLE:
+            title = ""
+        card = cards.get(gid)
+        if card is None:
+            if len(order) >= per_role:
+                continue
+            card = cards[gid] = {"gi_no": gid, "url": norm, "title": "", "company": "", "location": "", "deadline": ""}
+            order.append(gid)
+        for k, v in (("title", title), ("company", r.get("company")),
+                     ("location", r.get("location")), ("deadline", r.get("deadline"))):
+            if v and not card[k]:
+                card[k] = v.strip()
+    return [cards[g] for g in order]
+
+def _search_url(role_kw: str) -> str:
+    return f"{BASE}/Search/?stext={quote_plus(role_kw)}&tabType=recruit"
+
+async def _collect_topk_cards_from_search(page, role_kw: str, per_role: int) -> List[Dict[str, str]]:
+    """
+    현재 page에서 role_kw로 검색 후, GI_Read 카드 상위 per_role개를
+    {gi_no, url, title, company, location, deadline} 형태로 추출 (DOM 평가 1회)
+    """
+    await page.goto(_search_url(role_kw), wait_until="domcontentloaded", timeout=60000)
+
+    raw = await page.eval_on_selector_all("a[href*='/Recruit/GI_Read/']", _CARDS_JS)
+    return _cards_from_raw(raw, per_role)
+
+async def _collect_topk_urls_from_search(page, role_kw: str, per_role: int) -> List[str]:
+    """
+    현재 page에서 role_kw로 검색 후, GI_Read 링크 상위 per_role개 url만 추출
+    """
+    return [c["url"] for c in await _collect_topk_cards_from_search(page, role_kw, per_role)]
 
 def _extract_title_from_html(html: str) -> str:
     # og:title 우선
@@ -113,51 +171,574 @@ async def _fetch_title_with_fallback(page, url: str) -> str:
 
     return ""
 
-async def crawl_by_roles_multi(expanded_roles: List[str], per_role: int = 2) -> Dict[str, List[PostingDoc]]:
+class _PagePool:
     """
-    expanded_roles의 각 키워드로 검색하여 per_role개씩 수집.
-    각 상세 페이지에 짧게 진입해서 제목을 확실히 확보.
-    반환: { role_kw: [PostingDoc, ...], ... }
+    하나의 브라우저 컨텍스트에서 page를 최대 size개까지 열어 돌려쓰는 풀.
+    - 브라우저/컨텍스트/page 모두 필요할 때만 연다(lazy). 캐시만으로 끝나면 Chromium을 띄우지 않음.
+    - service가 있으면 공유 브라우저에서 컨텍스트를 대여(서비스 루프 안에서 사용), 없으면 전용 브라우저를 띄움.
+    - profile이 있으면 컨텍스트에 라우트 필터를 설치하고 차단 통계를 route_stats에 누적.
+    - lease() 블록 동안만 page를 독점하고, 끝나면 풀에 반납.
     """
-    result: Dict[str, List[PostingDoc]] = {}
-    if not expanded_roles:
-        return result
+    def __init__(self, size: int, service: Optional[BrowserService] = None,
+                 profile: Optional[CrawlProfile] = None):
+        self.size = max(1, int(size))
+        self.service = service
+        self.profile = profile
+        self.route_stats = RouteStats()
+        self._route_handler = None
+        self._ctx_lease = None
+        self.context = None
+        self.launched = False
+        self._pw = None
+        self._browser = None
+        self._open_lock = asyncio.Lock()
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._pages: List[Any] = []
+        self._opened = 0
+
+    async def _ensure_context(self):
+        async with self._open_lock:
+            if self.context is None:
+                if self.service is not None:
+                    self._ctx_lease = self.service.lease_context()
+                    self.context = await self._ctx_lease.__aenter__()
+                else:
+                    self._pw = await async_playwright().start()
+                    self._browser = await self._pw.chromium.launch(headless=True)
+                    self.context = await self._browser.new_context()
+                if self.profile is not None:
+                    self._route_handler = await install_routes(self.context, self.profile, self.route_stats)
+                self.launched = True
+        return self.context
+
+    @asynccontextmanager
+    async def lease(self):
+        if self._idle.empty() and self._opened < self.size:
+            self._opened += 1   # await 전에 자리 예약 → 동시에 들어와도 size를 넘지 않음
+            try:
+                page = await (await self._ensure_context()).new_page()
+            except Exception:
+                self._opened -= 1; raise
+            self._pages.append(page)
+        else:
+            page = await self._idle.get()
+        try:
+            yield page
+        finally:
+            self._idle.put_nowait(page)
+
+    async def close(self):
+        for p in self._pages:
+            try: await p.close()
+            except Exception: pass
+        self._pages.clear(); self._opened = 0
+        if self._route_handler is not None and self.context is not None:
+            # 공유 컨텍스트는 다음 대여자가 다른 프로파일을 쓸 수 있으므로 필터 해제
+            try: await self.context.unroute("**/*", self._route_handler)
+            except Exception: pass
+            self._route_handler = None
+        if self._ctx_lease is not None:
+            # 공유 컨텍스트는 닫지 않고 서비스에 반납
+            try: await self._ctx_lease.__aexit__(None, None, None)
+            except Exception: pass
+            self._ctx_lease = self.context = None
+        for closer in (self.context, self._browser):
+            if closer is not None:
+                try: await closer.close()
+                except Exception: pass
+        if self._pw is not None:
+            try: await self._pw.stop()
+            except Exception: pass
+        self.context = self._browser = self._pw = None
 
-    # 중복 제거 + 순서 유지
+def _dedup_roles(expanded_roles: List[str]) -> List[str]:
+    """공백 제거 + 중복 제거 + 순서 유지."""
     roles: List[str] = []
     seen = set()
-    for r in expanded_roles:
+    for r in expanded_roles or []:
         k = (r or "").strip()
         if not k or k in seen:
             continue
         seen.add(k)
         roles.append(k)
+    return roles
+
+def _gid_of(url: str) -> str:
+    m = re.search(r"/Recruit/GI_Read/(\d+)", url or "")
+    return m.group(1) if m else url
+
+def _doc_from_card(card: Dict[str, str]) -> PostingDoc:
+    return PostingDoc(
+        gi_no=card.get("gi_no") or _gid_of(card["url"]),
+        title=card.get("title") or "",
+        url=card["url"],
+        company=card.get("company") or "",
+        location=card.get("location") or "",
+        deadline=card.get("deadline") or "",
+        jd_text="",     # 속도 우선: 필요하면 이후 단계에서 상세 텍스트 수집
+        embed_text=""
+    )
+
+# ---------- 백엔드 선택(HTTP 우선 / 브라우저 폴백) ----------
+async def _search_cards_via(pool: _PagePool, role_kw: str, per_role: int, backend: str,
+                            counts: Dict[str, int]) -> List[Dict[str, str]]:
+    """
+    http/auto: 서버 렌더 HTML에서 카드 파싱. GI_Read 앵커가 없으면 auto만 브라우저로 폴백.
+    browser: 기존 Playwright 경로.
+    """
+    if backend in ("http", "auto"):
+        html = await http_fetch.fetch_html(_search_url(role_kw))
+        cards = _cards_from_raw(http_fetch.raw_cards_from_html(html or ""), per_role)
+        if cards:
+            counts["http"] += 1
+            return cards
+        if backend == "http":
+            return []
+        counts["fallback"] += 1
+    counts["browser"] += 1
+    async with pool.lease() as page, get_limiter(JOBKOREA_HOST).slot():
+        return await _collect_topk_cards_from_search(page, role_kw, per_role)
 
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        page = await browser.new_page()
-
-        for role_kw in roles:
-            urls = await _collect_topk_urls_from_search(page, role_kw, per_role)
-            docs: List[PostingDoc] = []
-            for url in urls:
-                gid_match = re.search(r"/Recruit/GI_Read/(\d+)", url)
-                gid = gid_match.group(1) if gid_match else url
-
-                # 같은 탭(page)로 빠르게 타이틀만 긁고 돌아옴
-                title = await _fetch_title_with_fallback(page, url)
-                if not title:
-                    title = "(제목 없음)"
-
-                docs.append(PostingDoc(
-                    gi_no=gid,
-                    title=title,
-                    url=url,
-                    jd_text="",     # 속도 우선: 필요하면 이후 단계에서 상세 텍스트 수집
-                    embed_text=""
-                ))
-            result[role_kw] = docs
-
-        await browser.close()
+async def _fetch_title_via(pool: _PagePool, url: str, backend: str, counts: Dict[str, int]) -> str:
+    """상세 제목: HTTP로 받은 HTML에서 _extract_title_from_html, 못 찾으면(auto) 브라우저."""
+    if backend in ("http", "auto"):
+        html = await http_fetch.fetch_html(url)
+        title = _extract_title_from_html(html) if html else ""
+        if title:
+            counts["http"] += 1
+            return title
+        if backend == "http":
+            return ""
+        counts["fallback"] += 1
+    counts["browser"] += 1
+    async with pool.lease() as page, get_limiter(JOBKOREA_HOST).slot():
+        return await _fetch_title_with_fallback(page, url)
+
+async def _fetch_html_via(pool: _PagePool, url: str, backend: str, counts: Dict[str, int]) -> Optional[str]:
+    """상세 본문 HTML: HTTP 우선, 받지 못하면(auto) 브라우저로 렌더링된 HTML."""
+    if backend in ("http", "auto"):
+        html = await http_fetch.fetch_html(url)
+        if html:
+            counts["http"] += 1
+            return html
+        if backend == "http":
+            return None
+        counts["fallback"] += 1
+    counts["browser"] += 1
+    async with pool.lease() as page, get_limiter(JOBKOREA_HOST).slot():
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=45000)
+            return await page.content()
+        except Exception:
+            return None
+
+# ---------- stale 공고 백그라운드 갱신 ----------
+# 호출 측 이벤트 루프(asyncio.run)가 끝나도 살아 있도록 별도 스레드 + 자체 루프/브라우저에서 수행.
+# 공유 BrowserService가 없으면 갱신 스레드는 하나만 두고 배치를 큐로 순차 처리(Chromium 동시 1개).
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+_refresh_queue: List[tuple] = []
+_refresh_worker_running = False
+
+async def _refresh_docs(store: PostingStore, docs: List[PostingDoc], backend: str,
+                        service: Optional[BrowserService] = None):
+    pool = _PagePool(1, service, default_profile())
+    counts = {"http": 0, "browser": 0, "fallback": 0}
+    try:
+        for doc in docs:
+            title = await _fetch_title_via(pool, doc.url, backend, counts)
+            if title:
+                doc.title = title
+                store.put(doc)
+    finally:
+        await pool.close()
+
+def _release_refreshing(docs: List[PostingDoc]):
+    with _refreshing_lock:
+        _refreshing.difference_update(d.gi_no for d in docs)
+
+async def _drain_refresh_queue():
+    global _refresh_worker_running
+    try:
+        while True:
+            with _refreshing_lock:
+                if not _refresh_queue:
+                    _refresh_worker_running = False
+                    return
+                store, docs, backend = _refresh_queue.pop(0)
+            try:
+                await _refresh_docs(store, docs, backend)
+            except Exception:
+                pass
+            finally:
+                _release_refreshing(docs)
+    finally:
+        await http_fetch.aclose_clients()
+
+def _run_refresh_worker():
+    global _refresh_worker_running
+    try:
+        asyncio.run(_drain_refresh_queue())
+    except BaseException:
+        # 루프 자체가 죽었으면 남은 배치를 풀어 다음 호출이 다시 시도하게 함
+        with _refreshing_lock:
+            left, _refresh_queue[:] = list(_refresh_queue), []
+            _refresh_worker_running = False
+        for _, docs, _ in left:
+            _release_refreshing(docs)
 
+def _refresh_in_background(store: PostingStore, docs: List[PostingDoc], backend: str,
+                           service: Optional[BrowserService] = None):
+    global _refresh_worker_running
+    with _refreshing_lock:
+        todo = [d for d in docs if d.gi_no not in _refreshing]
+        _refreshing.update(d.gi_no for d in todo)
+        if todo and service is None:
+            _refresh_queue.append((store, todo, backend))
+            start = not _refresh_worker_running
+            _refresh_worker_running = True
+    if not todo:
+        return
+
+    if service is not None:
+        # 공유 브라우저 루프에 태스크로 얹음(별도 스레드/브라우저 불필요)
+        service.submit_nowait(_refresh_docs(store, todo, backend, service)).add_done_callback(
+            lambda *_: _release_refreshing(todo))
+        return
+
+    if start:
+        threading.Thread(target=_run_refresh_worker, name="posting-refresh", daemon=True).start()
+
+class _CrawlRun:
+    """
+    crawl_by_roles_multi 한 번의 실행 상태: page 풀 + 옵션 + 저장소 + 카운터.
+    """
+    def __init__(self, pool: _PagePool, per_role: int, detail_fallback: bool,
+                 store: Optional[PostingStore], use_search_cache: bool = True,
+                 backend: str = "browser", on_result: Optional[Callable[[str, PostingDoc], None]] = None,
+                 with_jd: bool = False, skills: Optional[List[str]] = None):
+        self.pool = pool
+        self.per_role = per_role
+        self.detail_fallback = detail_fallback
+        self.store = store
+        self.use_search_cache = use_search_cache
+        self.counts = {"fresh": 0, "stale": 0, "miss": 0, "detail_visits": 0}
+        self.search_counts = {"hit": 0, "miss": 0}
+        self.backend = backend
+        self.backend_counts = {"http": 0, "browser": 0, "fallback": 0}
+        self._stale: List[PostingDoc] = []
+        self.on_result = on_result
+        # 역할 간 중복 제거: gi_no → 해석 태스크. 같은 공고는 한 번만 해석하고 결과를 모든 역할에 나눠줌.
+        self._by_gid: Dict[str, asyncio.Task] = {}
+        self.dedup_counts = {"candidates": 0, "unique": 0}
+        # opt-in: 상세 본문 → jd_text/embed_text
+        self.jd: Optional[JDExtractor] = None
+        if with_jd:
+            self.jd = JDExtractor(
+                lambda url: _fetch_html_via(self.pool, url, self.backend, self.backend_counts),
+                skills=skills, store=store,
+            )
+        self.first_result_ms: Optional[float] = None
+        self._t0 = time.perf_counter()
+
+    async def resolve_card(self, card: Dict[str, str]) -> PostingDoc:
+        """
+        저장소 fresh → 그대로 / stale → 즉시 반환 + 갱신 예약 / miss → 카드로 구성.
+        카드에 제목이 없을 때만(detail_fallback) 상세 페이지에 진입해 보강.
+        """
+        doc = _doc_from_card(card)
+        state, cached = self.store.lookup(doc.gi_no) if self.store else (MISS, None)
+        if cached is not None:
+            # 카드에서 새로 읽은 값이 있으면 그쪽이 최신
+            for f in ("title", "company", "location", "deadline"):
+                if getattr(doc, f):
+                    setattr(cached, f, getattr(doc, f))
+            if state == FRESH:
+                self.counts["fresh"] += 1
+                return cached
+            self.counts["stale"] += 1
+            if doc.title:
+                self.store.put(cached)      # 카드만으로 최신화 가능 → 네비게이션 없이 갱신
+            else:
+                self._stale.append(cached)  # 상세 진입이 필요한 갱신은 백그라운드로
+            return cached
+
+        self.counts["miss"] += 1
+        if not doc.title and self.detail_fallback:
+            self.counts["detail_visits"] += 1
+            doc.title = await _fetch_title_via(self.pool, doc.url, self.backend, self.backend_counts)
+        if doc.title and self.store:
+            self.store.put(doc)
+        if not doc.title:
+            doc.title = "(제목 없음)"
+        return doc
+
+    async def search_cards(self, role_kw: str) -> List[Dict[str, str]]:
+        """검색 결과 카드: 캐시 적중이면 브라우저 없이, 아니면 검색 후 캐시에 저장."""
+        if self.use_search_cache:
+            cards = search_cache.get_cards(role_kw, self.per_role)
+            if cards is not None:
+                self.search_counts["hit"] += 1
+                return cards
+            self.search_counts["miss"] += 1
+        try:
+            cards = await _search_cards_via(self.pool, role_kw, self.per_role, self.backend, self.backend_counts)
+        except Exception:
+            return []
+        if self.use_search_cache:
+            search_cache.put_cards(role_kw, self.per_role, cards)
+        return cards
+
+    async def _resolve_full(self, card: Dict[str, str]) -> PostingDoc:
+        doc = await self.resolve_card(card)
+        if self.jd is not None:
+            doc = await self.jd.enrich(doc)
+        return doc
+
+    def resolve_once(self, card: Dict[str, str]) -> "asyncio.Task[PostingDoc]":
+        """
+        gi_no 기준 단일 해석. 먼저 본 역할이 태스크를 만들고, 뒤에 같은 공고를 만난 역할은 그 결과를 기다림.
+        (전체 검색이 끝나길 기다리지 않으므로 스트리밍 시 첫 결과 지연이 늘지 않음)
+        """
+        gid = card.get("gi_no") or _gid_of(card["url"])
+        self.dedup_counts["candidates"] += 1
+        task = self._by_gid.get(gid)
+        if task is None:
+            self.dedup_counts["unique"] += 1
+            task = self._by_gid[gid] = asyncio.ensure_future(self._resolve_full(card))
+        return task
+
+    def dedup_stats(self) -> Dict[str, Any]:
+        n, u = self.dedup_counts["candidates"], self.dedup_counts["unique"]
+        return {"candidates": n, "unique": u, "duplicates": n - u,
+                "dup_ratio": round((n - u) / n, 3) if n else 0.0}
+
+    async def crawl_role(self, role_kw: str) -> Tuple[List[PostingDoc], Dict[str, Any]]:
+        """role_kw 하나: 검색 카드 수집 → 카드별 해석(병렬, 역할 간 gi_no 중복은 한 번만). (docs, timing) 반환."""
+        t0 = time.perf_counter()
+        cards = await self.search_cards(role_kw)
+        t1 = time.perf_counter()
+
+        async def _one(card):
+            # shield: 이 역할이 취소돼도 같은 공고를 기다리는 다른 역할의 해석은 계속
+            doc = (await asyncio.shield(self.resolve_once(card))).model_copy()
+            if self.first_result_ms is None:
+                self.first_result_ms = round((time.perf_counter() - self._t0) * 1000, 1)
+            if self.on_result is not None:
+                self.on_result(role_kw, doc)
+            return doc
+
+        docs = list(await asyncio.gather(*[_one(c) for c in cards]))
+        t2 = time.perf_counter()
+        timing = {
+            "search_ms": round((t1 - t0) * 1000, 1),
+            "detail_ms": round((t2 - t1) * 1000, 1),
+            "total_ms":  round((t2 - t0) * 1000, 1),
+            "n": len(docs),
+        }
+        return docs, timing
+
+    async def aclose(self):
+        """남은 공고 해석(취소된 역할만 기다리던 것)을 정리하고 page 풀을 닫음. 실행 루프에서 호출."""
+        pending = [t for t in self._by_gid.values() if not t.done()]
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await self.pool.close()
+
+    def schedule_refresh(self):
+        if self.store and self._stale:
+            _refresh_in_background(self.store, self._stale, self.backend, self.pool.service)
+            self._stale = []
+
+async def crawl_by_roles_multi(
+    expanded_roles: List[str],
+    per_role: int = 2,
+    concurrency: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    detail_fallback: bool = True,
+    use_store: bool = True,
+    use_search_cache: bool = True,
+    backend: Optional[str] = None,
+    shared_browser: Optional[bool] = None,
+    profile: Optional[CrawlProfile] = None,
+    on_result: Optional[Callable[[str, PostingDoc], None]] = None,
+    with_jd: bool = False,
+    skills: Optional[List[str]] = None,
+) -> Dict[str, List[PostingDoc]]:
+    """
+    expanded_roles의 각 키워드로 검색하여 per_role개씩 수집.
+    제목/회사/지역/마감일은 검색 결과 카드에서 바로 읽고, 카드에 제목이 없을 때만 상세 페이지에 진입.
+    - concurrency: 동시에 쓰는 page 수 상한(기본 CRAWL_CONCURRENCY). 역할 검색/상세 진입을 이 한도 안에서 병렬 처리.
+    - detail_fallback: False면 제목 없는 카드도 상세 진입 없이 "(제목 없음)"으로 둠.
+    - use_store: 공고 저장소(posting_store) 사용. fresh는 그대로, stale은 즉시 반환 후 백그라운드 갱신, miss만 수집.
+    - use_search_cache: role_kw(정규화)+per_role → 카드 목록 캐시 사용. 모두 적중하면 브라우저를 띄우지 않음.
+    - backend: "auto"(HTTP 우선, 기대 앵커가 없을 때만 Playwright) | "http" | "browser". 기본 CRAWL_BACKEND.
+    - shared_browser: 공유 브라우저 서비스(browser_pool) 사용 여부. 기본 CRAWL_SHARED_BROWSER.
+                      켜면 수집 코루틴 전체가 서비스 루프에서 실행되고, 요청마다 Chromium을 새로 띄우지 않음.
+    - profile: 브라우저 컨텍스트 라우트 필터(crawl_profile.CrawlProfile). 기본은 default_profile()
+               (이미지/폰트/미디어, 3rd-party 스크립트, 광고/트래커 도메인 차단. CRAWL_BLOCK_RESOURCES=0이면 끔).
+    - on_result: 공고 하나가 확정될 때마다 (role_kw, PostingDoc)로 호출되는 콜백.
+                 공유 브라우저 사용 시 서비스 스레드에서 불리므로 스레드 안전해야 함(iter_crawl_by_roles 참고).
+    - with_jd: 상세 본문을 동시에(JD_CONCURRENCY, 호스트 리미터 속도) 받아 pick_sections로 정제한 jd_text와
+               skills 주변 keyword_windows를 더한 embed_text를 채움. 결과는 저장소에 남아 공고당 한 번만 처리.
+    - stats: dict를 넘기면 역할별 소요시간(role_timings), 전체 소요시간(elapsed_ms),
+             저장소 적중 수(store: fresh/stale/miss/detail_visits), 검색 캐시 적중 수(search_cache),
+             백엔드별 요청 수(backend: http/browser/fallback), 브라우저 기동 여부(browser_launched),
+             라우트 필터 차단 수/절약 바이트 추정(routes), 첫 결과까지 걸린 시간(first_result_ms),
+             본문 수집 결과(jd: fetched/reused/failed, with_jd일 때),
+             역할 간 중복(dedup: candidates/unique/duplicates/dup_ratio — per_role 조정용),
+             잡코리아 리미터 상태(rate_limit: rate/queue_depth/...)를 채워줌.
+    반환: { role_kw: [PostingDoc, ...], ... }  (순서는 expanded_roles 순서 그대로)
+    """
+    result: Dict[str, List[PostingDoc]] = {}
+    roles = _dedup_roles(expanded_roles)
+    if not roles:
+        return result
+
+    backend = (backend or CRAWL_BACKEND).strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 backend: {backend} (가능: {', '.join(BACKENDS)})")
+    shared = CRAWL_SHARED_BROWSER if shared_browser is None else shared_browser
+    size = concurrency if concurrency is not None else CRAWL_CONCURRENCY
+    profile = profile if profile is not None else default_profile()
+
+    run_kwargs = dict(per_role=per_role, detail_fallback=detail_fallback, use_search_cache=use_search_cache,
+                      backend=backend, on_result=on_result, with_jd=with_jd, skills=skills)
+    if shared:
+        service = get_browser_service()
+        return await service.submit(_crawl_impl(roles, size, stats, use_store, service, profile, run_kwargs))
+    return await _crawl_impl(roles, size, stats, use_store, None, profile, run_kwargs)
+
+async def _crawl_impl(roles: List[str], size: int, stats: Optional[Dict[str, Any]], use_store: bool,
+                      service: Optional[BrowserService], profile: Optional[CrawlProfile],
+                      run_kwargs: Dict[str, Any]) -> Dict[str, List[PostingDoc]]:
+    result: Dict[str, List[PostingDoc]] = {}
+    t0 = time.perf_counter()
+    store = get_posting_store() if use_store else None
+    pool = _PagePool(size, service, profile)
+    run = _CrawlRun(pool, store=store, **run_kwargs)
+    try:
+        outs = await asyncio.gather(*[run.crawl_role(r) for r in roles])
+    finally:
+        await run.aclose()
+    run.schedule_refresh()
+
+    timings: Dict[str, Dict[str, Any]] = {}
+    for role_kw, (docs, timing) in zip(roles, outs):
+        result[role_kw] = docs
+        timings[role_kw] = timing
+
+    if stats is not None:
+        _fill_stats(stats, run, size, service, timings, t0)
     return result
+
+def _fill_stats(stats: Dict[str, Any], run: _CrawlRun, size: int, service: Optional[BrowserService],
+                timings: Dict[str, Dict[str, Any]], t0: float):
+    stats["role_timings"] = timings
+    stats["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    stats["first_result_ms"] = run.first_result_ms
+    stats["concurrency"] = max(1, int(size))
+    stats["store"] = dict(run.counts)
+    stats["search_cache"] = dict(run.search_counts)
+    stats["backend"] = dict(run.backend_counts)
+    stats["browser_launched"] = run.pool.launched
+    stats["routes"] = run.pool.route_stats.as_dict()
+    stats["dedup"] = run.dedup_stats()
+    stats["rate_limit"] = get_limiter(JOBKOREA_HOST).snapshot()
+    if run.jd is not None:
+        stats["jd"] = dict(run.jd.counts)
+    if service is not None:
+        stats["browser_service"] = service.stats()
+
+class CrawlSession:
+    """
+    역할이 하나씩 늦게 정해지는 수집(pipeline.SpeculativeCrawl): 역할을 add()할 때마다 같은 _CrawlRun에 얹음.
+    → 역할 간 gi_no 중복 제거, page 동시성 상한(concurrency), 브라우저(공유든 전용이든) 하나를 모든 역할이 공유.
+    - add(role_kw): 수집 시작(이미 있으면 그 Future). 결과는 (docs, timing). Future.cancel()로 그 역할만 취소
+    - aclose(stats): 남은 해석 정리 + page 풀 닫기 + stale 갱신 예약. stats는 crawl_by_roles_multi와 같은 형식
+    옵션은 crawl_by_roles_multi와 동일. 공유 브라우저면 역할 수집은 서비스 루프에서 돌고 Future는 호출 측 루프에 묶임.
+    """
+    def __init__(self, per_role: int = 2, concurrency: Optional[int] = None, detail_fallback: bool = True,
+                 use_store: bool = True, use_search_cache: bool = True, backend: Optional[str] = None,
+                 shared_browser: Optional[bool] = None, profile: Optional[CrawlProfile] = None,
+                 on_result: Optional[Callable[[str, PostingDoc], None]] = None,
+                 with_jd: bool = False, skills: Optional[List[str]] = None):
+        backend = (backend or CRAWL_BACKEND).strip().lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"지원하지 않는 backend: {backend} (가능: {', '.join(BACKENDS)})")
+        shared = CRAWL_SHARED_BROWSER if shared_browser is None else shared_browser
+        self.size = concurrency if concurrency is not None else CRAWL_CONCURRENCY
+        self.service = get_browser_service() if shared else None
+        if self.service is not None:
+            self.service.start()
+        pool = _PagePool(self.size, self.service, profile if profile is not None else default_profile())
+        self.run = _CrawlRun(pool, per_role=per_role, detail_fallback=detail_fallback,
+                             store=get_posting_store() if use_store else None, use_search_cache=use_search_cache,
+                             backend=backend, on_result=on_result, with_jd=with_jd, skills=skills)
+        self.roles: Dict[str, "asyncio.Future[Tuple[List[PostingDoc], Dict[str, Any]]]"] = {}
+        self._t0 = time.perf_counter()
+        self._closed = False
+
+    def _on_run_loop(self) -> bool:
+        return self.service is None or self.service.on_service_loop()
+
+    def add(self, role_kw: str) -> "asyncio.Future[Tuple[List[PostingDoc], Dict[str, Any]]]":
+        role_kw = (role_kw or "").strip()
+        fut = self.roles.get(role_kw)
+        if fut is None:
+            if self._closed:
+                raise RuntimeError("이미 닫힌 CrawlSession")
+            coro = self.run.crawl_role(role_kw)
+            if self._on_run_loop():
+                fut = asyncio.ensure_future(coro)
+            else:   # 취소는 wrap_future → 서비스 쪽 태스크로 전파됨
+                fut = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.service.loop))
+            self.roles[role_kw] = fut
+        return fut
+
+    async def aclose(self, stats: Optional[Dict[str, Any]] = None):
+        if self._closed:
+            return
+        self._closed = True
+        futs = list(self.roles.values())
+        await asyncio.gather(*futs, return_exceptions=True)
+        if self._on_run_loop():
+            await self.run.aclose()
+        else:
+            await self.service.submit(self.run.aclose())
+        self.run.schedule_refresh()
+        if stats is not None:
+            timings = {r: f.result()[1] for r, f in self.roles.items()
+                       if f.done() and not f.cancelled() and f.exception() is None}
+            _fill_stats(stats, self.run, self.size, self.service, timings, self._t0)
+
+async def iter_crawl_by_roles(expanded_roles: List[str], per_role: int = 2,
+                              **kwargs) -> AsyncIterator[Tuple[str, PostingDoc]]:
+    """
+    crawl_by_roles_multi의 스트리밍 버전: 공고가 확정되는 순서대로 (role_kw, PostingDoc)을 yield.
+    전체 완료를 기다리지 않으므로 첫 결과까지의 시간이 '모든 역할의 합'이 아니라 '가장 빠른 역할' 기준.
+    kwargs는 crawl_by_roles_multi와 동일(stats 포함). 역할 내 순서는 보장하지 않음.
+    """
+    loop = asyncio.get_running_loop()
+    q: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def _emit(role_kw: str, doc: PostingDoc):
+        # 공유 브라우저 스레드에서 불릴 수 있으므로 호출 측 루프로 넘김
+        loop.call_soon_threadsafe(q.put_nowait, (role_kw, doc))
+
+    task = asyncio.ensure_future(crawl_by_roles_multi(expanded_roles, per_role, on_result=_emit, **kwargs))
+    task.add_done_callback(lambda _: q.put_nowait(done))
+    try:
+        while True:
+            item = await q.get()
+            if item is done:
+                break
+            yield item
+        await task   # 수집 중 예외 전파
+    finally:
+        if not task.done():
+            task.cancel()
+            try: await task
+            except BaseException: pass
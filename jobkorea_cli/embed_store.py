@@ -0,0 +1,285 @@
+# embed_store.py — 내용 주소 기반 임베딩 저장소 (memmap float32 행렬 + SQLite 오프셋 인덱스)
+#   python -m jobkorea_cli.embed_store stats|compact [--model ID] [--max-rows N]
+from __future__ import annotations
+import os, re, time, atexit, sqlite3, pathlib, hashlib, argparse, threading, weakref
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+EMBED_STORE          = os.getenv("EMBED_STORE","1")=="1"
+EMBED_STORE_DIR      = os.getenv("EMBED_STORE_DIR", ".cache_embed")
+EMBED_STORE_MAX_ROWS = int(os.getenv("EMBED_STORE_MAX_ROWS", "200000"))   # compact 기본 상한
+EMBED_STORE_TOUCH_SEC = float(os.getenv("EMBED_STORE_TOUCH_SEC", "30"))   # 접근 시각/적중 수를 모아 쓰는 주기
+
+_GROW_ROWS = 4096   # 파일을 늘릴 때 최소 단위(행)
+
+def text_key(model_id: str, text: str) -> str:
+    return hashlib.sha1(f"{model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+def _slug(model_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id).strip("_") or "model"
+
+class EmbedStore:
+    """
+    모델 1개 = 디렉터리 1개: vectors[.<gen>].f32(행 × dim float32, np.memmap) + index.sqlite3(key → row).
+    key = sha1(model_id + text) → 같은 텍스트는 한 번만 인코딩.
+    - lookup(texts): (벡터 행렬, 못 찾은 인덱스 목록). key → row 조회와 generation 확인을 한 읽기 트랜잭션에서 →
+      그 스냅숏의 generation 파일에서 행을 np.take 한 번으로 결과 행렬에 바로 모음(역직렬화/행별 복사 없음).
+      last_access/hits 갱신은 메모리에 모았다가 EMBED_STORE_TOUCH_SEC마다(그리고 compact/stats/종료 시) 한 번에 씀
+      → 조회 경로는 보통 쓰기 락을 잡지 않음
+    - put(texts, vecs): 행 번호를 SQLite 트랜잭션(BEGIN IMMEDIATE)으로 할당 → 여러 프로세스가 같은 파일 공유 가능.
+      벡터를 먼저 쓰고 flush한 뒤 key를 커밋하므로, 읽는 쪽은 다 쓰인 행만 봄.
+    - compact(max_rows): 최근 사용 순으로 max_rows만 남겨 다음 generation 파일에 다시 씀 → 커밋 후 이전 파일 삭제
+      (이전 generation을 매핑 중인 프로세스는 그대로 읽고, 다음 조회 때 새 파일로 다시 매핑)
+    """
+    def __init__(self, model_id: str, dim: int, root: str = EMBED_STORE_DIR):
+        self.model_id, self.dim = model_id, int(dim)
+        self.dir = pathlib.Path(root) / _slug(model_id)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.dir / "vectors.f32"   # generation 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.dir / "index.sqlite3"), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS vectors (
+                key         TEXT PRIMARY KEY,
+                row         INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                hits        INTEGER NOT NULL DEFAULT 0
+            )""")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v INTEGER NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('dim', ?), ('next_row', 0), ('capacity', 0), ('generation', 0)",
+                           (self.dim,))
+        stored = self._meta("dim")
+        if stored != self.dim:
+            raise ValueError(f"{self.dir}: 저장된 차원 {stored} ≠ 요청 차원 {self.dim}")
+        self._mm: Optional[np.memmap] = None
+        self._mm_rows = 0
+        self._mm_gen = -1
+        self.counters = {"hits": 0, "misses": 0, "puts": 0, "compactions": 0, "touch_flushes": 0}
+        self._touch: Dict[str, List[float]] = {}   # key → [마지막 접근 시각, 적중 수] (아직 안 쓴 것)
+        self._touch_at = time.monotonic()
+        _open_stores.add(self)
+
+    def _meta(self, k: str) -> int:
+        return int(self._conn.execute("SELECT v FROM meta WHERE k=?", (k,)).fetchone()[0])
+
+    def _set_meta(self, k: str, v: int):
+        self._conn.execute("UPDATE meta SET v=? WHERE k=?", (int(v), k))
+
+    def _file(self, gen: int) -> pathlib.Path:
+        return self.path if gen == 0 else self.dir / f"vectors.{gen}.f32"
+
+    def _map(self, need_rows: int = 0):
+        """
+        필요한 행까지 매핑돼 있지 않거나 compact로 generation이 바뀌었으면 다시 매핑.
+        트랜잭션 안에서 호출 → meta와 파일이 같은 스냅숏 기준.
+        """
+        gen, cap = self._meta("generation"), self._meta("capacity")
+        if self._mm is not None and gen == self._mm_gen and need_rows <= self._mm_rows:
+            return
+        self._mm = None
+        path = self._file(gen)
+        if cap > 0 and path.exists() and path.stat().st_size >= cap * self.dim * 4:
+            self._mm = np.memmap(path, dtype="float32", mode="r+", shape=(cap, self.dim))
+        self._mm_rows, self._mm_gen = (cap if self._mm is not None else 0), gen
+
+    def _txn(self, fn, mode: str = "IMMEDIATE"):
+        self._conn.execute(f"BEGIN {mode}")
+        try:
+            out = fn()
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return out
+
+    def lookup(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        if not texts:
+            return out, []
+        keys = [text_key(self.model_id, t) for t in texts]
+        with self._lock:
+            def _read():
+                found: Dict[str, int] = {}
+                uniq = list(dict.fromkeys(keys))
+                for i in range(0, len(uniq), 500):   # SQLite 변수 개수 제한
+                    part = uniq[i:i + 500]
+                    found.update(self._conn.execute(
+                        f"SELECT key, row FROM vectors WHERE key IN ({','.join('?' * len(part))})", part).fetchall())
+                if found:
+                    self._map(max(found.values()) + 1)
+                rows = np.fromiter((found.get(k, -1) for k in keys), dtype="int64", count=len(keys))
+                hit = (rows >= 0) & (rows < self._mm_rows)
+                if hit.any():
+                    np.take(self._mm, np.where(hit, rows, 0), axis=0, out=out)
+                    out[~hit] = 0.0
+                return found, np.flatnonzero(~hit).tolist()
+            # 읽기 트랜잭션: 그사이 compact가 커밋돼도 같은 generation의 row/파일만 봄
+            found, missing = self._txn(_read, "DEFERRED")
+            now = time.time()
+            for k in found:
+                t = self._touch.setdefault(k, [now, 0])
+                t[0] = now; t[1] += 1
+            self.counters["hits"] += len(keys) - len(missing)
+            self.counters["misses"] += len(missing)
+            if time.monotonic() - self._touch_at >= EMBED_STORE_TOUCH_SEC:
+                self._flush_touch()
+        return out, missing
+
+    def _flush_touch(self):
+        """모아 둔 접근 기록을 한 트랜잭션으로 씀. self._lock 안에서 호출."""
+        self._touch_at = time.monotonic()
+        if not self._touch:
+            return
+        batch, self._touch = self._touch, {}
+        self._txn(lambda: self._conn.executemany(
+            "UPDATE vectors SET last_access=MAX(last_access, ?), hits=hits+? WHERE key=?",
+            [(ts, n, k) for k, (ts, n) in batch.items()]))
+        self.counters["touch_flushes"] += 1
+
+    def flush(self):
+        with self._lock:
+            self._flush_touch()
+
+    def put(self, texts: List[str], vecs: np.ndarray):
+        vecs = np.ascontiguousarray(vecs, dtype="float32").reshape(-1, self.dim)
+        pairs = list({text_key(self.model_id, t): v for t, v in zip(texts, vecs)}.items())
+        if not pairs:
+            return
+        with self._lock:
+            def _write():
+                have = set()
+                keys = [k for k, _ in pairs]
+                for i in range(0, len(keys), 500):
+                    part = keys[i:i + 500]
+                    have.update(k for (k,) in self._conn.execute(
+                        f"SELECT key FROM vectors WHERE key IN ({','.join('?' * len(part))})", part))
+                new = [(k, v) for k, v in pairs if k not in have]
+                if not new:
+                    return 0
+                start, cap = self._meta("next_row"), self._meta("capacity")
+                end = start + len(new)
+                if end > cap:   # 파일 확장(0으로 채워짐) — 두 배 또는 최소 단위만큼
+                    cap = max(end, cap * 2, _GROW_ROWS)
+                    with open(self._file(self._meta("generation")), "ab") as f:
+                        f.truncate(cap * self.dim * 4)
+                    self._set_meta("capacity", cap)
+                self._map(end)
+                self._mm[start:end] = np.stack([v for _, v in new])
+                self._mm.flush()
+                now = time.time()
+                self._conn.executemany("INSERT INTO vectors(key, row, last_access) VALUES (?,?,?)",
+                                       [(k, start + j, now) for j, (k, _) in enumerate(new)])
+                self._set_meta("next_row", end)
+                return len(new)
+            self.counters["puts"] += self._txn(_write)
+
+    def compact(self, max_rows: int = EMBED_STORE_MAX_ROWS) -> Dict[str, int]:
+        """최근 사용(last_access) 상위 max_rows만 남기고 빈틈 없이 다시 씀. 반환: before/after/evicted."""
+        with self._lock:
+            self._flush_touch()   # 모아 둔 접근 기록이 순서에 반영되도록
+            def _rewrite():
+                rows = self._conn.execute("SELECT key, row FROM vectors ORDER BY last_access DESC").fetchall()
+                self._map(self._meta("capacity"))
+                src = self._mm
+                if src is None:   # 파일이 없거나 capacity 0 → 남길 벡터가 없음
+                    keep, drop = [], rows
+                else:
+                    keep = [(k, r) for k, r in rows if r < self._mm_rows][:max(0, max_rows)]
+                    kept = {k for k, _ in keep}
+                    drop = [(k, r) for k, r in rows if k not in kept]
+                gen = self._meta("generation")
+                path = self._file(gen + 1)
+                n = len(keep)
+                cap = max(n, 1)
+                new = np.memmap(path, dtype="float32", mode="w+", shape=(cap, self.dim))
+                if n:
+                    new[:n] = src[np.asarray([r for _, r in keep], dtype="int64")]
+                new.flush(); del new
+                self._conn.executemany("DELETE FROM vectors WHERE key=?", [(k,) for k, _ in drop])
+                self._conn.executemany("UPDATE vectors SET row=? WHERE key=?", [(j, k) for j, (k, _) in enumerate(keep)])
+                self._set_meta("next_row", n)
+                self._set_meta("capacity", cap)
+                self._set_meta("generation", gen + 1)
+                self._mm = None
+                return gen, {"before": len(rows), "after": n, "evicted": len(drop)}
+            old_gen, out = self._txn(_rewrite)
+            try:   # 커밋 뒤 이전 파일 삭제(매핑 중인 다른 프로세스는 닫을 때까지 그대로 읽음)
+                self._file(old_gen).unlink()
+            except OSError:
+                pass
+            self.counters["compactions"] += 1
+        self._conn.execute("VACUUM")
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._flush_touch()
+            n, hits = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(hits),0) FROM vectors").fetchone()
+            path = self._file(self._meta("generation"))
+            out = {"model": self.model_id, "dim": self.dim, "rows": n, "capacity": self._meta("capacity"),
+                   "file_bytes": path.stat().st_size if path.exists() else 0,
+                   "stored_hits": hits}
+            out.update(self.counters)
+        looked = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / looked, 3) if looked else 0.0
+        return out
+
+_open_stores: "weakref.WeakSet[EmbedStore]" = weakref.WeakSet()
+
+@atexit.register
+def _flush_on_exit():
+    for st in list(_open_stores):
+        try:
+            st.flush()
+        except Exception:
+            pass
+
+_stores: Dict[str, EmbedStore] = {}
+_stores_lock = threading.Lock()
+
+def get_embed_store(model_id: str, dim: int) -> EmbedStore:
+    with _stores_lock:
+        st = _stores.get(model_id)
+        if st is None:
+            st = _stores[model_id] = EmbedStore(model_id, dim)
+    return st
+
+def embed_store_stats() -> Dict[str, Dict[str, Any]]:
+    with _stores_lock:
+        items = list(_stores.items())
+    return {k: v.stats() for k, v in items}
+
+def _open_existing(model_id: Optional[str]) -> List[EmbedStore]:
+    """CLI용: 디렉터리에 있는 저장소(또는 지정 모델) 열기. 차원은 meta에서 읽음."""
+    root = pathlib.Path(EMBED_STORE_DIR)
+    dirs = [root / _slug(model_id)] if model_id else sorted(p for p in root.glob("*") if (p / "index.sqlite3").exists())
+    out = []
+    for d in dirs:
+        if not (d / "index.sqlite3").exists():
+            continue
+        conn = sqlite3.connect(str(d / "index.sqlite3"))
+        dim = conn.execute("SELECT v FROM meta WHERE k='dim'").fetchone()[0]
+        conn.close()
+        out.append(EmbedStore(model_id or d.name, dim))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="임베딩 저장소 통계/압축")
+    ap.add_argument("cmd", choices=["stats", "compact"])
+    ap.add_argument("--model", default=None, help="모델 id (기본: 전체)")
+    ap.add_argument("--max-rows", type=int, default=EMBED_STORE_MAX_ROWS)
+    args = ap.parse_args()
+    stores = _open_existing(args.model)
+    if not stores:
+        raise SystemExit(f"{EMBED_STORE_DIR}에 저장소가 없습니다.")
+    for st in stores:
+        if args.cmd == "compact":
+            print(st.dir.name, st.compact(args.max_rows))
+        print(st.dir.name, st.stats())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# encoder_worker.py — 임베딩 인코딩 전용 스레드: 이벤트 루프를 막지 않고, 동시 요청은 묶어서(micro-batch) 한 번에 encode
+from __future__ import annotations
+import os, time, queue, asyncio, threading
+from typing import List, Dict, Any, Callable, Optional
+
+import numpy as np
+
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))   # 첫 요청 뒤 더 모으는 시간
+EMBED_MAX_BATCH       = int(os.getenv("EMBED_MAX_BATCH", "64"))          # 한 번에 encode할 텍스트 수 상한
+EMBED_QUEUE_MAX       = int(os.getenv("EMBED_QUEUE_MAX", "256"))         # 대기 요청 수 상한(넘으면 호출 측이 기다림)
+
+class _Job:
+    __slots__ = ("texts", "loop", "fut", "enq")
+    def __init__(self, texts: List[str], loop: asyncio.AbstractEventLoop, fut: asyncio.Future):
+        self.texts, self.loop, self.fut, self.enq = texts, loop, fut, time.perf_counter()
+
+def _resolve(fut: asyncio.Future, value=None, exc: Optional[BaseException] = None):
+    if fut.done():   # 호출 측이 취소함
+        return
+    if exc is not None: fut.set_exception(exc)
+    else:               fut.set_result(value)
+
+class EncoderWorker:
+    """
+    encode_fn(texts) -> (n, dim) float32 를 전용 데몬 스레드 하나에서만 실행.
+    - encode(texts): 큐(상한 EMBED_QUEUE_MAX)에 넣고 Future를 await. 큐가 차면 자리가 날 때까지 비동기로 대기(역압).
+    - 스레드는 첫 작업을 꺼낸 뒤 window_ms 동안(또는 max_batch개까지) 더 모아 중복 제거 후 encode 한 번.
+    - 결과는 각 요청의 루프에 call_soon_threadsafe로 전달 → 요청마다 다른 이벤트 루프(Django asyncio.run)여도 안전.
+    stats(): 요청/배치 수, 배치 크기(평균/최대), 큐 대기(ms 평균/최대), encode 시간, 역압 대기 횟수.
+    """
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], window_ms: float = EMBED_BATCH_WINDOW_MS,
+                 max_batch: int = EMBED_MAX_BATCH, queue_max: int = EMBED_QUEUE_MAX):
+        self.encode_fn = encode_fn
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self._q: "queue.Queue[_Job]" = queue.Queue(maxsize=max(1, queue_max))
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "texts": 0, "batches": 0, "batch_texts": 0, "max_batch": 0,
+                         "queue_wait_ms_total": 0.0, "max_queue_wait_ms": 0.0, "encode_ms_total": 0.0,
+                         "backpressure_waits": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._run, name="encoder-worker", daemon=True)
+        self._thread.start()
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        job = _Job(list(texts), loop, loop.create_future())
+        waited = False
+        while True:
+            try:
+                job.enq = time.perf_counter()
+                self._q.put_nowait(job)
+                break
+            except queue.Full:
+                waited = True
+                await asyncio.sleep(self.window or 0.001)
+        if waited:
+            with self._lock:
+                self.counters["backpressure_waits"] += 1
+        return await job.fut
+
+    def _collect(self) -> List[_Job]:
+        jobs = [self._q.get()]
+        n = len(jobs[0].texts)
+        deadline = time.perf_counter() + self.window
+        while n < self.max_batch:
+            left = deadline - time.perf_counter()
+            try:
+                job = self._q.get(timeout=left) if left > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            jobs.append(job)
+            n += len(job.texts)
+        return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            t0 = time.perf_counter()
+            uniq = list(dict.fromkeys(t for j in jobs for t in j.texts))
+            try:
+                vecs = self.encode_fn(uniq) if uniq else np.zeros((0, 0), dtype="float32")
+                err = None
+            except BaseException as e:
+                vecs, err = None, e
+            t1 = time.perf_counter()
+            pos = {t: i for i, t in enumerate(uniq)}
+            for j in jobs:
+                if err is None:
+                    out = vecs[[pos[t] for t in j.texts]] if j.texts else vecs[:0]
+                    args = (j.fut, out)
+                else:
+                    args = (j.fut, None, err)
+                try:
+                    j.loop.call_soon_threadsafe(_resolve, *args)
+                except RuntimeError:   # 호출 측 루프가 이미 닫힘
+                    pass
+            with self._lock:
+                c = self.counters
+                c["requests"] += len(jobs)
+                c["texts"] += sum(len(j.texts) for j in jobs)
+                c["batches"] += 1
+                c["batch_texts"] += len(uniq)
+                c["max_batch"] = max(c["max_batch"], len(uniq))
+                waits = [(t0 - j.enq) * 1000 for j in jobs]
+                c["queue_wait_ms_total"] += sum(waits)
+                c["max_queue_wait_ms"] = max(c["max_queue_wait_ms"], max(waits))
+                c["encode_ms_total"] += (t1 - t0) * 1000
+                c["errors"] += err is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+        b, r = c["batches"], c["requests"]
+        return {
+            "requests": r, "texts": c["texts"], "batches": b, "queue_depth": self._q.qsize(),
+            "avg_batch_texts": round(c["batch_texts"] / b, 2) if b else 0.0,
+            "avg_requests_per_batch": round(r / b, 2) if b else 0.0,
+            "max_batch_texts": c["max_batch"],
+            "avg_queue_wait_ms": round(c["queue_wait_ms_total"] / r, 2) if r else 0.0,
+            "max_queue_wait_ms": round(c["max_queue_wait_ms"], 2),
+            "avg_encode_ms": round(c["encode_ms_total"] / b, 2) if b else 0.0,
+            "backpressure_waits": c["backpressure_waits"], "errors": c["errors"],
+        }
+
+_worker: Optional[EncoderWorker] = None
+_worker_lock = threading.Lock()
+def get_encoder_worker(encode_fn: Callable[[List[str]], np.ndarray]) -> EncoderWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = EncoderWorker(encode_fn)
+    return _worker
+
+def encoder_stats() -> Dict[str, Any]:
+    return _worker.stats() if _worker is not None else {}
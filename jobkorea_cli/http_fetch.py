@@ -0,0 +1,116 @@
+# http_fetch.py — 잡코리아 검색/상세 페이지 HTTP 전용 수집(브라우저 없이, 서버 렌더 HTML 파싱)
+from __future__ import annotations
+import os, asyncio, weakref
+from contextlib import asynccontextmanager
+from typing import List, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser as HTMLParser, LexborNode as Node
+
+from .rate_limiter import get_limiter
+
+CRAWL_USER_AGENT = os.getenv(
+    "CRAWL_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+).strip()
+
+# ---------- HTTP ----------
+# llm.get_client와 같은 풀링 클라이언트. 단, httpx.AsyncClient는 생성된 이벤트 루프에 묶이므로
+# (Django 요청마다 asyncio.run → 루프가 매번 다름) 루프별로 하나씩 둔다.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def _headers():
+    return {
+        "User-Agent": CRAWL_USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.6",
+    }
+
+@asynccontextmanager
+async def get_client():
+    loop = asyncio.get_running_loop()
+    c = _clients.get(loop)
+    if c is None or c.is_closed:
+        c = httpx.AsyncClient(
+            headers=_headers(),
+            timeout=httpx.Timeout(connect=5, read=20, write=10, pool=30),
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=10),
+        )
+        _clients[loop] = c
+    yield c
+
+async def aclose_clients():
+    """
+    현재 루프의 클라이언트를 닫음. 루프를 버리기 직전(asyncio.run으로 돌린 코루틴 끝)에 호출 —
+    Django 요청마다 새 루프라 닫지 않으면 소켓/커넥션 풀이 GC 때까지 남고 httpx가 경고함.
+    공유 브라우저 서비스 루프처럼 계속 사는 루프에서는 부르지 않음(클라이언트 재사용).
+    """
+    c = _clients.pop(asyncio.get_running_loop(), None)
+    if c is not None and not c.is_closed:
+        await c.aclose()
+
+async def fetch_html(url: str) -> Optional[str]:
+    """
+    200 + HTML이면 본문, 아니면 None (호출 측에서 브라우저 폴백 판단).
+    호스트별 공유 리미터(rate_limiter.get_limiter)로 속도를 맞추고, 지연/429/5xx를 관측시켜 속도를 조절.
+    """
+    try:
+        async with get_limiter(urlsplit(url).netloc).slot() as slot, get_client() as c:
+            r = await c.get(url)
+            slot.status = r.status_code
+    except Exception:
+        return None
+    if r.status_code != 200 or "html" not in r.headers.get("content-type", "html"):
+        return None
+    return r.text
+
+# ---------- 검색 결과 카드 파싱 ----------
+# crawler_rolesearch._CARDS_JS와 같은 셀렉터 후보를 HTML에 그대로 적용.
+_CARD_TAGS = {"article", "li", "tr"}
+_CARD_CLASSES = {"list-item", "list-post", "post", "recruit-info"}
+_COMPANY_SELS  = [".post-list-corp .name", ".corp-name", ".company", ".name", "a[href*='/Recruit/Co_Read']"]
+_LOCATION_SELS = [".option .loc", ".loc", ".location", ".work-place"]
+_DEADLINE_SELS = [".option .date", ".date", ".deadline", ".exp"]
+
+def _text(n: Optional[Node]) -> str:
+    return " ".join((n.text(separator=" ") if n is not None else "").split())
+
+def _closest_card(a: Node) -> Optional[Node]:
+    n = a.parent
+    while n is not None and n.tag not in ("body", "html"):
+        if n.tag in _CARD_TAGS or _CARD_CLASSES & set((n.attributes.get("class") or "").split()):
+            return n
+        n = n.parent
+    return a.parent
+
+def _pick(card: Optional[Node], sels: List[str]) -> str:
+    if card is None:
+        return ""
+    for s in sels:
+        t = _text(card.css_first(s))
+        if t:
+            return t
+    return ""
+
+def raw_cards_from_html(html: str) -> List[Dict[str, str]]:
+    """
+    검색 결과 HTML → 앵커 단위 원시 카드 목록 {href, title, company, location, deadline}.
+    GI_Read 앵커가 하나도 없으면 [] (= 클라이언트 렌더링 페이지 → 브라우저 폴백 신호).
+    """
+    if not html:
+        return []
+    tree = HTMLParser(html)
+    out: List[Dict[str, str]] = []
+    for a in tree.css("a[href*='/Recruit/GI_Read/']"):
+        card = _closest_card(a)
+        out.append({
+            "href": a.attributes.get("href") or "",
+            "title": (a.attributes.get("title") or _text(a)).strip(),
+            "company": _pick(card, _COMPANY_SELS),
+            "location": _pick(card, _LOCATION_SELS),
+            "deadline": _pick(card, _DEADLINE_SELS),
+        })
+    return out
@@ -0,0 +1,101 @@
+# jd_extract.py — 상세 본문 수집 → pick_sections 정제 → embed_text 구성 (opt-in 단계)
+from __future__ import annotations
+import os, re, asyncio
+from typing import List, Optional, Callable, Awaitable
+
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
+
+from .models import PostingDoc
+from .posting_store import PostingStore
+from .textproc import pick_sections, keyword_windows
+
+JD_CONCURRENCY  = int(os.getenv("JD_CONCURRENCY", "4"))
+EMBED_TEXT_MAX  = int(os.getenv("EMBED_TEXT_MAX", "3000"))
+
+# 상세 본문 후보 영역(앞에서부터). 없으면 body 전체.
+_BODY_SELS = ["#detailArea", ".detailArea", ".devViewContents", ".recruitMent", ".tbDetail", "article", "main", "body"]
+_DROP_TAGS = ["script", "style", "noscript", "iframe", "svg", "header", "footer", "nav"]
+
+def detail_urls(doc: PostingDoc) -> List[str]:
+    """
+    잡코리아 상세 본문은 GI_Read 페이지 안 iframe(GI_Read_Comt_Ifrm)에 들어 있는 경우가 많아
+    iframe 주소를 먼저, 원래 상세 주소를 다음으로 시도.
+    """
+    urls = []
+    if doc.gi_no.isdigit():
+        urls.append(f"https://www.jobkorea.co.kr/Recruit/GI_Read_Comt_Ifrm?Gno={doc.gi_no}")
+    urls.append(doc.url)
+    return urls
+
+def html_to_text(html: str) -> str:
+    if not html:
+        return ""
+    tree = HTMLParser(html)
+    for tag in _DROP_TAGS:
+        for n in tree.css(tag):
+            n.decompose()
+    for sel in _BODY_SELS:
+        n = tree.css_first(sel)
+        if n is not None:
+            t = n.text(separator="\n")
+            t = re.sub(r"[ \t\r\f\v]+", " ", t)
+            t = re.sub(r"\n\s*\n+", "\n", t).strip()
+            if len(t) >= 50 or sel == "body":
+                return t
+    return ""
+
+def build_embed_text(doc: PostingDoc, body: str, skills: Optional[List[str]] = None) -> str:
+    """제목 + 섹션(jd_text) + 사용자 기술 키워드 주변 윈도우."""
+    parts = [doc.title or "", doc.jd_text or ""]
+    win = keyword_windows(body or doc.jd_text, skills or [])
+    if win:
+        parts.append(win)
+    return " ".join(p for p in parts if p).strip()[:EMBED_TEXT_MAX]
+
+class JDExtractor:
+    """
+    공고 상세 본문을 동시에(상한 concurrency) 받아 jd_text/embed_text를 채움.
+    요청 속도는 fetch_html 쪽 호스트별 리미터(rate_limiter.get_limiter)가 맞춤.
+    - 이미 jd_text가 있는 공고(저장소에서 온 것)는 다시 받지 않고 embed_text만 재구성.
+    - 처리 결과는 저장소에 기록 → 같은 공고는 한 번만 받음.
+    - fetch_html: url → HTML|None (crawler_rolesearch가 HTTP/브라우저 백엔드에 맞춰 넘겨줌)
+    """
+    def __init__(self, fetch_html: Callable[[str], Awaitable[Optional[str]]],
+                 skills: Optional[List[str]] = None, store: Optional[PostingStore] = None,
+                 concurrency: int = JD_CONCURRENCY):
+        self.fetch_html = fetch_html
+        self.skills = [s for s in (skills or []) if s]
+        self.store = store
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self.counts = {"fetched": 0, "reused": 0, "failed": 0}
+
+    async def _fetch_body(self, doc: PostingDoc) -> str:
+        async with self._sem:
+            for url in detail_urls(doc):
+                try:
+                    html = await self.fetch_html(url)
+                except Exception:
+                    html = None
+                text = html_to_text(html or "")
+                if text:
+                    return text
+        return ""
+
+    async def enrich(self, doc: PostingDoc) -> PostingDoc:
+        if doc.jd_text:
+            self.counts["reused"] += 1
+            doc.embed_text = build_embed_text(doc, "", self.skills)
+            return doc
+        body = await self._fetch_body(doc)
+        if not body:
+            self.counts["failed"] += 1
+            return doc
+        self.counts["fetched"] += 1
+        doc.jd_text = pick_sections(body)
+        doc.embed_text = build_embed_text(doc, body, self.skills)
+        if self.store is not None:
+            self.store.put(doc)
+        return doc
+
+    async def enrich_many(self, docs: List[PostingDoc]) -> List[PostingDoc]:
+        return list(await asyncio.gather(*[self.enrich(d) for d in docs]))
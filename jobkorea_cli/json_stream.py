@@ -0,0 +1,160 @@
+# json_stream.py — 스트리밍 LLM 출력용 단일 패스 증분 JSON 파서
+from __future__ import annotations
+import json
+from bisect import bisect_right
+from typing import List, Dict, Any, Tuple, Optional
+
+Event = Tuple[str, str, Any]   # ("item", key, value) | ("field", key, value)
+
+def find_json_block(s: str) -> Optional[str]:
+    """
+    문자열 안의 첫 균형 잡힌 {...} / [...] 블록. 한 번만 훑음(O(n)).
+    여는 괄호 위치를 스택에 쌓고, 짝이 맞아 스택이 비면 그 블록을 반환.
+    끝까지 닫히지 않으면(잘린 응답) 안쪽에서 닫힌 블록 중 가장 앞선 것.
+    """
+    if not s: return None
+    stack: List[Tuple[str, int]] = []
+    in_str = esc = False
+    best: Optional[Tuple[int, int]] = None
+    for j, c in enumerate(s):
+        if in_str:
+            if esc: esc = False
+            elif c == "\\": esc = True
+            elif c == '"': in_str = False
+            continue
+        if c == '"':
+            if stack: in_str = True   # 블록 밖의 따옴표는 무시(설명 문장 등)
+        elif c in "{[":
+            stack.append((c, j))
+        elif c in "}]" and stack:
+            top, start = stack[-1]
+            if (top == "{" and c == "}") or (top == "[" and c == "]"):
+                stack.pop()
+                if not stack:
+                    return s[start:j + 1]
+                if best is None or start < best[0]:
+                    best = (start, j + 1)
+    return s[best[0]:best[1]] if best else None
+
+class IncrementalJSONParser:
+    """
+    조각(chunk)으로 들어오는 텍스트에서 최상위 JSON 객체를 한 번만 훑으며 파싱.
+    - 최상위 필드 값이 끝나는 즉시 ("field", key, value)
+    - 최상위 필드가 배열이면 원소가 끝날 때마다 ("item", key, value)  (예: expanded_roles 한 개씩)
+    첫 '{' 이전의 텍스트(```json 등)는 건너뛰고, 최상위 객체가 닫히면 done=True.
+    조각은 리스트로만 모으고 새 조각만 훑음 — 누적 문자열을 매번 다시 만들지 않으므로 전체 O(n).
+    """
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._starts: List[int] = []   # 각 조각의 전체 기준 시작 위치
+        self._n = 0                    # 지금까지 받은 전체 길이
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._i = 0
+        self._stack: List[str] = []
+        self._in_str = self._esc = False
+        self._mode = ""              # 최상위 객체 안: "key" → "colon" → "value"
+        self._key: Optional[str] = None
+        self._key_start = self._val_start = self._item_start = -1
+        self._in_array = False       # 현재 최상위 필드 값이 배열인지
+
+    @property
+    def buf(self) -> str:
+        """지금까지 받은 전체 텍스트. 합친 결과를 한 조각으로 접어 둠."""
+        if len(self._chunks) > 1:
+            self._chunks, self._starts = ["".join(self._chunks)], [0]
+        return self._chunks[0] if self._chunks else ""
+
+    def _slice(self, a: int, b: int) -> str:
+        """전체 기준 [a, b) 구간 — 걸친 조각만 합침."""
+        if a >= b: return ""
+        ia = bisect_right(self._starts, a) - 1
+        ib = bisect_right(self._starts, b - 1) - 1
+        base = self._starts[ia]
+        return "".join(self._chunks[ia:ib + 1])[a - base:b - base]
+
+    def _emit_item(self, end: int, out: List[Event]):
+        raw = self._slice(self._item_start, end).strip()
+        if raw:
+            try: out.append(("item", self._key, json.loads(raw)))
+            except ValueError: pass
+
+    def _emit_field(self, end: int, out: List[Event]):
+        raw = self._slice(self._val_start, end).strip()
+        try:
+            v = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[self._key] = v
+        out.append(("field", self._key, v))
+
+    def feed(self, chunk: str) -> List[Event]:
+        out: List[Event] = []
+        if not chunk:
+            return out
+        self._chunks.append(chunk); self._starts.append(self._n)
+        base, i = self._n, self._i
+        self._n = n = base + len(chunk)
+        stack = self._stack
+        while i < n and not self.done:
+            c = chunk[i - base]
+            if self._in_str:
+                if self._esc: self._esc = False
+                elif c == "\\": self._esc = True
+                elif c == '"':
+                    self._in_str = False
+                    if len(stack) == 1 and self._mode == "key":
+                        self._key = json.loads(self._slice(self._key_start, i + 1))
+                        self._mode = "colon"
+                i += 1
+                continue
+            depth = len(stack)
+            if c == '"':
+                if depth:
+                    self._in_str = True
+                    if depth == 1 and self._mode == "key":
+                        self._key_start = i
+            elif c in "{[":
+                if depth == 0:
+                    if c == "{":
+                        stack.append(c); self._mode = "key"
+                else:
+                    if depth == 1 and self._mode == "value" and c == "[" and not self._slice(self._val_start, i).strip():
+                        self._in_array = True
+                        self._item_start = i + 1
+                    stack.append(c)
+            elif c in "}]":
+                if depth:
+                    if depth == 2 and self._in_array and c == "]":
+                        self._emit_item(i, out)
+                    stack.pop()
+                    if depth == 1:
+                        if self._mode == "value":
+                            self._emit_field(i, out)
+                        self.done = True
+            elif c == ":" and depth == 1 and self._mode == "colon":
+                self._mode = "value"
+                self._val_start = i + 1
+                self._in_array = False
+            elif c == ",":
+                if depth == 1 and self._mode == "value":
+                    self._emit_field(i, out)
+                    self._mode = "key"
+                elif depth == 2 and self._in_array:
+                    self._emit_item(i, out)
+                    self._item_start = i + 1
+            i += 1
+        self._i = i
+        return out
+
+    def result(self) -> Dict[str, Any]:
+        """닫힌 객체 전체. 최상위 객체가 끝나지 않았으면(잘린 응답) 그때까지 완성된 필드."""
+        if self.done:
+            blk = find_json_block(self.buf)
+            try:
+                v = json.loads(blk) if blk else None
+                if isinstance(v, dict):
+                    return v
+            except ValueError:
+                pass
+        return dict(self.fields)
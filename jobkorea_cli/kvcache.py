@@ -0,0 +1,139 @@
+# kvcache.py — 메모리 LRU + 디스크(SQLite) 2단 key/value 캐시
+from __future__ import annotations
+import time, sqlite3, pathlib, threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+class TwoTierCache:
+    """
+    문자열 key → 문자열 value 캐시.
+    - 1단: 프로세스 내 LRU(OrderedDict). 항목 수/바이트 상한.
+    - 2단: SQLite 파일 하나(WAL). 항목 수/바이트 상한, last_access 기준 LRU 축출.
+    - 항목마다 만료시각을 저장하므로 set() 호출 측에서 TTL을 다르게 줄 수 있음.
+    - 조회는 메모리 → 디스크 순. 디스크 적중은 메모리로 끌어올림.
+    """
+    def __init__(self, path: str, ttl_sec: int = 3600,
+                 max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 mem_max_entries: int = 512, mem_max_bytes: int = 8 * 1024 * 1024,
+                 table: str = "kv"):
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_entries, self.max_bytes = max_entries, max_bytes
+        self.mem_max_entries, self.mem_max_bytes = mem_max_entries, mem_max_bytes
+        self.table = table
+
+        self._mem: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()  # key → (value, expires_at, size)
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key         TEXT PRIMARY KEY,
+                value       TEXT NOT NULL,
+                expires_at  REAL NOT NULL,
+                size        INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_lru ON {table}(last_access)")
+        self.counters = {"mem_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0,
+                         "mem_evictions": 0, "disk_evictions": 0, "expired": 0}
+
+    # ---- 메모리 단 ----
+    def _mem_put(self, key: str, value: str, expires_at: float, size: int):
+        old = self._mem.pop(key, None)
+        if old: self._mem_bytes -= old[2]
+        if size > self.mem_max_bytes:
+            return
+        self._mem[key] = (value, expires_at, size)
+        self._mem_bytes += size
+        while self._mem and (len(self._mem) > self.mem_max_entries or self._mem_bytes > self.mem_max_bytes):
+            _, (_, _, sz) = self._mem.popitem(last=False)
+            self._mem_bytes -= sz
+            self.counters["mem_evictions"] += 1
+
+    def _mem_drop(self, key: str):
+        old = self._mem.pop(key, None)
+        if old: self._mem_bytes -= old[2]
+
+    # ---- 디스크 단 ----
+    def _disk_evict(self):
+        n, total = self._conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size),0) FROM {self.table}").fetchone()
+        if n <= self.max_entries and total <= self.max_bytes:
+            return
+        self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time(),))
+        for key, sz in self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY last_access ASC"
+        ).fetchall():
+            if n <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key=?", (key,))
+            n -= 1; total -= sz
+            self.counters["disk_evictions"] += 1
+
+    # ---- 공개 API ----
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                if hit[1] >= now:
+                    self._mem.move_to_end(key)
+                    self.counters["mem_hits"] += 1
+                    return hit[0]
+                self._mem_drop(key)
+
+            row = self._conn.execute(
+                f"SELECT value, expires_at, size FROM {self.table} WHERE key=?", (key,)
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            value, expires_at, size = row
+            if expires_at < now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key=?", (key,))
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET last_access=? WHERE key=?", (now, key))
+            self._mem_put(key, value, expires_at, size)
+            self.counters["disk_hits"] += 1
+            return value
+
+    def set(self, key: str, value: str, ttl_sec: Optional[int] = None):
+        now = time.time()
+        expires_at = now + (self.ttl_sec if ttl_sec is None else ttl_sec)
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            # 한 문장 upsert = 원자적 쓰기(중간 상태가 보이지 않음)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, size, last_access) VALUES (?,?,?,?,?)",
+                (key, value, expires_at, size, now),
+            )
+            self._mem_put(key, value, expires_at, size)
+            self.counters["sets"] += 1
+            self._disk_evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._mem_drop(key)
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key=?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear(); self._mem_bytes = 0
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size),0) FROM {self.table}"
+            ).fetchone()
+            out = dict(self.counters)
+            out.update({"mem_entries": len(self._mem), "mem_bytes": self._mem_bytes,
+                        "disk_entries": n, "disk_bytes": total})
+        lookups = out["mem_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = round((out["mem_hits"] + out["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return out
@@ -1,8 +1,9 @@
 # llm.py — OpenAI LLM(파싱/질문/매핑) + 로컬 임베딩 + expanded_roles 강화
 from __future__ import annotations
-import os, sys, json, hashlib, pathlib, time, re
+import os, sys, json, re, asyncio, threading
+import concurrent.futures
 from contextlib import asynccontextmanager
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 
 import httpx
 import numpy as np
@@ -15,19 +16,30 @@ if __package__ in (None, ""):
 
 from .prompts import (
     PARSE_SYS,
+    PARSE_PARTIAL_SYS,
     ASK_REQUIRED_BATCH_SYS,
     ASK_OPTIONAL_BATCH_SYS,
     MAP_SYS,
+    MAP_STREAM_SYS,
+    PARSE_MAP_SYS,
     PROJECT_KEYWORD_SYS,
 )
-from .models import Spec, AskTurn
+from .models import Spec, AskTurn, merge_spec
+from .spec_rules import SPEC_RULES, extract_spec, record_outcome
+from .embed_store import EMBED_STORE, get_embed_store
+from .encoder_worker import get_encoder_worker
+from .semantic_cache import SEMANTIC_CACHE, get_semantic_cache, spec_text, guard_key
+from .rate_limiter import get_limiter, OPENAI_HOST
+from .admission import get_admission, estimate_tokens, retry_after_sec, backoff_sec, LLM_MAX_RETRIES
+from . import llm_cache
+from .json_stream import IncrementalJSONParser, find_json_block
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY","").strip()
 OPENAI_MODEL   = os.getenv("OPENAI_MODEL","gpt-4o-mini").strip()
 
-EMBED_BACKEND  = os.getenv("EMBED_BACKEND","local").strip().lower()
+EMBED_BACKEND  = os.getenv("EMBED_BACKEND","local").strip().lower()   # local(SentenceTransformer) | onnx(onnx_embed)
 EMBED_MODEL_ID = os.getenv("EMBED_MODEL","intfloat/multilingual-e5-base").strip()
 ALLOW_TRUST_REMOTE_CODE = os.getenv("ALLOW_TRUST_REMOTE_CODE","0")=="1"
 
@@ -36,8 +48,6 @@ PROJECT_KEYWORD_TOPK   = int(os.getenv("PROJECT_KEYWORD_TOPK","12"))
 
 CHAT_URL  = "https://api.openai.com/v1/chat/completions"
 
-CACHE_DIR = pathlib.Path(".cache_llm"); CACHE_DIR.mkdir(exist_ok=True)
-
 # ---------- HTTP ----------
 _client: Optional[httpx.AsyncClient] = None
 def _headers():
@@ -58,46 +68,19 @@ async def get_client():
     yield _client
 
 # ---------- Cache ----------
-def _cache_key(prefix: str, payload: dict) -> pathlib.Path:
-    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
-    h = hashlib.sha1(raw).hexdigest()
-    return CACHE_DIR / f"{prefix}-{h}.json"
-def _cache_get(p: pathlib.Path, ttl_sec: int) -> Optional[str]:
-    try:
-        if not p.exists(): return None
-        if ttl_sec and (time.time() - p.stat().st_mtime) > ttl_sec: return None
-        return p.read_text(encoding="utf-8")
-    except Exception:
-        return None
-def _cache_set(p: pathlib.Path, content: str):
-    try: p.write_text(content, encoding="utf-8")
+# 메모리 LRU + SQLite 한 파일(llm_cache). TTL은 prefix별 정책(llm_cache.LLM_CACHE_TTLS).
+def _cache_key(prefix: str, payload: dict) -> str:
+    return llm_cache.cache_key(prefix, payload)
+def _cache_get(key: str) -> Optional[str]:
+    try: return llm_cache.get(key)
+    except Exception: return None
+def _cache_set(key: str, content: str):
+    try: llm_cache.put(key, content)
     except Exception: pass
 
 # ---------- JSON-safe ----------
-def _find_json_block(s: str) -> Optional[str]:
-    if not s: return None
-    n=len(s); i=0
-    while i<n:
-        ch=s[i]
-        if ch not in "{[}":
-            i+=1; continue
-        stack=[ch]; j=i+1; in_str=False; esc=False
-        while j<n and stack:
-            c=s[j]
-            if in_str:
-                if esc: esc=False
-                elif c=="\\": esc=True
-                elif c=='"': in_str=False
-            else:
-                if c=='"': in_str=True
-                elif c in "{[": stack.append(c)
-                elif c in "}]":
-                    top=stack[-1]
-                    if (top=="{" and c=="}") or (top=="[" and c=="]"): stack.pop()
-            j+=1
-        if not stack: return s[i:j]
-        i+=1
-    return None
+# 한 번만 훑는 O(n) 구현(json_stream.find_json_block). 예전 구현은 여는 괄호마다 다시 훑어 최악 O(n^2).
+_find_json_block = find_json_block
 def _safe_json_loads(s: str, default):
     if not s: return default
     try:
@@ -111,57 +94,293 @@ def _safe_json_loads(s: str, default):
     return default
 
 # ---------- Chat ----------
-async def call_llm(messages: List[Dict[str,str]], temperature: Optional[float]=None) -> str:
-    if not OPENAI_API_KEY:
-        raise RuntimeError("OPENAI_API_KEY가 필요합니다 (.env).")
-    payload={"model":OPENAI_MODEL,"messages":messages}
-    if temperature is not None and temperature!=1:
-        payload["temperature"]=temperature
-    ck=_cache_key("chat", payload)
-    cached=_cache_get(ck, ttl_sec=180)
-    if cached is not None: return cached
-    async with get_client() as c:
+async def _post_chat(payload: dict) -> httpx.Response:
+    """OpenAI 호스트 공유 리미터(AIMD) 아래에서 POST. 지연/429/5xx가 다음 요청 속도에 반영됨."""
+    async with get_limiter(OPENAI_HOST).slot() as slot, get_client() as c:
         r=await c.post(CHAT_URL,json=payload)
-    if r.status_code>=400:
+        slot.status=r.status_code
+    return r
+
+async def _admitted_chat(payload: dict) -> httpx.Response:
+    """
+    모델별 TPM/RPM 입장 제어(admission) 후 POST.
+    - 429: Retry-After(없으면 지수 백오프) 동안 해당 모델 입장을 멈추고 LLM_MAX_RETRIES회까지 재시도
+    - 그 밖의 4xx/5xx: temperature를 빼고 한 번 재시도(기존 동작)
+    - 응답 usage.total_tokens로 예산 추정치를 정정
+    """
+    adm=get_admission(payload["model"])
+    est=estimate_tokens(payload["messages"])
+    retried_plain=False
+    for attempt in range(LLM_MAX_RETRIES+1):
+        ticket=await adm.acquire(est)
+        try:
+            r=await _post_chat(payload)
+        except BaseException:
+            adm.settle(ticket, 0)
+            raise
+        usage=None
+        if r.status_code<400:
+            try: usage=(r.json().get("usage") or {}).get("total_tokens")
+            except Exception: usage=None
+        adm.settle(ticket, usage if usage is not None else (est if r.status_code<400 else 0))
+        retry, retried_plain=_should_retry(adm, r, attempt, payload, retried_plain)
+        if not retry:
+            return r
+    return r
+
+def _should_retry(adm, r: httpx.Response, attempt: int, payload: dict, retried_plain: bool) -> Tuple[bool, bool]:
+    """(재시도 여부, retried_plain). 429는 Retry-After만큼 입장 중지, 그 밖의 오류는 temperature 없이 한 번."""
+    if r.status_code==429 and attempt<LLM_MAX_RETRIES:
+        wait=retry_after_sec(r.headers)
+        adm.pause(wait if wait is not None else backoff_sec(attempt))
+        return True, retried_plain
+    if r.status_code>=400 and r.status_code!=429 and not retried_plain:
         payload.pop("temperature", None)
-        async with get_client() as c:
-            r=await c.post(CHAT_URL,json=payload)
-        if r.status_code>=400:
-            try:
-                data=r.json(); msg=data.get("error",{}).get("message") or data
-            except Exception:
-                msg=r.text
-            raise httpx.HTTPStatusError(f"{r.status_code} {r.reason_phrase}: {msg}", request=r.request, response=r)
+        return True, True
+    return False, retried_plain
+
+def _raise_for_status(r: httpx.Response):
+    if r.status_code<400:
+        return
+    try:
+        data=r.json(); msg=data.get("error",{}).get("message") or data
+    except Exception:
+        msg=r.text
+    raise httpx.HTTPStatusError(f"{r.status_code} {r.reason_phrase}: {msg}", request=r.request, response=r)
+
+async def _stream_chat(payload: dict) -> AsyncIterator[str]:
+    """
+    stream=True 요청의 SSE(data: {...}) 본문에서 content 조각을 순서대로 내보냄.
+    입장 제어/리미터/재시도 규칙은 _admitted_chat과 같음(본문을 받기 전 상태코드로 판단).
+    리미터 slot(AIMD 지연 표본)은 응답 헤더를 받을 때까지만 — 소비 측이 조각 사이에 머무는 시간
+    (느린 SSE 클라이언트 등)이 호스트 속도 조절에 섞이지 않도록 yield 동안은 잡지 않음.
+    마지막 청크의 usage(stream_options.include_usage)로 토큰 추정치를 정정.
+    """
+    adm=get_admission(payload["model"])
+    est=estimate_tokens(payload["messages"])
+    retried_plain=False
+    for attempt in range(LLM_MAX_RETRIES+1):
+        ticket=await adm.acquire(est)
+        usage=None
+        try:
+            async with get_client() as c:
+                async with get_limiter(OPENAI_HOST).slot() as slot:
+                    r=await c.send(c.build_request("POST", CHAT_URL, json=payload), stream=True)
+                    slot.status=r.status_code
+                try:
+                    if r.status_code>=400:
+                        await r.aread()
+                    else:
+                        async for line in r.aiter_lines():
+                            if not line.startswith("data:"): continue
+                            data=line[5:].strip()
+                            if data=="[DONE]": break
+                            try: ev=json.loads(data)
+                            except ValueError: continue
+                            if ev.get("usage"):
+                                usage=ev["usage"].get("total_tokens")
+                            for ch in ev.get("choices") or []:
+                                piece=(ch.get("delta") or {}).get("content")
+                                if piece: yield piece
+                finally:
+                    await r.aclose()
+        except BaseException:
+            adm.settle(ticket, usage or 0)
+            raise
+        adm.settle(ticket, usage if usage is not None else (est if r.status_code<400 else 0))
+        if r.status_code<400:
+            return
+        retry, retried_plain=_should_retry(adm, r, attempt, payload, retried_plain)
+        if not retry:
+            break
+    _raise_for_status(r)
+
+async def _chat_uncached(payload: dict, ck: str) -> str:
+    r=await _admitted_chat(payload)
+    _raise_for_status(r)
     out=r.json()["choices"][0]["message"]["content"]
     _cache_set(ck,out)
     return out
 
+# ---------- Single-flight ----------
+# 같은 캐시 키로 동시에 들어온 호출은 첫 호출(leader)의 요청 하나만 보내고 결과/예외를 함께 받음.
+# 호출마다 이벤트 루프가 다를 수 있어(Django asyncio.run) concurrent.futures.Future + threading.Lock 사용.
+_inflight: Dict[str, concurrent.futures.Future] = {}
+_inflight_lock = threading.Lock()
+_RETRY = object()   # leader가 취소됨 → 대기자는 다시 시도(그중 하나가 새 leader)
+
+def _finish_inflight(ck: str, fut: concurrent.futures.Future, result: Any=None, exc: Optional[BaseException]=None):
+    # 먼저 빼고 알림 → 깨어난 대기자가 옛 항목을 다시 잡지 않음
+    with _inflight_lock:
+        _inflight.pop(ck, None)
+    if exc is not None: fut.set_exception(exc)
+    else: fut.set_result(result)
+
+def _chat_payload(messages: List[Dict[str,str]], temperature: Optional[float],
+                  response_format: Optional[dict]) -> dict:
+    payload={"model":OPENAI_MODEL,"messages":messages}
+    if temperature is not None and temperature!=1:
+        payload["temperature"]=temperature
+    if response_format:
+        payload["response_format"]=response_format
+    return payload
+
+async def call_llm(messages: List[Dict[str,str]], temperature: Optional[float]=None,
+                   cache_prefix: str="chat", response_format: Optional[dict]=None) -> str:
+    """
+    cache_prefix: 캐시 TTL 정책 구분(parse_spec/map_filters는 chat보다 오래 보관).
+    response_format: 예) {"type": "json_object"} — JSON 출력 강제(structured output).
+    """
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY가 필요합니다 (.env).")
+    payload=_chat_payload(messages, temperature, response_format)
+    ck=_cache_key(cache_prefix, payload)
+    cached=_cache_get(ck)
+    if cached is not None: return cached
+
+    while True:
+        with _inflight_lock:
+            # leader는 캐시에 쓴 뒤 항목을 빼므로, 방금 빠졌다면 락 안에서 다시 보면 캐시에 있음
+            cached=_cache_get(ck)
+            if cached is not None: return cached
+            fut=_inflight.get(ck)
+            leader=fut is None
+            if leader:
+                fut=_inflight[ck]=concurrent.futures.Future()
+        if leader:
+            break
+        llm_cache.count_coalesced(cache_prefix)
+        # shield: 대기자 한 명이 취소돼도 공유 future는 취소하지 않음
+        out=await asyncio.shield(asyncio.wrap_future(fut))
+        if out is not _RETRY:
+            return out
+    try:
+        out=await _chat_uncached(payload, ck)
+    except (asyncio.CancelledError, GeneratorExit):
+        # leader 자신의 취소(클라이언트 끊김 등)를 대기자에게 전파하지 않음
+        _finish_inflight(ck, fut, _RETRY)
+        raise
+    except BaseException as e:
+        _finish_inflight(ck, fut, exc=e)
+        raise
+    _finish_inflight(ck, fut, out)
+    return out
+
+async def stream_llm(messages: List[Dict[str,str]], temperature: Optional[float]=None,
+                     cache_prefix: str="chat", response_format: Optional[dict]=None) -> AsyncIterator[str]:
+    """
+    call_llm의 스트리밍판: 응답 조각을 받는 대로 내보냄. 캐시 키는 call_llm과 같아 서로의 결과를 재사용.
+    캐시 적중이면 전체를 한 조각으로 내보냄. (동시 중복 요청 합류는 call_llm만 지원)
+    """
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY가 필요합니다 (.env).")
+    payload=_chat_payload(messages, temperature, response_format)
+    ck=_cache_key(cache_prefix, payload)
+    cached=_cache_get(ck)
+    if cached is not None:
+        yield cached
+        return
+    parts: List[str]=[]
+    async for piece in _stream_chat({**payload, "stream": True, "stream_options": {"include_usage": True}}):
+        parts.append(piece)
+        yield piece
+    _cache_set(ck, "".join(parts))
+
 # ---------- Embedding (local only) ----------
 _local_model=None
+_local_model_lock=threading.Lock()   # 인코더 스레드와 to_thread가 동시에 처음 불러도 한 번만 로드
 def _get_local_model():
+    """EMBED_BACKEND에 맞는 인코더. 둘 다 encode(texts, batch_size, normalize_embeddings, ...) 계약을 따름."""
     global _local_model
-    if _local_model is None:
-        from sentence_transformers import SentenceTransformer
-        extra={}
-        if ALLOW_TRUST_REMOTE_CODE: extra["trust_remote_code"]=True
-        _local_model=SentenceTransformer(EMBED_MODEL_ID, **extra)
+    with _local_model_lock:
+        if _local_model is None:
+            if EMBED_BACKEND=="onnx":
+                from .onnx_embed import get_onnx_encoder
+                _local_model=get_onnx_encoder(EMBED_MODEL_ID)
+            else:
+                from sentence_transformers import SentenceTransformer
+                extra={}
+                if ALLOW_TRUST_REMOTE_CODE: extra["trust_remote_code"]=True
+                _local_model=SentenceTransformer(EMBED_MODEL_ID, **extra)
     return _local_model
 
-async def embed_texts(texts: List[str]) -> np.ndarray:
-    if EMBED_BACKEND!="local":
-        raise RuntimeError("임베딩은 로컬(EMBED_BACKEND=local)만 지원합니다.")
-    model=_get_local_model()
+def _embed_model_key() -> str:
+    """임베딩 저장소 키: 백엔드/양자화가 다르면 벡터가 조금씩 달라 따로 저장."""
+    if EMBED_BACKEND=="onnx":
+        from .onnx_embed import EMBED_ONNX_QUANT
+        return f"{EMBED_MODEL_ID}#onnx-{EMBED_ONNX_QUANT}"
+    return EMBED_MODEL_ID
+
+def _encode(model, texts: List[str]) -> np.ndarray:
     emb=model.encode(texts, batch_size=32, normalize_embeddings=True, show_progress_bar=False)
     vecs=emb.astype("float32"); faiss.normalize_L2(vecs); return vecs
 
+def _encode_local(texts: List[str]) -> np.ndarray:
+    return _encode(_get_local_model(), texts)
+
+async def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    인코딩은 전용 스레드(encoder_worker)에서: 이벤트 루프를 막지 않고, 동시에 들어온 요청은 한 번의 encode로 묶음.
+    EMBED_STORE=1이면 저장소(embed_store)에 없는 텍스트만 중복 없이 모아 인코딩하고 결과를 저장(조회/저장도 스레드에서).
+    """
+    if EMBED_BACKEND not in ("local", "onnx"):
+        raise RuntimeError("임베딩은 로컬(EMBED_BACKEND=local|onnx)만 지원합니다.")
+    worker=get_encoder_worker(_encode_local)
+    if not EMBED_STORE or not texts:
+        return await worker.encode(texts)
+    # 모델 로딩과 저장소 I/O(SQLite 트랜잭션, 파일 확장, mmap flush)는 모두 루프 밖 스레드에서
+    model=await asyncio.to_thread(_get_local_model)
+    store=await asyncio.to_thread(get_embed_store, _embed_model_key(), model.get_sentence_embedding_dimension())
+    vecs, missing=await asyncio.to_thread(store.lookup, texts)
+    if missing:
+        todo=list(dict.fromkeys(texts[i] for i in missing))
+        new=await worker.encode(todo)
+        await asyncio.to_thread(store.put, todo, new)
+        pos={t: j for j, t in enumerate(todo)}
+        for i in missing:
+            vecs[i]=new[pos[texts[i]]]
+    return vecs
+
 # ---------- LLM-derived ----------
-async def parse_spec(user_text: str) -> Spec:
+async def _parse_spec_llm(user_text: str) -> Spec:
     out=await call_llm(
         [{"role":"system","content":PARSE_SYS},
-         {"role":"user","content":user_text}]
+         {"role":"user","content":user_text}],
+        cache_prefix="parse_spec"
     )
     return Spec(**_safe_json_loads(out, default={}))
 
+def _only_fields(data: Dict[str,Any], fields: List[str]) -> Dict[str,Any]:
+    out={f: data[f] for f in fields if "." not in f and f in data}
+    if "career.level" in fields and isinstance(data.get("career"), dict):
+        out["career"]={"level": data["career"].get("level")}
+    return out
+
+async def parse_spec(user_text: str) -> Spec:
+    """
+    SPEC_RULES=1(opt-in)이면 로컬 사전 추출(spec_rules)을 먼저 하고,
+    설명되지 않은 내용이 없으면 LLM을 건너뜀. 남으면 확신이 낮은 필드만 LLM에 물어 병합.
+    """
+    if not SPEC_RULES:
+        return await _parse_spec_llm(user_text)
+    rs=extract_spec(user_text)
+    if not rs.needs_llm:
+        record_outcome(rs)
+        return rs.spec
+    fields=rs.unresolved
+    known=rs.spec.model_dump(exclude_defaults=True)
+    out=await call_llm(
+        [{"role":"system","content":PARSE_PARTIAL_SYS},
+         {"role":"user","content":json.dumps({"text": user_text, "fields": fields, "known": known}, ensure_ascii=False)}],
+        cache_prefix="parse_spec"
+    )
+    record_outcome(rs, llm_fields=len(fields))
+    try:
+        upd=Spec(**_only_fields(_safe_json_loads(out, default={}), fields))
+    except ValueError:   # pydantic ValidationError 포함
+        return rs.spec
+    return merge_spec(rs.spec, upd)
+
 _DEF_OPTS = {
     "location": ["서울","경기","인천","부산","대구","광주","대전","세종","울산","무관","모름"],
     "education": ["고졸","초대졸","대졸(4년)","석사","박사","무관","모름"],
@@ -199,7 +418,8 @@ async def ask_required_batch(current: Spec, missing: List[str]) -> List[AskTurn]
     try:
         out=await call_llm(
             [{"role":"system","content":ASK_REQUIRED_BATCH_SYS},
-             {"role":"user","content":json.dumps({"current": current.model_dump(), "missing": missing}, ensure_ascii=False)}]
+             {"role":"user","content":json.dumps({"current": current.model_dump(), "missing": missing}, ensure_ascii=False)}],
+            cache_prefix="ask"
         )
         data=_safe_json_loads(out, default=None)
         turns: List[AskTurn]=[]
@@ -225,7 +445,8 @@ async def ask_optional_batch(current: Dict[str, Any], limit: int = 5, exclude: O
     payload={"current": current, "limit": limit, "exclude": exclude or []}
     out=await call_llm(
         [{"role":"system","content":ASK_OPTIONAL_BATCH_SYS},
-         {"role":"user","content":json.dumps(payload, ensure_ascii=False)}]
+         {"role":"user","content":json.dumps(payload, ensure_ascii=False)}],
+        cache_prefix="ask"
     )
     data=_safe_json_loads(out, default=[])
     arr=data if isinstance(data,list) else [data]
@@ -236,13 +457,44 @@ async def ask_optional_batch(current: Dict[str, Any], limit: int = 5, exclude: O
         for d in (arr[:limit] if arr else [])
     ]
 
+async def _semantic_get(current: Spec) -> Tuple[Optional[Dict[str, Any]], Optional[tuple]]:
+    """
+    SEMANTIC_CACHE=1이면 정규화 스펙 텍스트 → (정확 일치 | 임베딩 최근접) 순으로 이전 map_filters 결과 조회.
+    반환: (적중 결과 또는 None, 미스일 때 _semantic_put에 넘길 (text, guard, vec))
+    """
+    if not SEMANTIC_CACHE:
+        return None, None
+    sc=get_semantic_cache()
+    text, guard=spec_text(current), guard_key(current)
+    hit=sc.lookup_exact(text, guard)
+    if hit is not None:
+        return hit, None
+    try:
+        vec=(await embed_texts([f"query: {text}"]))[0]   # e5: 대칭 비교는 양쪽 모두 query: 접두어
+    except Exception:   # 임베딩 모델을 못 쓰면 의미 캐시 없이 진행
+        return None, None
+    hit, _=sc.lookup(vec, guard)
+    return hit, (None if hit is not None else (text, guard, vec))
+
+def _semantic_put(ctx: Optional[tuple], res: Dict[str, Any]):
+    if ctx and (res.get("expanded_roles") or res.get("duty")):   # 빈 매핑은 재사용하지 않음
+        text, guard, vec=ctx
+        get_semantic_cache().put(text, guard, vec, res)
+
 async def map_filters(current: Spec) -> Dict[str, Any]:
+    hit, ctx=await _semantic_get(current)
+    if hit is not None:
+        return hit
     out=await call_llm(
         [{"role":"system","content":MAP_SYS},
-         {"role":"user","content":json.dumps(current.model_dump(), ensure_ascii=False)}]
+         {"role":"user","content":json.dumps(current.model_dump(), ensure_ascii=False)}],
+        cache_prefix="map_filters"
     )
-    res=_safe_json_loads(out, default={})
+    res=_finish_map_filters(_safe_json_loads(out, default={}), current)
+    _semantic_put(ctx, res)
+    return res
 
+def _finish_map_filters(res: Dict[str, Any], current: Spec) -> Dict[str, Any]:
     # 산업 콤마 보정
     ind=res.get("industry")
     if isinstance(ind,str) and "," in ind:
@@ -258,6 +510,113 @@ async def map_filters(current: Spec) -> Dict[str, Any]:
     res.setdefault("expanded_roles", [])
     return res
 
+async def iter_map_filters(current: Spec) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    map_filters의 스트리밍판.
+    - ("role", 역할): expanded_roles 원소가 완성되는 즉시 (MAP_STREAM_SYS가 expanded_roles를 맨 앞에 출력하게 함)
+    - ("done", res): 전체 결과(map_filters와 같은 보정 적용)
+    → 모델이 나머지 필드를 쓰는 동안 첫 역할부터 크롤을 시작할 수 있음.
+    """
+    hit, ctx=await _semantic_get(current)
+    if hit is not None:
+        for r in hit.get("expanded_roles") or []:
+            yield "role", r
+        yield "done", hit
+        return
+    p=IncrementalJSONParser()
+    async for piece in stream_llm(
+        [{"role":"system","content":MAP_STREAM_SYS},
+         {"role":"user","content":json.dumps(current.model_dump(), ensure_ascii=False)}],
+        cache_prefix="map_filters"
+    ):
+        for kind, key, val in p.feed(piece):
+            if kind=="item" and key=="expanded_roles" and isinstance(val, str) and val.strip():
+                yield "role", val.strip()
+    res=p.result() if p.done else _safe_json_loads(p.buf, default=p.result())
+    res=_finish_map_filters(res if isinstance(res, dict) else {}, current)
+    _semantic_put(ctx, res)
+    yield "done", res
+
+# ---------- Parse + Map (단일 호출) ----------
+SPEC_MAP_MODE = os.getenv("SPEC_MAP_MODE","two_call").strip().lower()   # "two_call" | "combined"
+_JSON_OBJECT = {"type": "json_object"}
+
+def _parse_map_messages(user_text: str) -> List[Dict[str,str]]:
+    return [{"role":"system","content":PARSE_MAP_SYS},
+            {"role":"user","content":user_text}]
+
+_SPEC_LIST_FIELDS=("skills","keywords","certifications","company_types")
+
+def _coerce_spec(d: Dict[str,Any]) -> Dict[str,Any]:
+    """
+    그럴듯하지만 타입이 어긋난 모델 출력을 Spec에 맞게 정리:
+    리스트 필드의 문자열 → 쉼표로 나눈 리스트, career 문자열 → {"level": ...}, 숫자 → 문자열.
+    """
+    out=dict(d)
+    for f in _SPEC_LIST_FIELDS:
+        v=out.get(f)
+        if isinstance(v, str):
+            out[f]=[x.strip() for x in re.split(r"[,/·]", v) if x.strip()]
+        elif isinstance(v, list):
+            out[f]=[str(x) for x in v if x is not None and not isinstance(x, (dict, list))]
+        elif v is not None:
+            out.pop(f)
+    c=out.get("career")
+    if isinstance(c, (str, int, float)):
+        out["career"]={"level": str(c)}
+    elif c is not None and not isinstance(c, dict):
+        out.pop("career")
+    for k, v in list(out.items()):
+        if k not in _SPEC_LIST_FIELDS and k!="career" and isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[k]=str(v)
+    return out
+
+def _split_parse_map(data: Any) -> Optional[Tuple[Spec, Dict[str, Any]]]:
+    """(Spec, applied). 정리 후에도 Spec 검증에 실패하면 None → 호출 측이 두 번 호출 경로로 대체."""
+    data=data if isinstance(data, dict) else {}
+    try:
+        spec=Spec(**_coerce_spec(data.get("spec") if isinstance(data.get("spec"), dict) else {}))
+    except ValueError:   # pydantic ValidationError 포함
+        return None
+    filters=data.get("filters") if isinstance(data.get("filters"), dict) else {}
+    filters["expanded_roles"]=data.get("expanded_roles") or filters.get("expanded_roles") or []
+    return spec, _finish_map_filters(filters, spec)
+
+async def parse_and_map(user_text: str) -> Tuple[Spec, Dict[str, Any]]:
+    """
+    parse_spec + map_filters를 한 번의 호출로(PARSE_MAP_SYS, JSON 출력 강제).
+    반환 형태는 두 번 호출한 것과 같음: (Spec, applied filters). 두 번 호출 경로도 그대로 유지.
+    spec을 쓸 수 없는 응답이면 두 번 호출 경로로 대체(단일 호출이 더 약하지 않도록).
+    """
+    out=await call_llm(_parse_map_messages(user_text), cache_prefix="parse_map", response_format=_JSON_OBJECT)
+    res=_split_parse_map(_safe_json_loads(out, default={}))
+    if res is None:
+        spec=await parse_spec(user_text)
+        return spec, await map_filters(spec)
+    return res
+
+async def iter_parse_and_map(user_text: str) -> AsyncIterator[Tuple[str, Any]]:
+    """parse_and_map의 스트리밍판. ("role", 역할)… 후 ("done", (Spec, applied)). iter_map_filters와 같은 이벤트 형태."""
+    p=IncrementalJSONParser()
+    async for piece in stream_llm(_parse_map_messages(user_text), cache_prefix="parse_map", response_format=_JSON_OBJECT):
+        for kind, key, val in p.feed(piece):
+            if kind=="item" and key=="expanded_roles" and isinstance(val, str) and val.strip():
+                yield "role", val.strip()
+    res=_split_parse_map(p.result() if p.done else _safe_json_loads(p.buf, default=p.result()))
+    if res is not None:
+        yield "done", res
+        return
+    spec=await parse_spec(user_text)
+    async for kind, val in iter_map_filters(spec):
+        yield (kind, val) if kind=="role" else ("done", (spec, val))
+
+async def spec_and_filters(user_text: str, mode: Optional[str]=None) -> Tuple[Spec, Dict[str, Any]]:
+    """mode(기본 SPEC_MAP_MODE)에 따라 단일 호출 또는 parse_spec → map_filters."""
+    if (mode or SPEC_MAP_MODE)=="combined":
+        return await parse_and_map(user_text)
+    spec=await parse_spec(user_text)
+    return spec, await map_filters(spec)
+
 # ---------- Query builder ----------
 def build_query_text(spec: Spec, applied: Dict[str,Any]|None=None) -> str:
     """
@@ -329,7 +688,8 @@ async def extract_project_keywords(project_text: str) -> dict:
     out = await call_llm(
         [{"role":"system","content":PROJECT_KEYWORD_SYS},
          {"role":"user","content":project_text}],
-        temperature=None
+        temperature=None,
+        cache_prefix="project_keywords"
     )
     data = _safe_json_loads(out, default={"roles":[], "skills":[], "domains":[]})
 
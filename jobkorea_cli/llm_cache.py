@@ -0,0 +1,73 @@
+# llm_cache.py — LLM 응답 캐시 (메모리 LRU + 디스크), prefix별 TTL 정책
+from __future__ import annotations
+import os, json, hashlib, threading
+from typing import Dict, Any, Optional
+
+from .kvcache import TwoTierCache
+
+LLM_CACHE_DB        = os.getenv("LLM_CACHE_DB", ".cache_llm/llm.sqlite3")
+LLM_CACHE_MAX_ITEMS = int(os.getenv("LLM_CACHE_MAX_ITEMS", "20000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LLM_CACHE_MEM_ITEMS = int(os.getenv("LLM_CACHE_MEM_ITEMS", "512"))
+LLM_CACHE_MEM_BYTES = int(os.getenv("LLM_CACHE_MEM_BYTES", str(8 * 1024 * 1024)))
+
+# prefix → TTL(초). 같은 입력이면 결과가 거의 바뀌지 않는 파싱/매핑은 길게, 일반 대화는 짧게.
+# 환경변수 LLM_CACHE_TTL_<PREFIX> (예: LLM_CACHE_TTL_PARSE_SPEC=3600)로 덮어씀.
+_DEFAULT_TTLS = {
+    "chat": 180,
+    "parse_spec": 24 * 3600,
+    "map_filters": 24 * 3600,
+    "parse_map": 24 * 3600,
+    "ask": 3600,
+    "project_keywords": 24 * 3600,
+}
+LLM_CACHE_TTLS: Dict[str, int] = {
+    k: int(os.getenv(f"LLM_CACHE_TTL_{k.upper()}", str(v))) for k, v in _DEFAULT_TTLS.items()
+}
+
+def ttl_for(prefix: str) -> int:
+    return LLM_CACHE_TTLS.get(prefix, LLM_CACHE_TTLS["chat"])
+
+def cache_key(prefix: str, payload: dict) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return f"{prefix}:{hashlib.sha1(raw).hexdigest()}"
+
+_cache: Optional[TwoTierCache] = None
+_cache_lock = threading.Lock()
+def get_llm_cache() -> TwoTierCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TwoTierCache(
+                LLM_CACHE_DB, ttl_sec=LLM_CACHE_TTLS["chat"],
+                max_entries=LLM_CACHE_MAX_ITEMS, max_bytes=LLM_CACHE_MAX_BYTES,
+                mem_max_entries=LLM_CACHE_MEM_ITEMS, mem_max_bytes=LLM_CACHE_MEM_BYTES,
+                table="llm_responses",
+            )
+    return _cache
+
+# prefix별 적중/미스/합류(전체 카운터는 TwoTierCache.stats)
+# coalesced: 캐시 미스였지만 진행 중인 같은 요청에 합류해 HTTP 호출을 하지 않은 횟수(llm.call_llm)
+_by_prefix: Dict[str, Dict[str, int]] = {}
+def _count(prefix: str, kind: str):
+    with _cache_lock:
+        c = _by_prefix.setdefault(prefix, {"hits": 0, "misses": 0, "coalesced": 0})
+        c[kind] += 1
+
+def count_coalesced(prefix: str):
+    _count(prefix, "coalesced")
+
+def get(key: str) -> Optional[str]:
+    out = get_llm_cache().get(key)
+    _count(key.split(":", 1)[0], "hits" if out is not None else "misses")
+    return out
+
+def put(key: str, value: str):
+    get_llm_cache().set(key, value, ttl_sec=ttl_for(key.split(":", 1)[0]))
+
+def llm_cache_stats() -> Dict[str, Any]:
+    out = get_llm_cache().stats()
+    with _cache_lock:
+        out["by_prefix"] = {k: dict(v) for k, v in _by_prefix.items()}
+        out["coalesced"] = sum(v["coalesced"] for v in _by_prefix.values())
+    return out
@@ -10,6 +10,9 @@ class PostingDoc(BaseModel):
     gi_no: str
     title: str
     url: str
+    company: str = ""
+    location: str = ""
+    deadline: str = ""
     jd_text: str = ""
     embed_text: str = ""
     score: Optional[float] = None
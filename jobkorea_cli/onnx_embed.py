@@ -0,0 +1,139 @@
+# onnx_embed.py — e5 임베딩 모델의 ONNX Runtime(CPU) 백엔드 (EMBED_BACKEND=onnx), 내보내기/양자화 도구
+#   python -m jobkorea_cli.onnx_embed export [--quant int8|fp16|fp32] [--model ID] [--out DIR]
+# 필요 패키지: onnxruntime, tokenizers (내보내기에는 추가로 torch, transformers, onnx) — requirements.txt에 명시
+from __future__ import annotations
+import os, re, argparse, pathlib, threading
+from typing import List, Optional
+
+import numpy as np
+
+EMBED_ONNX_DIR     = os.getenv("EMBED_ONNX_DIR", ".cache_embed/onnx")
+EMBED_ONNX_QUANT   = os.getenv("EMBED_ONNX_QUANT", "int8").strip().lower()   # int8 | fp16 | fp32
+EMBED_ONNX_THREADS = int(os.getenv("EMBED_ONNX_THREADS", "0"))               # 0이면 onnxruntime 기본값
+EMBED_MAX_LENGTH   = int(os.getenv("EMBED_MAX_LENGTH", "512"))
+
+_QUANTS = ("int8", "fp16", "fp32")
+
+def model_dir(model_id: str, root: str = EMBED_ONNX_DIR) -> pathlib.Path:
+    return pathlib.Path(root) / re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id).strip("_")
+
+def model_file(model_id: str, quant: str = EMBED_ONNX_QUANT, root: str = EMBED_ONNX_DIR) -> pathlib.Path:
+    return model_dir(model_id, root) / f"model_{quant}.onnx"
+
+class OnnxEncoder:
+    """
+    SentenceTransformer.encode와 같은 계약: (n, dim) float32, mean pooling(attention mask) 후 L2 정규화.
+    - 배치 안 패딩을 줄이려고 길이순으로 정렬해 batch_size씩 돌리고 원래 순서로 되돌림
+    - 토크나이저는 tokenizers(tokenizer.json)만 사용 → transformers/torch 없이 동작
+    """
+    def __init__(self, model_id: str, quant: str = EMBED_ONNX_QUANT, root: str = EMBED_ONNX_DIR,
+                 threads: int = EMBED_ONNX_THREADS, max_length: int = EMBED_MAX_LENGTH):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        path = model_file(model_id, quant, root)
+        if not path.exists():
+            raise RuntimeError(f"ONNX 모델이 없습니다: {path} — 먼저 `python -m jobkorea_cli.onnx_embed export --quant {quant}`")
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(path), opts, providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(str(path.parent / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.no_padding()
+        self.model_id, self.quant = model_id, quant
+        self._dim: Optional[int] = None
+
+    def _batch(self, texts: List[str]) -> np.ndarray:
+        encs = self.tokenizer.encode_batch(texts)
+        width = max(len(e.ids) for e in encs)
+        ids = np.zeros((len(encs), width), dtype="int64")
+        mask = np.zeros((len(encs), width), dtype="int64")
+        for r, e in enumerate(encs):
+            ids[r, :len(e.ids)] = e.ids
+            mask[r, :len(e.ids)] = 1
+        feed = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feed["token_type_ids"] = np.zeros_like(ids)
+        hidden = self.session.run(None, feed)[0].astype("float32")   # (b, t, d); fp16 모델도 float32로
+        m = mask[..., None].astype("float32")
+        return (hidden * m).sum(axis=1) / np.clip(m.sum(axis=1), 1e-9, None)
+
+    def encode(self, texts: List[str], batch_size: int = 32, normalize_embeddings: bool = True,
+               show_progress_bar: bool = False) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype="float32")
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = np.empty((len(texts), 0), dtype="float32")
+        for s in range(0, len(order), batch_size):
+            idx = order[s:s + batch_size]
+            vecs = self._batch([texts[i] for i in idx])
+            if out.shape[1] == 0:
+                out = np.empty((len(texts), vecs.shape[1]), dtype="float32")
+            out[idx] = vecs
+        if normalize_embeddings:
+            out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dim is None:
+            d = self.session.get_outputs()[0].shape[-1]
+            self._dim = d if isinstance(d, int) else self._batch(["a"]).shape[1]
+        return self._dim
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+def get_onnx_encoder(model_id: str, quant: str = EMBED_ONNX_QUANT) -> OnnxEncoder:
+    with _encoders_lock:
+        enc = _encoders.get((model_id, quant))
+        if enc is None:
+            enc = _encoders[(model_id, quant)] = OnnxEncoder(model_id, quant)
+    return enc
+
+# ---------- 내보내기 / 양자화 ----------
+def export(model_id: str, quant: str = EMBED_ONNX_QUANT, root: str = EMBED_ONNX_DIR, opset: int = 17) -> pathlib.Path:
+    """
+    HF 모델 → model_fp32.onnx(+tokenizer.json) → quant에 맞게 변환.
+    int8: onnxruntime 동적 양자화(가중치 int8, CPU용). fp16: 가중치/연산 fp16(입출력은 그대로).
+    """
+    if quant not in _QUANTS:
+        raise ValueError(f"quant는 {_QUANTS} 중 하나: {quant}")
+    out_dir = model_dir(model_id, root)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fp32 = model_file(model_id, "fp32", root)
+    if not fp32.exists():
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+        tok = AutoTokenizer.from_pretrained(model_id)
+        tok.save_pretrained(str(out_dir))   # tokenizer.json 포함(fast tokenizer)
+        model = AutoModel.from_pretrained(model_id).eval()
+        sample = tok(["query: 파이썬 백엔드 개발자"], return_tensors="pt")
+        names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+        axes = {n: {0: "batch", 1: "seq"} for n in names}
+        axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+        with torch.no_grad():
+            torch.onnx.export(model, tuple(sample[n] for n in names), str(fp32), input_names=names,
+                              output_names=["last_hidden_state"], dynamic_axes=axes, opset_version=opset)
+    target = model_file(model_id, quant, root)
+    if quant == "int8" and not target.exists():
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(str(fp32), str(target), weight_type=QuantType.QInt8)
+    elif quant == "fp16" and not target.exists():
+        import onnx
+        from onnxruntime.transformers.float16 import convert_float_to_float16
+        onnx.save(convert_float_to_float16(onnx.load(str(fp32)), keep_io_types=True), str(target))
+    return target
+
+def main():
+    ap = argparse.ArgumentParser(description="e5 임베딩 모델 ONNX 내보내기/양자화")
+    ap.add_argument("cmd", choices=["export"])
+    ap.add_argument("--model", default=os.getenv("EMBED_MODEL", "intfloat/multilingual-e5-base").strip())
+    ap.add_argument("--quant", default=EMBED_ONNX_QUANT, choices=_QUANTS)
+    ap.add_argument("--out", default=EMBED_ONNX_DIR)
+    args = ap.parse_args()
+    path = export(args.model, args.quant, args.out)
+    print(f"{path} ({path.stat().st_size / 2**20:.1f}MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# pipeline.py — 추측 크롤: LLM(parse_spec → map_filters)과 크롤을 겹쳐 실행
+from __future__ import annotations
+import os, time, asyncio
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Callable
+
+from .models import Spec, PostingDoc
+from .spec_rules import provisional_roles
+from .search_cache import normalize_role_kw
+from .crawler_rolesearch import CrawlSession
+from .posting_index import POSTING_RERANK, rerank_grouped
+from .ranking import HYBRID_RANK, rank_grouped
+from .llm import parse_spec, map_filters, iter_map_filters, parse_and_map, iter_parse_and_map, SPEC_MAP_MODE
+
+SPECULATIVE_CRAWL     = os.getenv("SPECULATIVE_CRAWL","0")=="1"   # opt-in: 빗나간 추측 역할만큼 크롤 요청이 늘어나므로 기본은 끔
+SPECULATIVE_MAX_ROLES = int(os.getenv("SPECULATIVE_MAX_ROLES", "3"))
+MAP_STREAM            = os.getenv("MAP_STREAM","0")=="1"   # opt-in: map_filters를 스트리밍으로 받아 확정 역할부터 바로 크롤
+
+class SpeculativeCrawl:
+    """
+    역할들을 하나의 CrawlSession(같은 _CrawlRun/page 풀/브라우저)에 필요할 때마다 얹음.
+    - start(text): 잠정 역할로 즉시 크롤 시작(추측)
+    - confirm(role): 확정된 역할(스트리밍 map_filters에서 먼저 나온 것)을 바로 시작
+    - reconcile(final_roles): 최종 역할에 없는 추측은 취소, 없던 역할은 새로 시작, 전부 기다려 반환
+    역할 간 gi_no 중복 제거와 동시성 상한(concurrency)은 세션 전체에 한 번만 적용됨.
+    stats: speculative/hits/wasted/cancelled/hit_rate/early_started/llm_ms/latency_saved_ms/elapsed_ms/crawl
+    """
+    def __init__(self, per_role: int = 2, **crawl_kwargs):
+        self.session = CrawlSession(per_role, **crawl_kwargs)
+        self.t0 = time.perf_counter()
+        self.llm_done: Optional[float] = None
+        self._tasks: Dict[str, Tuple[str, asyncio.Future, float]] = {}   # norm → (role, future, started)
+        self._speculative: List[str] = []
+        self._finished: Dict[str, float] = {}
+        self.stats: Dict[str, Any] = {}
+
+    def _launch(self, role: str) -> bool:
+        k = normalize_role_kw(role)
+        if not k or k in self._tasks:
+            return False
+        fut = self.session.add(role)
+        fut.add_done_callback(lambda _f, k=k: self._finished.setdefault(k, time.perf_counter()))
+        self._tasks[k] = (role, fut, time.perf_counter())
+        return True
+
+    def start(self, user_text: str) -> "SpeculativeCrawl":
+        for r in provisional_roles(user_text, SPECULATIVE_MAX_ROLES):
+            if self._launch(r):
+                self._speculative.append(normalize_role_kw(r))
+        return self
+
+    def confirm(self, role: str):
+        if self.llm_done is None and self._launch(role):
+            self.stats["early_started"] = self.stats.get("early_started", 0) + 1
+
+    def mark_llm_done(self):
+        if self.llm_done is None:
+            self.llm_done = time.perf_counter()
+
+    async def cancel(self):
+        for _, f, _ in self._tasks.values():
+            f.cancel()
+        await self.session.aclose()
+
+    async def reconcile(self, final_roles: List[str]) -> Dict[str, List[PostingDoc]]:
+        self.mark_llm_done()
+        final = [r.strip() for r in final_roles or [] if r and r.strip()]
+        wanted = {normalize_role_kw(r) for r in final}
+
+        wasted = [k for k in self._speculative if k not in wanted]
+        cancelled = []
+        for k in wasted:
+            _, f, _ = self._tasks.pop(k)
+            if not f.done():
+                f.cancel(); cancelled.append(f)
+        await asyncio.gather(*cancelled, return_exceptions=True)
+
+        for r in final:
+            self._launch(r)
+
+        grouped: Dict[str, List[PostingDoc]] = {}
+        try:
+            outs = await asyncio.gather(*[self._tasks[normalize_role_kw(r)][1] for r in final])
+        finally:
+            crawl_stats: Dict[str, Any] = {}
+            await self.session.aclose(crawl_stats)
+        for r, (docs, _) in zip(final, outs):
+            grouped.setdefault(r, docs)
+
+        # 최종 역할 중 LLM이 끝나기 전에 시작된 크롤이 겹쳐 돈 시간 = 줄어든 대기 시간(병렬이라 최댓값)
+        overlap = {}
+        for k, (role, _, started) in self._tasks.items():
+            if k in wanted and started < self.llm_done:
+                overlap[role] = round((min(self.llm_done, self._finished.get(k, self.llm_done)) - started) * 1000, 1)
+        hits = [k for k in self._speculative if k in wanted]
+        self.stats.update({
+            "speculative": list(self._speculative),
+            "hits": hits,
+            "wasted": wasted,
+            "cancelled": len(cancelled),
+            "hit_rate": round(len(hits) / len(self._speculative), 3) if self._speculative else 0.0,
+            "early_started": self.stats.get("early_started", 0),
+            "llm_ms": round((self.llm_done - self.t0) * 1000, 1),
+            "overlap_ms": overlap,
+            "latency_saved_ms": max(overlap.values(), default=0.0),
+            "elapsed_ms": round((time.perf_counter() - self.t0) * 1000, 1),
+            "crawl": crawl_stats,
+        })
+        return grouped
+
+async def _spec_map_events(user_text: str, mode: str, stream_map: bool) -> AsyncIterator[Tuple[str, Any]]:
+    """LLM 단계를 모드와 무관하게 ("role", 역할)… ("done", (spec, applied)) 이벤트로 통일."""
+    if mode == "combined":
+        if stream_map:
+            async for ev in iter_parse_and_map(user_text):
+                yield ev
+        else:
+            yield "done", await parse_and_map(user_text)
+        return
+    spec = await parse_spec(user_text)
+    if stream_map:
+        async for kind, val in iter_map_filters(spec):
+            yield (kind, val) if kind == "role" else ("done", (spec, val))
+    else:
+        yield "done", (spec, await map_filters(spec))
+
+async def _run_speculative(sc: SpeculativeCrawl, user_text: str, speculate: bool, stream_map: bool, mode: str,
+                           on_event: Optional[Callable[[str, Any], None]] = None
+                           ) -> Tuple[Spec, Dict[str, Any], Dict[str, List[PostingDoc]]]:
+    """speculative_search/iter_speculative_search 공통 본체. on_event("role", 역할) / ("roles", 최종 역할 목록)."""
+    if speculate:
+        sc.start(user_text)
+    try:
+        spec, applied = Spec(), {}
+        async for kind, val in _spec_map_events(user_text, mode, stream_map):
+            if kind == "role":
+                sc.confirm(val)
+                if on_event is not None:
+                    on_event("role", val)
+            else:
+                spec, applied = val
+                if on_event is not None:
+                    on_event("roles", list(applied.get("expanded_roles") or []))
+        grouped = await sc.reconcile(applied.get("expanded_roles") or [])
+        if HYBRID_RANK:
+            grouped = await rank_grouped(spec, grouped, applied.get("expanded_keywords"))
+        elif POSTING_RERANK:
+            grouped = await rerank_grouped(spec, grouped)
+    except BaseException:
+        await sc.cancel()
+        raise
+    return spec, applied, grouped
+
+async def speculative_search(user_text: str, per_role: int = 2, stats: Optional[Dict[str, Any]] = None,
+                             speculate: Optional[bool] = None, stream_map: Optional[bool] = None,
+                             mode: Optional[str] = None, **crawl_kwargs) -> Tuple[Spec, Dict[str, Any], Dict[str, List[PostingDoc]]]:
+    """
+    parse_spec → map_filters → 크롤을 순서대로 기다리지 않고 겹쳐 실행.
+    1) 원문에서 잠정 역할(provisional_roles)로 즉시 크롤 시작 (speculate, 기본 SPECULATIVE_CRAWL)
+    2) parse_spec 후 map_filters를 스트리밍(stream_map, 기본 MAP_STREAM)으로 받아 expanded_roles가 하나 나올 때마다 크롤 시작
+    3) 최종 expanded_roles로 정리: 빗나간 추측은 취소, 빠진 역할은 추가
+    4) 역할별 결과 재정렬(PostingDoc.score): HYBRID_RANK=1(opt-in)이면 BM25(+POSTING_RERANK면 임베딩) 하이브리드와
+       Spec 기반 완화 필터(어긋난 공고는 RANK_FILTER에 따라 뒤로/제외), 아니고 POSTING_RERANK=1이면 임베딩 유사도만
+    mode(기본 SPEC_MAP_MODE)="combined"이면 1)과 함께 parse_and_map 단일 호출(스트리밍 가능)로 2)를 대신함.
+    반환: (spec, applied, {role_kw: [PostingDoc, ...]})  — stats에 적중률/절약 시간 등(SpeculativeCrawl 참고)
+    """
+    speculate = SPECULATIVE_CRAWL if speculate is None else speculate
+    stream_map = MAP_STREAM if stream_map is None else stream_map
+    sc = SpeculativeCrawl(per_role, **crawl_kwargs)
+    spec, applied, grouped = await _run_speculative(sc, user_text, speculate, stream_map, mode or SPEC_MAP_MODE)
+    if stats is not None:
+        stats.update(sc.stats)
+    return spec, applied, grouped
+
+async def iter_speculative_search(user_text: str, per_role: int = 2, stats: Optional[Dict[str, Any]] = None,
+                                  speculate: Optional[bool] = None, stream_map: Optional[bool] = None,
+                                  mode: Optional[str] = None, **crawl_kwargs) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    speculative_search의 스트리밍 버전(같은 파이프라인, 같은 최종 결과). 이벤트:
+    - ("role", 역할): 역할 확정 — 스트리밍 map_filters에서 나오는 즉시, 아니면 LLM 완료 시
+    - ("posting", (역할, PostingDoc)): 확정된 역할의 공고가 수집되는 대로. 확정 전에 도착한 추측 크롤 결과는
+      확정 순간 한꺼번에 내보내고, 빗나간 추측 역할의 공고는 내보내지 않음
+    - ("done", (spec, applied, grouped)): speculative_search 반환값과 같음(랭킹/재정렬 반영된 최종 순서)
+    소비를 멈추면(aclose) LLM 호출과 남은 크롤을 취소함.
+    """
+    speculate = SPECULATIVE_CRAWL if speculate is None else speculate
+    stream_map = MAP_STREAM if stream_map is None else stream_map
+    loop = asyncio.get_running_loop()
+    q: asyncio.Queue = asyncio.Queue()
+    end = object()
+
+    def _emit(role_kw: str, doc: PostingDoc):
+        # 공유 브라우저 스레드에서 불릴 수 있으므로 호출 측 루프로 넘김
+        loop.call_soon_threadsafe(q.put_nowait, ("posting", role_kw, doc))
+
+    sc = SpeculativeCrawl(per_role, on_result=_emit, **crawl_kwargs)
+    task = asyncio.ensure_future(_run_speculative(sc, user_text, speculate, stream_map, mode or SPEC_MAP_MODE,
+                                                  lambda kind, val: q.put_nowait((kind, val, None))))
+    task.add_done_callback(lambda _: loop.call_soon_threadsafe(q.put_nowait, end))
+    shown: Dict[str, str] = {}                   # norm → 화면에 내보낸 역할명
+    held: Dict[str, List[PostingDoc]] = {}       # 아직 확정되지 않은 역할의 공고
+
+    def _show(role: str) -> List[Tuple[str, Any]]:
+        k = normalize_role_kw(role)
+        if not k or k in shown:
+            return []
+        shown[k] = role
+        return [("role", role)] + [("posting", (role, d)) for d in held.pop(k, [])]
+
+    try:
+        while True:
+            item = await q.get()
+            if item is end:
+                break
+            kind, a, b = item
+            if kind == "posting":
+                k = normalize_role_kw(a)
+                if k in shown:
+                    yield "posting", (shown[k], b)
+                else:
+                    held.setdefault(k, []).append(b)
+                continue
+            for ev in _show(a) if kind == "role" else [e for r in a for e in _show(r)]:
+                yield ev
+        spec, applied, grouped = await task   # 예외 전파
+    finally:
+        if not task.done():
+            task.cancel()
+            try: await task
+            except BaseException: pass
+    if stats is not None:
+        stats.update(sc.stats)
+    yield "done", (spec, applied, grouped)
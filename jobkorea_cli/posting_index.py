@@ -0,0 +1,290 @@
+# posting_index.py — 공고 임베딩 FAISS 인덱스 (gi_no 단위 추가/삭제, 저장/로드, top-k, 재정렬)
+from __future__ import annotations
+import os, json, atexit, hashlib, pathlib, threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import faiss
+
+from .models import Spec, PostingDoc
+
+POSTING_INDEX_PATH   = os.getenv("POSTING_INDEX_PATH", ".cache_crawl/postings.faiss")
+POSTING_INDEX_TYPE   = os.getenv("POSTING_INDEX_TYPE", "flat").strip().lower()   # "flat" | "ivf"
+POSTING_INDEX_NLIST  = int(os.getenv("POSTING_INDEX_NLIST", "1024"))   # ivf 클러스터 수 상한(데이터가 적으면 줄임)
+POSTING_INDEX_NPROBE = int(os.getenv("POSTING_INDEX_NPROBE", "16"))
+POSTING_RERANK       = os.getenv("POSTING_RERANK","0")=="1"   # 크롤 결과를 스펙 유사도로 재정렬(임베딩 모델 필요)
+POSTING_INDEX_SAVE_SEC = float(os.getenv("POSTING_INDEX_SAVE_SEC", "10"))   # 추가 후 저장까지 모으는 시간
+
+_ID_MASK = (1 << 62) - 1
+
+def gi_id(gi_no: str) -> int:
+    """gi_no → int64 id. 숫자면 그대로, 아니면 sha1 앞 62비트."""
+    if gi_no.isdigit() and int(gi_no) <= _ID_MASK:
+        return int(gi_no)
+    return int(hashlib.sha1(gi_no.encode("utf-8")).hexdigest()[:16], 16) & _ID_MASK
+
+def posting_text(doc: PostingDoc) -> str:
+    """e5 문서 쪽 입력: embed_text(jd_extract)가 있으면 그것, 없으면 제목 + 회사 + 본문."""
+    body = doc.embed_text or " ".join(p for p in (doc.title, doc.company, doc.jd_text) if p)
+    return f"passage: {body}"
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def spec_query_text(spec: Spec) -> str:
+    from .semantic_cache import spec_text
+    return f"query: {spec_text(spec)}"
+
+class PostingIndex:
+    """
+    정규화 벡터의 내적(=코사인) 인덱스. id = gi_id(gi_no).
+    - flat: IndexIDMap2(IndexFlatIP) — 정확, 학습 불필요
+    - ivf : IndexIVFFlat(nlist, nprobe) — 첫 add 때 그 배치로 학습(nlist는 데이터 수에 맞춰 줄임),
+            커지면 다시 학습(_maybe_retrain). id는 역리스트에 직접 저장, reconstruct용 Hashtable direct map
+    add는 upsert(같은 gi_no는 지우고 다시 넣음). gi_no마다 임베딩한 텍스트의 해시를 같이 두어
+    본문(jd_text/embed_text)이 생기거나 바뀌면 다시 임베딩(needs). threading.Lock으로 보호.
+    저장은 save_later()로 모아서 별도 스레드에서(요청마다 전체를 다시 쓰지 않음).
+    """
+    def __init__(self, dim: int, kind: str = POSTING_INDEX_TYPE,
+                 nlist: int = POSTING_INDEX_NLIST, nprobe: int = POSTING_INDEX_NPROBE):
+        if kind not in ("flat", "ivf"):
+            raise ValueError(f"지원하지 않는 인덱스 종류: {kind}")
+        self.dim, self.kind, self.nlist, self.nprobe = int(dim), kind, nlist, nprobe
+        self.lock = threading.Lock()
+        self.gi_nos: Dict[int, str] = {}
+        self.hashes: Dict[int, str] = {}   # id → 임베딩한 텍스트 해시
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim)) if kind == "flat" else None
+        self.path = POSTING_INDEX_PATH
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()   # 파일 쓰기 직렬화(타이머/atexit 동시 진입)
+
+    def _ensure_ivf(self, vecs: np.ndarray):
+        if self.index is not None:
+            self._maybe_retrain(len(vecs))
+            return
+        nlist = max(1, min(self.nlist, len(vecs) // 39))   # faiss 권장: 클러스터당 학습 점 39개 이상
+        quantizer = faiss.IndexFlatIP(self.dim)
+        ivf = faiss.IndexIVFFlat(quantizer, self.dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        if len(vecs) > nlist * 64:   # k-means 학습은 표본으로(클러스터당 64점이면 충분)
+            vecs = vecs[np.random.default_rng(0).choice(len(vecs), nlist * 64, replace=False)]
+        ivf.train(vecs)
+        ivf.nprobe = min(self.nprobe, nlist)
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+        self.index = ivf
+
+    def _maybe_retrain(self, adding: int):
+        """작은 배치로 학습된 ivf가 4배 넘게 커지면 전체 벡터로 nlist를 키워 다시 학습(증가분 기준 분할상환)."""
+        cur = self.index.nlist
+        n = len(self.gi_nos) + adding
+        if cur >= self.nlist or n < cur * 39 * 4 or not self.gi_nos:
+            return
+        ids = np.fromiter(self.gi_nos, dtype="int64", count=len(self.gi_nos))
+        vecs = np.stack([self.index.reconstruct(int(i)) for i in ids])
+        self.index = None
+        self._ensure_ivf(vecs)
+        self.index.add_with_ids(vecs, ids)
+
+    def __len__(self) -> int:
+        return len(self.gi_nos)
+
+    def add(self, gi_nos: List[str], vecs: np.ndarray, hashes: Optional[List[str]] = None):
+        vecs = np.ascontiguousarray(vecs, dtype="float32").reshape(-1, self.dim)
+        if not len(gi_nos):
+            return
+        uniq = {gi_id(g): (g, i) for i, g in enumerate(gi_nos)}   # 같은 배치 안 중복은 마지막 것
+        ids = np.fromiter(uniq, dtype="int64", count=len(uniq))
+        vecs = vecs[[i for _, i in uniq.values()]]
+        with self.lock:
+            if self.kind == "ivf":
+                self._ensure_ivf(vecs)
+            old = [i for i in ids if int(i) in self.gi_nos]
+            if old:
+                self.index.remove_ids(np.asarray(old, dtype="int64"))
+            self.index.add_with_ids(vecs, ids)
+            for i, (g, j) in uniq.items():
+                self.gi_nos[i] = g
+                if hashes is not None:
+                    self.hashes[i] = hashes[j]
+                else:
+                    self.hashes.pop(i, None)
+
+    def delete(self, gi_nos: List[str]) -> int:
+        """지운 수. 지운 것이 있으면 save_later로 저장 예약(재시작 후 되살아나지 않도록)."""
+        with self.lock:
+            ids = [gi_id(g) for g in gi_nos if gi_id(g) in self.gi_nos]
+            if ids and self.index is not None:
+                self.index.remove_ids(np.asarray(ids, dtype="int64"))
+            for i in ids:
+                self.gi_nos.pop(i, None)
+                self.hashes.pop(i, None)
+        if ids:
+            self.save_later()
+        return len(ids)
+
+    def has(self, gi_no: str) -> bool:
+        return gi_id(gi_no) in self.gi_nos
+
+    def needs(self, gi_no: str, h: str) -> bool:
+        """없거나, 다른 텍스트(예: 카드만 있던 때)로 임베딩된 공고면 True."""
+        i = gi_id(gi_no)
+        return i not in self.gi_nos or self.hashes.get(i) != h
+
+    def search(self, vec: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        q = np.ascontiguousarray(vec, dtype="float32").reshape(1, -1)
+        with self.lock:
+            if not self.gi_nos:
+                return []
+            sims, ids = self.index.search(q, min(k, len(self.gi_nos)))
+            return [(self.gi_nos[int(i)], float(s)) for s, i in zip(sims[0], ids[0]) if i >= 0 and int(i) in self.gi_nos]
+
+    def scores(self, vec: np.ndarray, gi_nos: List[str]) -> Dict[str, float]:
+        """지정한 공고들만의 유사도(인덱스에 있는 것만). 재정렬용 — 전체 검색 없이 reconstruct 후 내적."""
+        q = np.ascontiguousarray(vec, dtype="float32").reshape(-1)
+        with self.lock:
+            have = [g for g in dict.fromkeys(gi_nos) if gi_id(g) in self.gi_nos]
+            if not have:
+                return {}
+            mat = np.stack([self.index.reconstruct(gi_id(g)) for g in have])
+        return dict(zip(have, (mat @ q).tolist()))
+
+    def save(self, path: Optional[str] = None):
+        """
+        인덱스와 gi_no/해시 사이드카(.json)를 각각 임시 파일에 다 쓴 뒤 교체. 사이드카에 ntotal을 적어
+        두 파일 교체 사이에 죽어 짝이 안 맞으면 load가 버림. 직렬화만 락 안에서(검색을 오래 막지 않음).
+        """
+        p = pathlib.Path(path or self.path)
+        with self._save_lock:
+            with self.lock:
+                if self.index is None:
+                    return
+                self._dirty = False
+                blob = faiss.serialize_index(self.index)
+                meta = {"dim": self.dim, "kind": self.kind, "nlist": self.nlist, "nprobe": self.nprobe,
+                        "ntotal": int(self.index.ntotal),
+                        "gi_nos": {str(k): v for k, v in self.gi_nos.items()},
+                        "hashes": {str(k): v for k, v in self.hashes.items()}}
+            p.parent.mkdir(parents=True, exist_ok=True)
+            side = pathlib.Path(str(p) + ".json")
+            tmp_idx, tmp_side = p.with_suffix(p.suffix + ".tmp"), pathlib.Path(str(side) + ".tmp")
+            tmp_idx.write_bytes(blob.tobytes())
+            tmp_side.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_idx, p)
+            os.replace(tmp_side, side)
+
+    def save_later(self, delay: Optional[float] = None):
+        """변경 표시 후 delay초(기본 POSTING_INDEX_SAVE_SEC) 뒤 한 번 저장(그사이 변경은 합쳐짐). 데몬 타이머 스레드에서 실행."""
+        delay = POSTING_INDEX_SAVE_SEC if delay is None else delay
+        with self.lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(max(0.0, delay), self._flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush(self):
+        with self.lock:
+            self._save_timer = None
+            dirty = self._dirty
+        if dirty:
+            try:
+                self.save()
+            except Exception:
+                pass
+
+    @classmethod
+    def load(cls, path: str = POSTING_INDEX_PATH) -> Optional["PostingIndex"]:
+        p = pathlib.Path(path)
+        side = pathlib.Path(str(p) + ".json")
+        if not p.exists() or not side.exists():
+            return None
+        try:
+            meta = json.loads(side.read_text(encoding="utf-8"))
+            index = faiss.read_index(str(p))
+        except Exception:
+            return None
+        if meta.get("ntotal") != index.ntotal:   # 교체 도중 중단된 저장
+            return None
+        idx = cls(meta["dim"], meta["kind"], meta["nlist"], meta["nprobe"])
+        idx.path = str(p)
+        idx.index = index
+        if idx.kind == "ivf":
+            idx.index.nprobe = min(idx.nprobe, idx.index.nlist)
+            idx.index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        idx.gi_nos = {int(k): v for k, v in meta["gi_nos"].items()}
+        idx.hashes = {int(k): v for k, v in meta.get("hashes", {}).items()}
+        return idx
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"kind": self.kind, "dim": self.dim, "size": len(self.gi_nos),
+                    "nlist": getattr(self.index, "nlist", None), "nprobe": getattr(self.index, "nprobe", None)}
+
+_index: Optional[PostingIndex] = None
+_index_lock = threading.Lock()
+def get_posting_index(dim: int) -> PostingIndex:
+    """디스크에 있으면 로드(차원이 다르면 새로), 없으면 빈 인덱스."""
+    global _index
+    with _index_lock:
+        if _index is None or _index.dim != dim:
+            if _index is not None:
+                _index._flush()
+            loaded = PostingIndex.load()
+            _index = loaded if loaded is not None and loaded.dim == dim else PostingIndex(dim)
+    return _index
+
+@atexit.register
+def _flush_on_exit():
+    if _index is not None:
+        _index._flush()
+
+async def _ensure_indexed(idx: PostingIndex, docs: List[PostingDoc]):
+    """처음 보거나 임베딩한 텍스트가 바뀐(본문이 새로 생긴) 공고만 임베딩. 저장은 save_later로 모아서."""
+    from .llm import embed_texts
+    todo = []
+    for d in {d.gi_no: d for d in docs if d.gi_no}.values():
+        text = posting_text(d)
+        h = text_hash(text)
+        if idx.needs(d.gi_no, h):
+            todo.append((d.gi_no, text, h))
+    if todo:
+        idx.add([g for g, _, _ in todo], await embed_texts([t for _, t, _ in todo]), [h for _, _, h in todo])
+        idx.save_later()
+
+async def dense_scores(spec: Spec, docs: List[PostingDoc]) -> Dict[str, float]:
+    """스펙 임베딩과 공고들의 코사인 유사도(gi_no → 점수). 처음 보는 공고는 임베딩해 인덱스에 추가."""
+    from .llm import embed_texts
+    if not docs:
+        return {}
+    q = (await embed_texts([spec_query_text(spec)]))[0]
+    idx = get_posting_index(q.shape[0])
+    await _ensure_indexed(idx, docs)
+    return idx.scores(q, [d.gi_no for d in docs])
+
+async def rerank_grouped(spec: Spec, grouped: Dict[str, List[PostingDoc]]) -> Dict[str, List[PostingDoc]]:
+    """
+    크롤 결과를 스펙 임베딩과의 코사인 유사도로 역할별 재정렬하고 PostingDoc.score를 채움.
+    처음 보는 공고는 임베딩해 인덱스에 추가(다음 요청부터는 search_postings로 크롤 없이도 찾을 수 있음).
+    """
+    sims = await dense_scores(spec, [d for ds in grouped.values() for d in ds])
+    out: Dict[str, List[PostingDoc]] = {}
+    for role, ds in grouped.items():
+        for d in ds:
+            d.score = sims.get(d.gi_no)
+        out[role] = sorted(ds, key=lambda d: d.score if d.score is not None else -1.0, reverse=True)
+    return out
+
+async def search_postings(spec: Spec, k: int = 10) -> List[PostingDoc]:
+    """크롤 없이 인덱스에서 바로 top-k. 본문은 posting_store에서(만료된 것은 제외)."""
+    from .llm import embed_texts
+    from .posting_store import get_posting_store, MISS
+    q = (await embed_texts([spec_query_text(spec)]))[0]
+    store = get_posting_store()
+    out: List[PostingDoc] = []
+    for gi_no, sim in get_posting_index(q.shape[0]).search(q, k):
+        state, doc = store.lookup(gi_no)
+        if state != MISS and doc is not None:
+            doc.score = sim
+            out.append(doc)
+    return out
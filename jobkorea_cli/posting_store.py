@@ -0,0 +1,93 @@
+# posting_store.py — gi_no 기준 공고 로컬 저장소 (SQLite, TTL + stale-while-revalidate)
+from __future__ import annotations
+import os, time, sqlite3, pathlib, threading
+from typing import Optional, Tuple, Dict, Any
+
+from .models import PostingDoc
+
+POSTING_DB            = os.getenv("POSTING_DB", ".cache_crawl/postings.sqlite3")
+POSTING_TTL_SEC       = int(os.getenv("POSTING_TTL_SEC", str(6 * 3600)))        # 이 안이면 fresh
+POSTING_MAX_STALE_SEC = int(os.getenv("POSTING_MAX_STALE_SEC", str(7 * 86400))) # 이 안이면 stale(즉시 반환 + 백그라운드 갱신)
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+_COLS = ("gi_no", "title", "url", "company", "location", "deadline", "jd_text", "embed_text", "fetched_at")
+
+class PostingStore:
+    """
+    공고 1건 = 1행. 외부 서비스 없이 파일 하나(SQLite WAL)로 프로세스/스레드 간 공유.
+    - lookup(gi_no) → (FRESH|STALE|MISS, PostingDoc|None)
+    - put(doc): upsert. 새 값이 빈 문자열이면 기존 jd_text/embed_text 등은 유지.
+    - hits / stale_hits / misses 카운터 노출 (stats()).
+    """
+    def __init__(self, path: str = POSTING_DB, ttl_sec: int = POSTING_TTL_SEC,
+                 max_stale_sec: int = POSTING_MAX_STALE_SEC):
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_stale_sec = max(ttl_sec, max_stale_sec)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                gi_no      TEXT PRIMARY KEY,
+                title      TEXT NOT NULL DEFAULT '',
+                url        TEXT NOT NULL DEFAULT '',
+                company    TEXT NOT NULL DEFAULT '',
+                location   TEXT NOT NULL DEFAULT '',
+                deadline   TEXT NOT NULL DEFAULT '',
+                jd_text    TEXT NOT NULL DEFAULT '',
+                embed_text TEXT NOT NULL DEFAULT '',
+                fetched_at REAL NOT NULL
+            )""")
+        self.hits = self.stale_hits = self.misses = 0
+
+    def lookup(self, gi_no: str) -> Tuple[str, Optional[PostingDoc]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {','.join(_COLS)} FROM postings WHERE gi_no=?", (gi_no,)
+            ).fetchone()
+            age = (time.time() - row[-1]) if row else None
+            if row is None or age > self.max_stale_sec:
+                self.misses += 1
+                return MISS, None
+            state = FRESH if age <= self.ttl_sec else STALE
+            if state == FRESH: self.hits += 1
+            else:              self.stale_hits += 1
+        d = dict(zip(_COLS, row)); d.pop("fetched_at")
+        return state, PostingDoc(**d)
+
+    def put(self, doc: PostingDoc, fetched_at: Optional[float] = None):
+        vals = (doc.gi_no, doc.title or "", doc.url or "", doc.company or "", doc.location or "",
+                doc.deadline or "", doc.jd_text or "", doc.embed_text or "", fetched_at or time.time())
+        keep = ", ".join(f"{c}=CASE WHEN excluded.{c}!='' THEN excluded.{c} ELSE postings.{c} END"
+                         for c in _COLS[1:-1])
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO postings ({','.join(_COLS)}) VALUES ({','.join('?' * len(_COLS))}) "
+                f"ON CONFLICT(gi_no) DO UPDATE SET {keep}, fetched_at=excluded.fetched_at",
+                vals,
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": n,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / total, 3) if total else 0.0,
+        }
+
+_store: Optional[PostingStore] = None
+_store_lock = threading.Lock()
+def get_posting_store() -> PostingStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PostingStore()
+    return _store
@@ -7,6 +7,13 @@ PARSE_SYS = """너는 채용 검색을 위한 정보 추출기다. 한국어 문
   "industry": str|null, "education": str|null, "keywords": str[]|[] }
 근거가 없으면 null/[] 그대로. JSON만."""
 
+# 로컬 규칙(spec_rules)이 채우지 못한 필드만 추출(llm.parse_spec 빠른 경로)
+PARSE_PARTIAL_SYS = """너는 채용 검색을 위한 정보 추출기다. 입력 JSON의 text에서 fields에 나열된 항목만 추출한다.
+known은 이미 확정된 값이니 참고만 하고 다시 출력하지 않는다.
+항목 형식은 PARSE_SYS와 같다: role/major/location/employment_type/industry/education은 str|null,
+skills/certifications/keywords는 str[], career.level은 "신입"|"경력"|"무관"|null.
+출력: fields의 항목만 담은 JSON 객체(career.level은 {"career": {"level": ...}}). 근거가 없으면 null/[]. JSON만."""
+
 # 단일 문항용(호환성 유지용)
 ASK_REQUIRED_SYS = """너는 채용 도우미다.
 입력에 비어있는 필수 정보만 1문항씩 물어라. (role/skills → career.level → location → employment_type)
@@ -81,6 +88,31 @@ MAP_SYS = """너는 사용자의 스펙을 잡코리아 '상세조건' 텍스트
 - expanded_roles: role 동의어/세부 직무 3~8개.
 - JSON만."""
 
+# 스트리밍 매핑(llm.iter_map_filters)용: 크롤이 먼저 쓸 expanded_roles를 맨 앞에 출력
+MAP_STREAM_SYS = MAP_SYS + """
+- expanded_roles를 가장 먼저 출력(키 순서: expanded_roles, duty, ...)."""
+
+# 파싱+매핑 단일 호출(llm.parse_and_map): PARSE_SYS와 MAP_SYS 결과를 한 번에
+PARSE_MAP_SYS = """너는 채용 검색을 위한 정보 추출기이자 잡코리아 '상세조건' 매퍼다.
+한국어 문장에서 스펙을 추출하고, 그 스펙을 상세조건 텍스트로 매핑해 아래 JSON 하나로만 출력한다.
+{
+  "expanded_roles": string[],
+  "spec": { "role": str|null, "skills": str[]|[], "certifications": str[]|[], "major": str|null,
+            "career": {"years": int|null, "level": "신입"|"경력"|"무관"|null},
+            "location": str|null, "employment_type": "정규직"|"계약직"|"인턴"|"무관"|null,
+            "industry": str|null, "education": str|null, "keywords": str[]|[] },
+  "filters": { "duty": string|null, "region": string|null, "career": string, "education": string, "employment": string,
+               "industry": string|null, "company_types": string[], "job_levels": string[], "salary_brackets": string[],
+               "pref_majors": string[], "certifications": string[], "pref_conditions": string[], "benefits": string[],
+               "keywords": string[], "expanded_keywords": string[] }
+}
+규칙:
+- spec: 근거가 없으면 null/[] 그대로.
+- filters: 값은 페이지에 보이는 옵션 레이블. 모르면 null/[]. duty/region/industry는 상위 카테고리만 생성해도 됨.
+- expanded_keywords: python↔파이썬, autocad↔오토캐드 등 5~10개.
+- expanded_roles: role 동의어/세부 직무 3~8개. 가장 먼저 출력.
+- JSON만."""
+
 
 SUMMARIZE_SYS = """
 너는 채용공고 요약기다.
@@ -0,0 +1,284 @@
+# ranking.py — 공고 하이브리드 랭킹: BM25(한글 bigram + 영문 단어) + 임베딩 유사도, Spec 기반 완화 필터
+# BM25 대상은 제목+회사+본문(jd_text). 본문은 크롤 with_jd=True일 때만 채워지므로 기본 설정에서는 사실상 제목+회사만 봄.
+from __future__ import annotations
+import os, re, time, hashlib, threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .models import Spec, PostingDoc
+
+HYBRID_RANK  = os.getenv("HYBRID_RANK","0")=="1"   # opt-in: 기본 검색 결과(순서/개수)를 바꾸므로 기본은 끔
+RANK_FILTER  = os.getenv("RANK_FILTER", "demote")  # demote: 조건에 어긋난 공고를 뒤로 / drop: 제외
+RANK_W_BM25  = float(os.getenv("RANK_W_BM25", "0.5"))
+RANK_W_DENSE = float(os.getenv("RANK_W_DENSE", "0.5"))
+BM25_K1      = float(os.getenv("BM25_K1", "1.2"))
+BM25_B       = float(os.getenv("BM25_B", "0.75"))
+RANK_TOKEN_CACHE = int(os.getenv("RANK_TOKEN_CACHE", "20000"))   # 토큰화 결과를 기억할 공고 본문 수
+RANK_VOCAB_MAX   = int(os.getenv("RANK_VOCAB_MAX", "500000"))    # 용어 사전 상한(넘으면 사전/토큰 캐시를 새로 시작)
+
+# ---------- 토크나이저 ----------
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+def tokenize(text: str) -> List[str]:
+    """
+    한글은 어절 안 글자 bigram(형태소 분석기 없이 조사/어미 변화에 강함: '백엔드를' ∋ '백엔','엔드'),
+    한 글자 어절은 그대로. 영문/숫자는 소문자 단어(c++, c#, node.js 유지).
+    """
+    out: List[str] = []
+    for m in _TOKEN_RE.finditer((text or "").lower()):
+        w = m.group(0)
+        if "가" <= w[0] <= "힣":
+            out.extend([w] if len(w) == 1 else [w[i:i + 2] for i in range(len(w) - 1)])
+        else:
+            out.append(w)
+    return out
+
+def posting_text(doc: PostingDoc) -> str:
+    return " ".join(p for p in (doc.title, doc.company, doc.jd_text or doc.embed_text) if p)
+
+# 같은 공고가 요청마다 다시 오므로(크롤 캐시) 본문 → 용어 id 배열을 LRU로 기억(최대 RANK_TOKEN_CACHE개).
+# 용어 사전은 RANK_VOCAB_MAX를 넘으면 캐시와 함께 새 세대로 교체 → 오래 도는 프로세스에서도 크기가 묶임.
+# 색인은 만들 때의 사전 객체를 들고 있어 교체 뒤에도 질의 용어를 같은 세대로 찾음.
+_vocab: Dict[str, int] = {}
+_tok_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_tok_lock = threading.Lock()
+
+def _term_ids(texts: List[str]) -> Tuple[Dict[str, int], List[np.ndarray]]:
+    """(사전, 본문별 용어 id 배열) — 한 번의 잠금 안에서 같은 세대 사전으로 매김."""
+    global _vocab, _tok_cache
+    with _tok_lock:
+        if len(_vocab) > RANK_VOCAB_MAX:
+            _vocab, _tok_cache = {}, OrderedDict()
+        vocab, cache, out = _vocab, _tok_cache, []
+        for text in texts:
+            key = hashlib.sha1(text.encode("utf-8")).digest()
+            ids = cache.get(key)
+            if ids is None:
+                ids = cache[key] = np.fromiter((vocab.setdefault(t, len(vocab)) for t in tokenize(text)), dtype="int64")
+                if len(cache) > RANK_TOKEN_CACHE:
+                    cache.popitem(last=False)
+            else:
+                cache.move_to_end(key)
+            out.append(ids)
+        return vocab, out
+
+# ---------- BM25 ----------
+class BM25Index:
+    """
+    문서 집합의 역색인을 CSR 형태 numpy 배열로: 용어별 [indptr[t], indptr[t+1]) 구간에 (문서, tf 가중치).
+    구축은 토큰 id 배열을 이어 붙여 np.unique 두 번, 점수는 질의 용어 구간을 모아 np.bincount 한 번
+    → 토큰화가 캐시된 공고 수천 개면 둘 다 수 ms.
+    """
+    def __init__(self, texts: List[str], k1: float = BM25_K1, b: float = BM25_B):
+        self.n = n = len(texts)
+        self.vocab, ids = _term_ids(texts)
+        lens = np.fromiter(map(len, ids), dtype="int64", count=n)
+        gids = np.concatenate(ids) if n else np.zeros(0, dtype="int64")
+        doc_ids = np.repeat(np.arange(n, dtype="int64"), lens)
+        self.terms, local = np.unique(gids, return_inverse=True)   # 사전 id(정렬) → 이 색인의 용어 번호
+        dl = lens.astype("float32")
+        avgdl = float(dl.mean()) if n and dl.sum() else 1.0
+        keys, tf = np.unique(local.reshape(-1) * max(1, n) + doc_ids, return_counts=True)   # 용어 → 문서 순
+        self.docs = keys % max(1, n)
+        self.indptr = np.searchsorted(keys // max(1, n), np.arange(len(self.terms) + 1))
+        df = np.diff(self.indptr).astype("float32")
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype("float32")
+        tf = tf.astype("float32")
+        self.weights = tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl[self.docs] / avgdl))
+
+    def scores(self, query: str) -> np.ndarray:
+        with _tok_lock:
+            gq = np.asarray(sorted({self.vocab[t] for t in tokenize(query) if t in self.vocab}), dtype="int64")
+        loc = np.searchsorted(self.terms, gq)
+        ids = loc[(loc < len(self.terms)) & (self.terms[np.minimum(loc, len(self.terms) - 1)] == gq)] \
+            if len(self.terms) else loc[:0]
+        if not len(ids) or not self.n:
+            return np.zeros(self.n, dtype="float32")
+        spans = [np.arange(self.indptr[t], self.indptr[t + 1]) for t in ids]
+        pos = np.concatenate(spans)
+        w = self.weights[pos] * np.repeat(self.idf[ids], [len(s) for s in spans])
+        return np.bincount(self.docs[pos], weights=w, minlength=self.n).astype("float32")
+
+# ---------- 완화 필터 ----------
+# 공고에 조건이 '명시'됐고 스펙과 어긋날 때만 제외. 언급이 없으면 통과.
+_EDU_RANK = {"고졸": 0, "초대졸": 1, "전문대": 1, "대졸": 2, "학사": 2, "석사": 3, "박사": 4}
+_SPEC_EDU_RANK = {"고졸": 0, "초대졸": 1, "대졸(4년)": 2, "석사": 3, "박사": 4}
+_EDU_REQ_RE = re.compile(r"(고졸|초대졸|전문대|대졸|학사|석사|박사)\s*(?:이상|以上)")
+_CAREER_REQ_RE = re.compile(r"경력\s*\d{1,2}\s*년\s*이상|\d{1,2}\s*년\s*이상\s*(?:의\s*)?경력|경력직")
+_EMPLOYMENT = ["정규직", "계약직", "인턴", "파견직", "프리랜서", "아르바이트"]
+_ANY = (None, "", "무관", "모름")
+
+# 시/도 → 그 안의 주요 시·군·구/생활권 이름. 공고 지역('성남시 분당구', '서울특별시 강남구')과
+# 스펙 지역('경기', '판교')을 같은 시/도로 맞춰 비교. 여러 시/도에 있는 이름(중구/동구/강서 등)은 넣지 않음.
+REGION_ALIASES: Dict[str, List[str]] = {
+    "서울": ["강남", "서초", "송파", "강동", "마포", "영등포", "여의도", "용산", "성동", "성수", "광진",
+             "동대문", "성북", "종로", "은평", "서대문", "양천", "구로", "금천", "가산", "관악", "동작", "노원", "도봉",
+             "강북", "중랑", "상암"],
+    "경기": ["성남", "분당", "판교", "수원", "용인", "기흥", "수지", "안양", "평촌", "고양", "일산", "부천",
+             "화성", "동탄", "평택", "안산", "남양주", "의정부", "파주", "김포", "광명", "하남", "시흥", "군포", "과천",
+             "이천", "오산", "구리", "의왕", "안성", "포천", "양주"],
+    "인천": ["송도", "부평", "계양", "연수", "남동", "청라"],
+    "부산": ["해운대", "센텀", "수영", "사하", "금정", "기장"],
+    "대구": ["수성", "달서"],
+    "대전": ["유성", "대덕"],
+    "광주": ["광산"],
+    "울산": ["울주"],
+    "세종": [],
+    "강원": ["춘천", "원주", "강릉"],
+    "충북": ["청주", "충주", "오송"],
+    "충남": ["천안", "아산", "당진", "서산"],
+    "전북": ["전주", "익산", "군산"],
+    "전남": ["여수", "순천", "목포", "광양"],
+    "경북": ["포항", "구미", "경주", "안동"],
+    "경남": ["창원", "김해", "진주", "양산", "거제"],
+    "제주": ["서귀포"],
+}
+# 시/도 자체의 정식 이름(행정 접미사를 떼도 약칭이 안 되는 것만; '경기도' → '경기'는 접미사 처리로 충분)
+_PROVINCE_FULL = {"충청북도": "충북", "충청남도": "충남", "전라북도": "전북", "전라남도": "전남",
+                  "경상북도": "경북", "경상남도": "경남"}
+_REGION_OF = {**{a: r for r, aliases in REGION_ALIASES.items() for a in [r, *aliases]}, **_PROVINCE_FULL}
+_ADMIN_SUFFIX_RE = re.compile(r"(?:특별자치도|특별자치시|특별시|광역시|시|군|구|도|동|읍|면)$")
+
+def _province(word: str) -> Tuple[Optional[str], bool]:
+    """(시/도, 시/도 이름 자체인지)"""
+    if word in _PROVINCE_FULL:
+        return _PROVINCE_FULL[word], True
+    base = _ADMIN_SUFFIX_RE.sub("", word) or word
+    r = _REGION_OF.get(word) or _REGION_OF.get(base)
+    return r, r is not None and base == r
+
+def regions(location: str, leading: bool = False) -> set:
+    """
+    지역 문자열 → 시/도 집합('성남시 분당구' → {'경기'}). 알 수 없는 이름은 무시.
+    leading=True면 첫 어절이 시/도일 때 그것만 씀(공고 지역 '경기 광주시'가 광주광역시로 잡히지 않도록).
+    """
+    out = set()
+    for w in re.split(r"[\s,/·>]+", location or ""):
+        r, is_province = _province(w)
+        if r:
+            if leading and is_province and not out:
+                return {r}
+            out.add(r)
+    return out
+
+def location_matches(spec_location: str, doc_location: str) -> bool:
+    """공고 지역이 스펙 지역(시/도 단위)에 속하면 True. 어느 쪽이든 시/도를 모르면 문자열 포함으로 대신 판단."""
+    if "전국" in doc_location or spec_location in doc_location:
+        return True
+    want, have = regions(spec_location), regions(doc_location, leading=True)
+    if want and have:
+        return bool(want & have)
+    return False
+
+def hard_filter(spec: Spec, doc: PostingDoc, text: Optional[str] = None) -> Optional[str]:
+    """조건 불일치 사유(location/career/education/employment_type) 또는 None."""
+    text = text if text is not None else posting_text(doc)
+    compact = "".join(text.split())
+    if spec.location not in _ANY and doc.location and not location_matches(spec.location, doc.location):
+        return "location"
+    level = spec.career.level if spec.career else None
+    if level == "신입" and "신입" not in compact and "경력무관" not in compact and _CAREER_REQ_RE.search(text):
+        return "career"
+    if level == "경력" and "신입" in compact and "경력" not in compact:
+        return "career"
+    if spec.education not in _ANY and "학력무관" not in compact:
+        req = [_EDU_RANK[m.group(1)] for m in _EDU_REQ_RE.finditer(text)]
+        if req and _SPEC_EDU_RANK.get(spec.education, 4) < min(req):
+            return "education"
+    if spec.employment_type not in _ANY:
+        kinds = [k for k in _EMPLOYMENT if k in compact]
+        if kinds and spec.employment_type not in kinds:
+            return "employment_type"
+    return None
+
+# ---------- 하이브리드 ----------
+def query_text(spec: Spec, extra_terms: Optional[List[str]] = None) -> str:
+    parts = [spec.role, spec.industry, spec.major, *spec.skills, *spec.keywords, *spec.certifications, *(extra_terms or [])]
+    return " ".join(p for p in parts if p)
+
+def _minmax(x: np.ndarray) -> np.ndarray:
+    lo, hi = float(x.min()), float(x.max())
+    return (x - lo) / (hi - lo) if hi > lo else np.where(x > 0, 1.0, 0.0).astype("float32")
+
+def rank(spec: Spec, docs: List[PostingDoc], dense: Optional[Dict[str, float]] = None,
+         extra_terms: Optional[List[str]] = None, stats: Optional[Dict[str, Any]] = None,
+         filter_mode: Optional[str] = None) -> List[Tuple[PostingDoc, Dict[str, float]]]:
+    """
+    score = w_bm25·minmax(BM25) + w_dense·minmax(코사인) 로 정렬(동점은 원래 순서).
+    dense(gi_no → 코사인)가 없으면 BM25만. PostingDoc.score에 최종 점수, 두 번째 값에 점수 구성.
+    같은 gi_no(역할 간 중복 사본)는 한 문서로 색인해 df/avgdl이 부풀지 않게 하고, 점수는 모든 사본에 같게 매김.
+    hard_filter에 걸린 공고는 filter_mode(기본 RANK_FILTER)가 "demote"면 통과 공고 뒤로(구성에 filtered 사유),
+    "drop"이면 제외. stats에 filtered(사유별 수)/ranked(통과 수)/demoted/unique/jd_coverage/ms.
+    """
+    t0 = time.perf_counter()
+    mode = filter_mode or RANK_FILTER
+    slot: Dict[str, int] = {}
+    uniq: List[PostingDoc] = []
+    inv = np.zeros(len(docs), dtype="int64")   # 사본 → uniq 번호
+    for i, d in enumerate(docs):
+        k = d.gi_no or f"#{i}"
+        if k not in slot:
+            slot[k] = len(uniq)
+            uniq.append(d)
+        inv[i] = slot[k]
+    texts = [posting_text(d) for d in uniq]
+    why = [hard_filter(spec, d, t) for d, t in zip(uniq, texts)]
+    filtered: Dict[str, int] = {}
+    for w in why:
+        if w:
+            filtered[w] = filtered.get(w, 0) + 1
+
+    bm25 = BM25Index(texts).scores(query_text(spec, extra_terms))
+    parts = [(RANK_W_BM25, _minmax(bm25) if len(bm25) else bm25)]
+    den = None
+    if dense and uniq:
+        den = np.asarray([dense.get(d.gi_no, np.nan) for d in uniq], dtype="float32")
+        den = np.nan_to_num(den, nan=float(np.nanmin(den)) if np.isfinite(den).any() else 0.0)
+        parts.append((RANK_W_DENSE, _minmax(den)))
+    wsum = sum(w for w, _ in parts) or 1.0
+    score = sum(w * x for w, x in parts) / wsum
+
+    bad = np.asarray([bool(w) for w in why], dtype=bool)[inv] if docs else np.zeros(0, dtype=bool)
+    order = np.lexsort((np.arange(len(docs)), -score[inv], bad)) if docs else []
+    out: List[Tuple[PostingDoc, Dict[str, float]]] = []
+    for i in order:
+        j = inv[i]
+        if why[j] and mode == "drop":
+            continue
+        d = docs[i]
+        d.score = round(float(score[j]), 4)
+        br = {"score": d.score, "bm25": round(float(bm25[j]), 4), "bm25_norm": round(float(parts[0][1][j]), 4)}
+        if den is not None:
+            br.update({"dense": round(float(den[j]), 4), "dense_norm": round(float(parts[1][1][j]), 4)})
+        if why[j]:
+            br["filtered"] = why[j]
+        out.append((d, br))
+    if stats is not None:
+        stats.update({"filtered": filtered, "ranked": len(why) - sum(filtered.values()),
+                      "demoted": sum(filtered.values()) if mode != "drop" else 0, "unique": len(uniq),
+                      "jd_coverage": round(sum(1 for d in uniq if d.jd_text) / len(uniq), 3) if uniq else 0.0,
+                      "ms": round((time.perf_counter() - t0) * 1000, 2)})
+    return out
+
+async def rank_grouped(spec: Spec, grouped: Dict[str, List[PostingDoc]], extra_terms: Optional[List[str]] = None,
+                       use_dense: Optional[bool] = None, stats: Optional[Dict[str, Any]] = None,
+                       filter_mode: Optional[str] = None) -> Dict[str, List[PostingDoc]]:
+    """
+    역할별 크롤 결과를 하이브리드 점수로 재정렬(필터에 걸린 공고는 filter_mode에 따라 뒤로 또는 제외).
+    use_dense(기본 POSTING_RERANK)면 posting_index.dense_scores로 임베딩 유사도도 섞음.
+    BM25 통계(idf/avgdl)는 역할 구분 없이 전체 결과(gi_no 기준 중복 제거)에서 계산.
+    """
+    from .posting_index import POSTING_RERANK, dense_scores
+    use_dense = POSTING_RERANK if use_dense is None else use_dense
+    docs = [d for ds in grouped.values() for d in ds]
+    dense = await dense_scores(spec, docs) if use_dense and docs else None
+    st: Dict[str, Any] = {}
+    ranked = rank(spec, docs, dense, extra_terms, st, filter_mode)
+    pos = {id(d): i for i, (d, _) in enumerate(ranked)}
+    out = {role: sorted((d for d in ds if id(d) in pos), key=lambda d: pos[id(d)]) for role, ds in grouped.items()}
+    if stats is not None:
+        stats.update(st)
+        stats["breakdown"] = {d.gi_no: br for d, br in ranked}
+    return out
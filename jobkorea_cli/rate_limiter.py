@@ -1,37 +1,301 @@
 # rate_limiter.py
-import time, asyncio, random
+import os, time, asyncio, random, sqlite3, pathlib, threading
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
 
 class TokenBucket:
     """
     토큰 버킷 기반 Rate Limiter
     - rate_per_sec: 초당 허용 요청 수
     - burst: 순간적으로 허용할 최대 요청 수
+    대기자는 락을 잡은 채 잠들지 않는다: 락 안에서는 '내 차례 시각'만 예약(토큰을 음수로 빌려 씀)하고,
+    락을 놓은 뒤 그 시각까지 sleep. → 대기자들이 예약 순서(FIFO)대로 균등 간격으로 풀림.
+    threading.Lock을 쓰므로 여러 스레드/이벤트 루프에서 같은 버킷을 공유해도 안전.
     """
     def __init__(self, rate_per_sec=1.0, burst=2):
-        self.rate = rate_per_sec
+        self.rate = float(rate_per_sec)
         self.capacity = burst
-        self.tokens = burst
+        self.tokens = float(burst)
         self.ts = time.monotonic()
-        self.lock = asyncio.Lock()
+        self.lock = threading.Lock()
+        self.waiting = 0
+
+    def _refill(self, now: float):
+        # 시간이 흐른만큼 토큰 채우기
+        self.tokens = min(self.capacity, self.tokens + (now - self.ts) * self.rate)
+        self.ts = now
+
+    def reserve(self) -> float:
+        """토큰 1개 예약. 기다려야 할 초를 반환(0이면 즉시)."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        """쓰지 않은 예약 1개를 돌려줌(대기 중 취소) → 뒤에 오는 호출이 그만큼 덜 밀림."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + 1)
 
     async def take(self):
         """
         요청 전 호출해서 속도 제어.
-        토큰이 없으면 기다렸다가 다시 시도.
+        토큰이 없으면 예약된 차례까지 기다림. 기다리다 취소되면(추측 크롤 취소, 클라이언트 끊김) 예약을 환불.
         """
-        async with self.lock:
+        wait = self.reserve()
+        if wait > 0:
+            with self.lock:
+                self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund()
+                raise
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+
+class _Slot:
+    """AdaptiveLimiter.slot() 블록에서 응답 상태코드를 적어 두는 용도."""
+    __slots__ = ("status",)
+    def __init__(self):
+        self.status: Optional[int] = None
+
+class AdaptiveLimiter(TokenBucket):
+    """
+    관측 기반(AIMD)으로 속도를 조절하는 토큰 버킷.
+    - 429/5xx/예외 → rate *= decrease (곱셈 감소), 지연이 target_latency 초과 → rate *= latency_decrease
+    - 정상 응답 → rate += increase (덧셈 증가), [min_rate, max_rate] 범위 유지
+    - 감소는 cooldown 초에 한 번만(동시에 실패한 요청들이 연쇄로 깎지 않도록)
+    """
+    def __init__(self, rate_per_sec=1.0, burst=2, min_rate=0.1, max_rate=10.0,
+                 target_latency=2.0, increase=0.1, decrease=0.5, latency_decrease=0.85, cooldown=1.0):
+        super().__init__(rate_per_sec, burst)
+        self.min_rate, self.max_rate = float(min_rate), float(max_rate)
+        self.target_latency = float(target_latency)
+        self.increase, self.decrease, self.latency_decrease = increase, decrease, latency_decrease
+        self.cooldown = cooldown
+        self._last_decrease = 0.0
+        self.counters = {"requests": 0, "throttled": 0, "slow": 0, "increases": 0, "decreases": 0}
+
+    def _set_rate(self, rate: float):
+        now = time.monotonic()
+        self._refill(now)   # 지금까지는 이전 속도로 채우고, 이후부터 새 속도 적용
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+
+    def _judge(self, latency: float, status: Optional[int]) -> Optional[float]:
+        """감소 배율(혼잡/지연) 또는 None(정상). 카운터 갱신. self.lock 안에서 호출."""
+        self.counters["requests"] += 1
+        congested = status is not None and (status == 429 or status >= 500)
+        if congested or latency > self.target_latency:
+            self.counters["throttled" if congested else "slow"] += 1
+            return self.decrease if congested else self.latency_decrease
+        return None
+
+    def observe(self, latency: float, status: Optional[int] = None):
+        """응답 1건 관측. status=None은 상태 미상(브라우저 네비게이션 등) → 지연만 반영."""
+        with self.lock:
+            factor = self._judge(latency, status)
             now = time.monotonic()
-            delta = now - self.ts
-            self.ts = now
-            # 시간이 흐른만큼 토큰 채우기
-            self.tokens = min(self.capacity, self.tokens + delta * self.rate)
+            if factor is not None:
+                if now - self._last_decrease >= self.cooldown:
+                    self._set_rate(self.rate * factor)
+                    self._last_decrease = now
+                    self.counters["decreases"] += 1
+            elif self.rate < self.max_rate:
+                self._set_rate(self.rate + self.increase)
+                self.counters["increases"] += 1
 
-            if self.tokens < 1:
-                wait = (1 - self.tokens) / self.rate
-                await asyncio.sleep(wait)
-                self.tokens = 0
-            else:
-                self.tokens -= 1
+    @asynccontextmanager
+    async def slot(self):
+        """
+        async with limiter.slot() as s:
+            r = await client.get(...); s.status = r.status_code
+        → 차례를 기다린 뒤 실행하고, 블록 종료 시 지연/상태를 observe. 예외는 5xx와 같게 취급.
+        취소(CancelledError)/조기 종료(GeneratorExit)는 서버 상태와 무관하므로 관측하지 않음.
+        """
+        await self.take()
+        s = _Slot()
+        t0 = time.monotonic()
+        try:
+            yield s
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except BaseException:
+            self.observe(time.monotonic() - t0, 599)
+            raise
+        self.observe(time.monotonic() - t0, s.status)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            self._refill(time.monotonic())
+            out = {"rate": round(self.rate, 3), "tokens": round(self.tokens, 2), "queue_depth": self.waiting}
+            out.update(self.counters)
+        return out
+
+# ---------- 프로세스 간 공유 버킷 ----------
+RATE_LIMIT_SHARED = os.getenv("RATE_LIMIT_SHARED","0")=="1"
+RATE_LIMIT_DB     = os.getenv("RATE_LIMIT_DB", ".cache_crawl/ratelimit.sqlite3")
+
+class SharedTokenBucket:
+    """
+    같은 호스트의 여러 프로세스(gunicorn/uvicorn 워커, Streamlit 등)가 공유하는 토큰 버킷.
+    - 상태(tokens, ts, rate, capacity, dec_ts)는 SQLite 파일의 한 행. BEGIN IMMEDIATE(파일 쓰기 락) 안에서
+      읽고-고치고-쓰기 후 커밋 → 잠은 락 밖에서. take() 계약은 TokenBucket과 동일.
+    - 속도 변경도 같은 트랜잭션에서 '지금 공유된 값' 기준으로 적용(다른 워커가 낮춘 속도를 덮어쓰지 않음).
+    - 시각은 프로세스 간에 같은 기준이어야 하므로 time.time() 사용.
+    - 호출당 오버헤드는 jobkorea_cli/bench/shared_limiter.py로 측정(1ms 미만 목표).
+    """
+    def __init__(self, name: str, rate_per_sec=1.0, burst=2, path: str = RATE_LIMIT_DB):
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.path = path
+        self.rate = float(rate_per_sec)
+        self.capacity = burst
+        self.waiting = 0
+        self.lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")   # 버킷 상태는 유실돼도 무해
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY, tokens REAL NOT NULL, ts REAL NOT NULL,
+                rate REAL NOT NULL, capacity REAL NOT NULL, dec_ts REAL NOT NULL DEFAULT 0
+            )""")
+        try:   # dec_ts 이전에 만들어진 파일
+            self._conn.execute("ALTER TABLE buckets ADD COLUMN dec_ts REAL NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.execute("INSERT OR IGNORE INTO buckets (name, tokens, ts, rate, capacity) VALUES (?,?,?,?,?)",
+                           (name, float(burst), time.time(), self.rate, float(burst)))
+
+    def _txn(self, fn):
+        """fn(tokens, rate, dec_ts, now) -> (tokens, rate, dec_ts, out). 토큰은 이전 속도로 채운 뒤 넘김."""
+        with self.lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, ts, rate, cap, dec_ts = self._conn.execute(
+                    "SELECT tokens, ts, rate, capacity, dec_ts FROM buckets WHERE name=?", (self.name,)
+                ).fetchone()
+                now = time.time()
+                tokens = min(cap, tokens + max(0.0, now - ts) * rate)
+                tokens, rate, dec_ts, out = fn(tokens, rate, dec_ts, now)
+                self._conn.execute("UPDATE buckets SET tokens=?, ts=?, rate=?, dec_ts=? WHERE name=?",
+                                   (tokens, now, rate, dec_ts, self.name))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.rate = rate
+            return out
+
+    def reserve(self, increase: float = 0.0, max_rate: float = float("inf")) -> float:
+        """토큰 1개 예약. increase가 있으면 같은 트랜잭션에서 공유 속도에 더함(max_rate까지)."""
+        def _fn(tokens, rate, dec_ts, now):
+            if increase:
+                rate = max(rate, min(max_rate, rate + increase))
+            tokens -= 1
+            return tokens, rate, dec_ts, (0.0 if tokens >= 0 else -tokens / rate)
+        return self._txn(_fn)
+
+    def decrease(self, factor: float, min_rate: float, cooldown: float) -> bool:
+        """공유 속도 *= factor. 어느 워커든 cooldown 안에 이미 깎았으면 건너뜀. 적용 여부 반환."""
+        def _fn(tokens, rate, dec_ts, now):
+            if now - dec_ts < cooldown:
+                return tokens, rate, dec_ts, False
+            return tokens, max(min_rate, rate * factor), now, True
+        return self._txn(_fn)
+
+    def refund(self):
+        """쓰지 않은 예약 1개를 공유 행에 돌려줌(상한은 다음 채우기에서 capacity로 맞춰짐)."""
+        self._txn(lambda tokens, rate, dec_ts, now: (tokens + 1, rate, dec_ts, None))
+
+    def set_rate(self, rate: float):
+        self._txn(lambda tokens, _rate, dec_ts, now: (tokens, float(rate), dec_ts, None))
+
+    def tokens(self) -> float:
+        return self._txn(lambda tokens, rate, dec_ts, now: (tokens, rate, dec_ts, tokens))
+
+    take = TokenBucket.take
+
+class SharedAdaptiveLimiter(AdaptiveLimiter):
+    """
+    AdaptiveLimiter와 같은 AIMD 규칙을 공유 행에 직접 적용해 워커들이 함께 조절.
+    - 감소: 즉시 SharedTokenBucket.decrease(현재 공유 속도 기준, 쿨다운도 공유) → 한 워커의 429가 모두를 늦춤
+    - 증가: 성공마다 쓰지 않고 로컬에 모았다가 다음 reserve 트랜잭션에 얹음 → 성공 때문에 추가 쓰기 락 없음
+      (혼잡이 관측되면 그전까지 모은 증가분은 버림)
+    """
+    def __init__(self, name: str, path: str = RATE_LIMIT_DB, **kwargs):
+        super().__init__(**kwargs)
+        self.shared = SharedTokenBucket(name, self.rate, self.capacity, path)
+        self._pending_increase = 0.0
+
+    def reserve(self) -> float:
+        with self.lock:
+            inc, self._pending_increase = self._pending_increase, 0.0
+        wait = self.shared.reserve(inc, self.max_rate)
+        self.rate = self.shared.rate
+        return wait
+
+    def refund(self):
+        self.shared.refund()
+
+    def observe(self, latency: float, status: Optional[int] = None):
+        with self.lock:
+            factor = self._judge(latency, status)
+            if factor is None:
+                if self.shared.rate + self._pending_increase < self.max_rate:
+                    self._pending_increase += self.increase
+                    self.counters["increases"] += 1
+                return
+            self._pending_increase = 0.0
+        # self.lock과 별개인 shared.lock 사용 → 교착 없음
+        if self.shared.decrease(factor, self.min_rate, self.cooldown):
+            with self.lock:
+                self.counters["decreases"] += 1
+        self.rate = self.shared.rate
+
+    def snapshot(self) -> Dict[str, Any]:
+        out = {"rate": round(self.shared.rate, 3), "tokens": round(self.shared.tokens(), 2),
+               "queue_depth": self.waiting, "shared": True}
+        with self.lock:
+            out["pending_increase"] = round(self._pending_increase, 3)
+            out.update(self.counters)
+        return out
+
+# ---------- 호스트/엔드포인트별 레지스트리 ----------
+JOBKOREA_HOST = "www.jobkorea.co.kr"
+OPENAI_HOST   = "api.openai.com"
+
+LIMITER_DEFAULTS: Dict[str, Dict[str, float]] = {
+    JOBKOREA_HOST: dict(rate_per_sec=float(os.getenv("CRAWL_RATE_PER_SEC", "2")), burst=4,
+                        min_rate=0.2, max_rate=float(os.getenv("CRAWL_MAX_RATE_PER_SEC", "8")), target_latency=3.0),
+    OPENAI_HOST:   dict(rate_per_sec=float(os.getenv("LLM_RATE_PER_SEC", "5")), burst=10,
+                        min_rate=0.5, max_rate=float(os.getenv("LLM_MAX_RATE_PER_SEC", "50")), target_latency=30.0),
+}
+_GENERIC = dict(rate_per_sec=2.0, burst=4, min_rate=0.2, max_rate=10.0, target_latency=5.0)
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(key: str) -> AdaptiveLimiter:
+    """
+    key(호스트 또는 엔드포인트)별 공유 리미터. 없으면 LIMITER_DEFAULTS(없으면 기본값)로 생성.
+    RATE_LIMIT_SHARED=1이면 같은 호스트의 프로세스들이 RATE_LIMIT_DB 파일로 속도 한도를 함께 씀.
+    """
+    with _limiters_lock:
+        lim = _limiters.get(key)
+        if lim is None:
+            conf = LIMITER_DEFAULTS.get(key, _GENERIC)
+            lim = _limiters[key] = SharedAdaptiveLimiter(key, **conf) if RATE_LIMIT_SHARED else AdaptiveLimiter(**conf)
+    return lim
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """현재 속도(rate)와 대기열 길이(queue_depth) 등 리미터별 상태."""
+    with _limiters_lock:
+        items = list(_limiters.items())
+    return {k: v.snapshot() for k, v in items}
 
 async def polite_sleep(ms_base=600, jitter=0.4):
     """
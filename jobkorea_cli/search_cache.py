@@ -0,0 +1,48 @@
+# search_cache.py — role_kw(+per_role) → 검색 결과 카드 캐시 (메모리 LRU + 디스크)
+from __future__ import annotations
+import os, re, json, threading
+from typing import List, Dict, Optional
+
+from .kvcache import TwoTierCache
+
+SEARCH_CACHE_DB        = os.getenv("SEARCH_CACHE_DB", ".cache_crawl/search.sqlite3")
+SEARCH_CACHE_TTL_SEC   = int(os.getenv("SEARCH_CACHE_TTL_SEC", "1800"))
+SEARCH_CACHE_MAX_ITEMS = int(os.getenv("SEARCH_CACHE_MAX_ITEMS", "5000"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+SEARCH_CACHE_MEM_ITEMS = int(os.getenv("SEARCH_CACHE_MEM_ITEMS", "256"))
+SEARCH_CACHE_MEM_BYTES = int(os.getenv("SEARCH_CACHE_MEM_BYTES", str(4 * 1024 * 1024)))
+
+def normalize_role_kw(role_kw: str) -> str:
+    """대소문자/공백 차이는 같은 검색으로 취급."""
+    return re.sub(r"\s+", " ", role_kw or "").strip().lower()
+
+def _key(role_kw: str, per_role: int) -> str:
+    return f"{normalize_role_kw(role_kw)}|{int(per_role)}"
+
+_cache: Optional[TwoTierCache] = None
+_cache_lock = threading.Lock()
+def get_search_cache() -> TwoTierCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TwoTierCache(
+                SEARCH_CACHE_DB, ttl_sec=SEARCH_CACHE_TTL_SEC,
+                max_entries=SEARCH_CACHE_MAX_ITEMS, max_bytes=SEARCH_CACHE_MAX_BYTES,
+                mem_max_entries=SEARCH_CACHE_MEM_ITEMS, mem_max_bytes=SEARCH_CACHE_MEM_BYTES,
+                table="search_cards",
+            )
+    return _cache
+
+def get_cards(role_kw: str, per_role: int) -> Optional[List[Dict[str, str]]]:
+    raw = get_search_cache().get(_key(role_kw, per_role))
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+def put_cards(role_kw: str, per_role: int, cards: List[Dict[str, str]]):
+    if not cards:   # 빈 결과는 일시 장애일 수 있어 캐시하지 않음
+        return
+    get_search_cache().set(_key(role_kw, per_role), json.dumps(cards, ensure_ascii=False))
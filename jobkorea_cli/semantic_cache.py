@@ -0,0 +1,183 @@
+# semantic_cache.py — 스펙 임베딩 최근접 이웃으로 map_filters 결과 재사용 (메모리 FAISS + LRU)
+from __future__ import annotations
+import os, json, time, threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import faiss
+
+from .models import Spec
+
+SEMANTIC_CACHE           = os.getenv("SEMANTIC_CACHE","0")=="1"   # 임베딩 모델이 필요하므로 기본 꺼짐
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))   # 코사인 유사도 하한
+SEMANTIC_CACHE_MAX_ITEMS = int(os.getenv("SEMANTIC_CACHE_MAX_ITEMS", "2000"))
+SEMANTIC_CACHE_TTL       = int(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600)))
+
+# 검색 조건/매핑 결과를 직접 바꾸는 필드 — 임베딩이 아무리 가까워도 값이 다르면 재사용하지 않음
+# (서울 ≈ 부산, e5 코사인은 좁은 구간에 몰려 있어 백엔드 ≈ 프론트엔드도 임계값만으로는 못 가름)
+GUARD_FIELDS = ["location", "career.level", "education", "employment_type", "role", "industry", "major"]
+_LIST_FIELDS = ["skills", "keywords", "certifications", "company_types", "job_levels",
+                "salary_brackets", "pref_majors", "pref_conditions", "benefits"]
+_SCALAR_FIELDS = ["role", "industry", "major"]
+
+# 최고 유사도 분포(조회마다 1회) 구간 경계
+_HIST_EDGES = [0.5, 0.8, 0.9, 0.95, 0.98, 1.0001]
+
+def _norm(v: Any) -> str:
+    return " ".join(str(v or "").lower().split())
+
+def guard_key(spec: Spec) -> Tuple[str, ...]:
+    d = spec.model_dump()
+    return tuple(_norm(spec.career.level if f == "career.level" else d.get(f)) for f in GUARD_FIELDS)
+
+def spec_text(spec: Spec) -> str:
+    """
+    스펙의 정규화 텍스트: 소문자/공백 정리, 리스트는 중복 제거 후 정렬, 빈 필드는 생략.
+    → 스킬 순서나 공백만 다른 스펙은 같은 문자열(임베딩 없이 정확 적중).
+    """
+    d = spec.model_dump()
+    parts = [f"{f}: {_norm(d.get(f))}" for f in _SCALAR_FIELDS if _norm(d.get(f))]
+    for f in _LIST_FIELDS:
+        vals = sorted({_norm(x) for x in d.get(f) or [] if _norm(x)})
+        if vals:
+            parts.append(f"{f}: {', '.join(vals)}")
+    return "; ".join(parts)
+
+class SemanticCache:
+    """
+    정규화 텍스트 → 결과(dict). 조회 순서:
+      1) 정규화 텍스트 정확 일치(guard 포함)
+      2) FAISS IndexFlatIP(정규화 벡터 → 코사인) 최근접 중 guard가 같고 유사도 ≥ threshold
+    - 항목 수 상한 초과 시 가장 오래 안 쓴 항목부터 인덱스에서 remove_ids (LRU)
+    - TTL 지난 항목은 조회 시 버림. invalidate()/clear()로 수동 무효화
+    벡터 차원은 첫 put에서 정함. threading.Lock으로 보호(요청마다 다른 이벤트 루프여도 안전).
+    """
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, max_items: int = SEMANTIC_CACHE_MAX_ITEMS,
+                 ttl_sec: int = SEMANTIC_CACHE_TTL, k: int = 8):
+        self.threshold, self.max_items, self.ttl_sec, self.k = threshold, max(1, max_items), ttl_sec, k
+        self.lock = threading.Lock()
+        self._index: Optional[faiss.IndexIDMap2] = None
+        self._entries: "OrderedDict[int, Tuple[str, Tuple[str, ...], str, float]]" = OrderedDict()  # id → (text, guard, json, expires_at)
+        self._by_text: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        self._next_id = 0
+        self.counters = {"lookups": 0, "hits": 0, "exact_hits": 0, "misses": 0, "guard_rejects": 0,
+                         "puts": 0, "evictions": 0, "expired": 0, "invalidated": 0}
+        self._hist = [0] * len(_HIST_EDGES)
+
+    def _drop(self, ids: List[int]):
+        for i in ids:
+            text, guard, _, _ = self._entries.pop(i)
+            self._by_text.pop((text, guard), None)
+        if ids and self._index is not None:
+            self._index.remove_ids(np.asarray(ids, dtype="int64"))
+
+    def _live(self, i: int, now: float) -> bool:
+        ent = self._entries.get(i)
+        if ent is None:
+            return False
+        if ent[3] < now:
+            self._drop([i]); self.counters["expired"] += 1
+            return False
+        return True
+
+    def _hit(self, i: int) -> Dict[str, Any]:
+        self._entries.move_to_end(i)
+        self.counters["hits"] += 1
+        return json.loads(self._entries[i][2])   # 호출 측이 고쳐 써도 캐시는 그대로
+
+    def _observe(self, sim: float):
+        for b, edge in enumerate(_HIST_EDGES):
+            if sim < edge:
+                self._hist[b] += 1
+                return
+
+    def lookup_exact(self, text: str, guard: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """임베딩 전에 먼저 호출: 정규화 텍스트가 같으면 바로 적중."""
+        with self.lock:
+            i = self._by_text.get((text, guard))
+            if i is not None and self._live(i, time.time()):
+                self.counters["lookups"] += 1
+                self.counters["exact_hits"] += 1
+                self._observe(1.0)
+                return self._hit(i)
+        return None
+
+    def lookup(self, vec: np.ndarray, guard: Tuple[str, ...]) -> Tuple[Optional[Dict[str, Any]], float]:
+        """(결과 또는 None, 최고 유사도). vec은 L2 정규화된 1차원 float32."""
+        q = np.ascontiguousarray(vec, dtype="float32").reshape(1, -1)
+        with self.lock:
+            self.counters["lookups"] += 1
+            if self._index is None or self._index.ntotal == 0 or self._index.d != q.shape[1]:
+                self.counters["misses"] += 1
+                return None, 0.0
+            sims, ids = self._index.search(q, min(self.k, self._index.ntotal))
+            now, best, rejected = time.time(), 0.0, False
+            for sim, i in zip(sims[0], ids[0]):
+                if i < 0 or not self._live(int(i), now):
+                    continue
+                best = max(best, float(sim))
+                if sim < self.threshold:
+                    break
+                if self._entries[int(i)][1] != guard:
+                    rejected = True
+                    continue
+                self._observe(float(sim))
+                return self._hit(int(i)), float(sim)
+            self._observe(best)
+            self.counters["misses"] += 1
+            self.counters["guard_rejects"] += rejected
+            return None, best
+
+    def put(self, text: str, guard: Tuple[str, ...], vec: np.ndarray, value: Dict[str, Any]):
+        q = np.ascontiguousarray(vec, dtype="float32").reshape(1, -1)
+        with self.lock:
+            if self._index is None or self._index.d != q.shape[1]:   # 첫 put 또는 모델 교체
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(q.shape[1]))
+                self._entries.clear(); self._by_text.clear()
+            old = self._by_text.get((text, guard))
+            if old is not None:
+                self._drop([old])
+            i = self._next_id; self._next_id += 1
+            self._index.add_with_ids(q, np.asarray([i], dtype="int64"))
+            self._entries[i] = (text, guard, json.dumps(value, ensure_ascii=False), time.time() + self.ttl_sec)
+            self._by_text[(text, guard)] = i
+            self.counters["puts"] += 1
+            over = len(self._entries) - self.max_items
+            if over > 0:
+                self._drop(list(self._entries)[:over])
+                self.counters["evictions"] += over
+
+    def invalidate(self, text: Optional[str] = None, guard: Optional[Tuple[str, ...]] = None) -> int:
+        """text(와 guard)가 같은 항목만, 둘 다 없으면 전부 삭제. 지운 개수 반환."""
+        with self.lock:
+            ids = [i for i, (t, g, _, _) in self._entries.items()
+                   if (text is None or t == text) and (guard is None or g == guard)]
+            self._drop(ids)
+            self.counters["invalidated"] += len(ids)
+            return len(ids)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            out = dict(self.counters)
+            out["size"] = len(self._entries)
+            out["threshold"] = self.threshold
+            out["hit_rate"] = round(out["hits"] / out["lookups"], 3) if out["lookups"] else 0.0
+            lo = [0.0] + _HIST_EDGES[:-1]
+            out["similarity_hist"] = {f"{a:.2f}-{min(b, 1.0):.2f}": n for a, b, n in zip(lo, _HIST_EDGES, self._hist)}
+        return out
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+def get_semantic_cache() -> SemanticCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache()
+    return _cache
+
+def semantic_cache_stats() -> Dict[str, Any]:
+    return get_semantic_cache().stats()
@@ -0,0 +1,356 @@
+# spec_rules.py — 사전(lexicon) 기반 로컬 스펙 추출기: 확실한 필드는 LLM 없이 채움
+from __future__ import annotations
+import os, re, threading
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from .models import Spec
+from .ui_schema import DEF_OPTS
+from .role_map import SKILL_TO_ROLE, ROLE_ALIASES, canonical_role, role_from_skills
+
+try:   # 프로젝트 루트에서 실행할 때만 보이는 공용 열거형(없으면 DEF_OPTS만 사용)
+    from src.core.utils.enums import E_education, E_location, E_License, E_industry, E_company_type, E_employee_type, E_role
+except ImportError:
+    E_education = E_location = E_License = E_industry = E_company_type = E_employee_type = E_role = None
+
+SPEC_RULES          = os.getenv("SPEC_RULES","0")=="1"   # opt-in: 규칙 추출 결과가 LLM과 다를 수 있으므로 기본은 끔
+SPEC_RULES_MIN_CONF = float(os.getenv("SPEC_RULES_MIN_CONF", "0.8"))   # 이 이상이면 '해결'로 보고 LLM에 묻지 않음
+
+# parse_spec(PARSE_SYS)이 채우는 필드 — LLM에 되물을 수 있는 단위
+FIELDS = ["role", "skills", "certifications", "major", "career.level", "location",
+          "employment_type", "industry", "education", "keywords"]
+
+def _opts(field: str) -> List[str]:
+    return [o for o in DEF_OPTS.get(field, []) if o not in ("무관", "모름")]
+
+def _enum_values(enum, skip_first: bool = True) -> List[str]:
+    if enum is None:
+        return []
+    vals = [e.value for e in enum]
+    return vals[1:] if skip_first else vals   # 첫 항목은 '정보 없음/희망 ~ 없음'
+
+# ---------- 사전 ----------
+# 표기 변형 → 대표값(가능하면 DEF_OPTS 레이블)
+_LOCATION = {**{v: v for v in _opts("location")}, **{v: v for v in _enum_values(E_location)},
+             "서울시": "서울", "서울특별시": "서울", "강남": "서울", "여의도": "서울", "성수": "서울", "구로": "서울",
+             "경기도": "경기", "판교": "경기", "분당": "경기", "성남": "경기", "수원": "경기", "용인": "경기", "안양": "경기",
+             "인천시": "인천", "송도": "인천", "부산시": "부산", "대전시": "대전", "대구시": "대구",
+             "지역 무관": "무관", "지역무관": "무관", "전국": "무관"}
+
+_EDUCATION = {"고졸": "고졸", "고등학교 졸업": "고졸", "고등학교졸업": "고졸",
+              "초대졸": "초대졸", "전문대": "초대졸", "전문학사": "초대졸", "2년제": "초대졸", "3년제": "초대졸",
+              "대졸": "대졸(4년)", "4년제": "대졸(4년)", "학사": "대졸(4년)", "대학교 졸업": "대졸(4년)",
+              "석사": "석사", "박사": "박사", "학력 무관": "무관", "학력무관": "무관"}
+for _v, _c in zip(_enum_values(E_education), ["대졸(4년)", "초대졸", "석사", "박사", "고졸"]):
+    _EDUCATION[_v] = _c
+_EDU_RANK = {"고졸": 0, "초대졸": 1, "대졸(4년)": 2, "석사": 3, "박사": 4, "무관": -1}
+
+_EMPLOYMENT = {**{v: v for v in _opts("employment_type")}, **{v: v for v in _enum_values(E_employee_type)},
+               "인턴십": "인턴", "정규": "정규직", "프리랜스": "프리랜서", "알바": "아르바이트",
+               "고용형태 무관": "무관"}
+
+# 스킬: role_map 키 + DEF_OPTS + 자주 쓰는 표기. 직무/분야 성격의 키는 keywords로 보냄.
+_NOT_SKILLS = {"ml", "machine learning", "deep learning", "nlp", "llm", "cv", "computer vision", "mle", "ds",
+               "data scientist", "security", "pentest", "qa", "etl", "cicd"}
+_SKILL_DISPLAY = {"python": "Python", "파이썬": "Python", "sql": "SQL", "pytorch": "PyTorch", "파이토치": "PyTorch",
+                  "tensorflow": "TensorFlow", "텐서플로": "TensorFlow", "docker": "Docker", "도커": "Docker",
+                  "aws": "AWS", "gcp": "GCP", "azure": "Azure", "java": "Java", "자바": "Java",
+                  "javascript": "JavaScript", "자바스크립트": "JavaScript", "typescript": "TypeScript",
+                  "spring": "Spring", "스프링": "Spring", "spring boot": "Spring Boot", "django": "Django", "장고": "Django",
+                  "fastapi": "FastAPI", "flask": "Flask", "react": "React", "리액트": "React", "vue": "Vue",
+                  "next.js": "Next.js", "node": "Node.js", "node.js": "Node.js", "kotlin": "Kotlin", "swift": "Swift",
+                  "flutter": "Flutter", "react native": "React Native", "android": "Android", "안드로이드": "Android", "ios": "iOS",
+                  "go": "Go", "kafka": "Kafka", "redis": "Redis", "mysql": "MySQL", "postgres": "PostgreSQL",
+                  "postgresql": "PostgreSQL", "pandas": "pandas", "판다스": "pandas", "numpy": "NumPy",
+                  "spark": "Spark", "airflow": "Airflow", "kubernetes": "Kubernetes", "쿠버네티스": "Kubernetes",
+                  "k8s": "Kubernetes", "terraform": "Terraform", "tableau": "Tableau", "excel": "Excel", "엑셀": "Excel",
+                  "linux": "Linux", "리눅스": "Linux", "git": "Git", "c++": "C++", "c#": "C#", "jpa": "JPA",
+                  "html": "HTML", "css": "CSS", "figma": "Figma", "photoshop": "Photoshop", "unity": "Unity",
+                  "scikit-learn": "scikit-learn", "golang": "Go", "c": "C", "r": "R"}
+_SKILLS = {k: _SKILL_DISPLAY.get(k, k) for k in SKILL_TO_ROLE if k not in _NOT_SKILLS}
+_SKILLS.update(_SKILL_DISPLAY)
+_SKILLS.update({s.lower(): s for s in _opts("skills")})
+
+_KEYWORDS = {**{v.lower(): v for v in _opts("keywords")},
+             "자연어처리": "NLP", "자연어 처리": "NLP", "컴퓨터비전": "CV", "컴퓨터 비전": "CV", "computer vision": "CV",
+             "추천시스템": "추천", "추천 시스템": "추천", "이상 탐지": "이상탐지", "machine learning": "머신러닝",
+             "deep learning": "딥러닝", "생성형 ai": "LLM", "모의해킹": "보안", "pentest": "보안"}
+
+_CERTS = {**{v: v for v in _opts("certifications")}, **{v: v for v in _enum_values(E_License)},
+          "빅데이터분석기사": "빅분기", "sqlp": "SQLP", "adp": "ADP", "adsp": "ADsP", "sqld": "SQLD",
+          "토익": "TOEIC", "오픽": "OPIC", "opic": "OPIC", "toeic": "TOEIC", "정보보안기사": "정보보안기사",
+          "리눅스마스터": "리눅스마스터", "네트워크관리사": "네트워크관리사", "컴활": "컴퓨터활용능력",
+          "컴퓨터활용능력": "컴퓨터활용능력", "정처기": "정보처리기사"}
+_CERT_RE = re.compile(r"[가-힣A-Za-z]{2,12}(?:산업기사|기사|기능사|기술사)(?![가-힣])")
+# 아직 보유하지 않은 자격증('정보보안기사 준비 중', 'SQLD 취득 예정')
+_CERT_PENDING_RE = re.compile(r"^\s*(?:을|를|은|는|도)?\s*(?:준비|공부|취득\s*예정|응시|따는\s*중|따려|목표|필기)")
+
+_MAJORS = {v: v for v in _opts("major")}
+_MAJOR_RE = re.compile(r"(?P<a>[가-힣]{2,12}?)(?P<sa>학과|학부|과)?\s*전공|(?P<b>[가-힣]{2,12}?)(?P<sb>학과|학부)(?![가-힣])")
+
+def _major_name(m: re.Match) -> str:
+    """'컴퓨터공학과 전공' → 컴퓨터공학, '통계학을 전공' → 통계학."""
+    name, suf = (m.group("a"), m.group("sa")) if m.group("a") else (m.group("b"), m.group("sb"))
+    if suf and suf.startswith("학"):
+        name += "학"
+    return _JOSA_RE.sub("", name)
+
+_INDUSTRY_ENUM = {"IT·정보통신업": "IT/인터넷", "금융·은행업": "금융/은행", "제조·생산·화학업": "제조/생산",
+                  "교육업": "교육", "기관·협회": "공공/기관"}
+_INDUSTRY = {**{v: v for v in _opts("industry")}, **{v: _INDUSTRY_ENUM.get(v, v) for v in _enum_values(E_industry)},
+             "it": "IT/인터넷", "인터넷": "IT/인터넷", "핀테크": "금융/은행", "금융": "금융/은행", "은행": "금융/은행",
+             "제조": "제조/생산", "공공": "공공/기관", "에듀테크": "교육"}
+
+_COMPANY_ENUM = {"외국계기업": "외국계", "공공기관·공기업": "공공기관", "벤처기업": "스타트업"}
+_COMPANY_TYPES = {**{v: v for v in DEF_OPTS.get("company_types", [])},
+                  **{v: _COMPANY_ENUM.get(v, v) for v in _enum_values(E_company_type)},
+                  "중견": "중견기업", "중소": "중소기업", "외국계": "외국계", "공기업": "공공기관", "벤처": "스타트업"}
+_PREF_CONDITIONS = {**{v: v for v in _opts("pref_conditions")}, "재택": "재택근무", "원격근무": "재택근무",
+                    "리모트": "재택근무", "유연 근무": "유연근무", "자율출근": "유연근무"}
+_SALARY_RE = re.compile(r"연봉\s*(\d{4,5})\s*(?:만\s*원?)?\s*(이상|이하)?")
+
+# role_map 직무명/별칭(추측 크롤용) + 공용 직무 분류(E_role)의 세부 명칭(산업과 겹치는 것은 제외)
+_NAMED_ROLES = {**{r: r for r in set(ROLE_ALIASES.values()) | set(SKILL_TO_ROLE.values())},
+                **{a: canonical_role(a) for a in ROLE_ALIASES},
+                "프론트엔드": "프론트엔드 개발자", "데브옵스": "데브옵스 엔지니어", "안드로이드 개발": "모바일 앱 개발자"}
+_ROLE_GENERIC = {"개발", "데이터", "AI", "HR", "TM", "MD", "리테일", "사무", "전략", "시설", "문화", "스포츠", "광고",
+                 "금융", "보험", "제조", "생산", "교육", "공공", "복지", "의료", "바이오", "미디어", "건축", "음료",
+                 "고객서비스"}
+_ROLES = dict(_NAMED_ROLES)
+for _r in _enum_values(E_role):
+    for _p in _r.split("·"):
+        if len(_p) >= 2 and _p not in _ROLE_GENERIC:
+            _ROLES.setdefault(_p, _p)
+
+_NEG_RE = re.compile(r"^\s*(?:말고|제외|빼고|싫|아닌|불가|x\b)")
+_LATIN_WORD_RE = re.compile(r"[a-z][a-z0-9+#.]*")
+_CAREER_RE = [
+    (re.compile(r"경력\s*무관|신입\s*/\s*경력|신입\s*또는\s*경력"), "무관", 0.9),
+    (re.compile(r"(?:경력|경험)[^\d,./]{0,6}?\d{1,2}\s*년(?!제)|\d{1,2}\s*년\s*(?:차|경력|경험)|경력직|경력자"), "경력", 0.9),
+    (re.compile(r"신입"), "신입", 1.0),
+]
+
+# 잔여 토큰 판단용 불용어(조사/어미를 뗀 뒤 비교)
+_STOP = set("""거주 가능 보유 희망 졸 졸업 예정 있음 있어요 있습니다 경험 공부 공부했고 찾고 찾음 찾습니다 찾고있어요 일 쪽
+해보고 싶음 싶어요 싶습니다 취업 근무 선호 이상 이하 등 및 사용 활용 관심 원함 구함 괜찮음 괜찮아요 재학 재학중 학년
+중 저는 나는 제가 또는 혹은 그리고 정도 수준 년 개월 프로젝트 해봄 했음 했습니다 조금 약간 능숙 가능자 위주 분야 직무
+회사 기업 일하고 일할 지원 취득 활동 서비스 개발 구축 운영 파이프라인 연구 경력 신입 학력 지역 고용형태 자격증 전공
+연봉 만원 만 원 지원 지원합니다 수료 준비 사무직 말고 제외 빼고 싫음 아닌 불가 개발자 엔지니어 포지션 예요 이에요 입니다 합니다 해요 할 수 잘 좀 쪽으로 으로 정규 하고 싶은 싶다 되는 되고 희망함 희망합니다
+a an the and or with in of to for""".split())
+_JOSA_RE = re.compile(r"(에서|으로|부터|까지|이고|이며|하고|했고|하며|하는|로|을|를|이|가|은|는|도|과|와|의|에|만|랑|한)$")
+
+def _pattern(key: str) -> re.Pattern:
+    k = key.lower()
+    if k.isascii():
+        return re.compile(rf"(?<![a-z0-9+#]){re.escape(k)}(?![a-z0-9+#])")
+    return re.compile(r"\s*".join(re.escape(ch) for ch in k if not ch.isspace()))
+
+_PATTERN_CACHE: Dict[str, re.Pattern] = {}
+def _compiled(key: str) -> re.Pattern:
+    p = _PATTERN_CACHE.get(key)
+    if p is None:
+        p = _PATTERN_CACHE[key] = _pattern(key)
+    return p
+
+class _Scan:
+    """소문자 원문 + 이미 소비한 구간. 긴 키부터 맞춰 겹치는 짧은 키(예: '서울시'의 '서울')는 버림."""
+    def __init__(self, text: str):
+        self.raw = text or ""
+        self.text = self.raw.lower()
+        self.used = [False] * len(self.text)
+
+    def _free(self, s: int, e: int) -> bool:
+        return not any(self.used[s:e])
+
+    def _take(self, s: int, e: int):
+        for i in range(s, e):
+            self.used[i] = True
+
+    def negated(self, e: int, extra: Optional[re.Pattern] = None) -> bool:
+        tail = self.text[e:e + 12]
+        return bool(_NEG_RE.match(tail) or (extra is not None and extra.match(tail)))
+
+    def latin_context_ok(self, s: int, e: int, known: Dict[str, Any]) -> bool:
+        """
+        'go', 'c', 'r' 같은 아주 짧은 영문 키: 바로 옆 영문 단어가 사전에 없는 일반 단어면 문장의 일부로 봄
+        ('go to market', 'R&D', 'C-level' 제외 / 'Python, Go', 'C 언어', 'Go SQL' 허용).
+        """
+        if (e < len(self.text) and self.text[e] in "&'-") or (s > 0 and self.text[s - 1] in "&'-"):
+            return False
+        prev = re.search(r"[a-z][a-z0-9+#.]*$", self.text[:s].rstrip())
+        nxt = _LATIN_WORD_RE.match(self.text[e:].lstrip())
+        return all(w is None or w.group(0) in known for w in (prev, nxt))
+
+    def lexicon(self, lex: Dict[str, Any], extra_neg: Optional[re.Pattern] = None,
+                short_ascii: int = 0) -> List[Tuple[int, Any, str]]:
+        """
+        (위치, 대표값, 원문 표기) — 부정('말고/제외')이나 extra_neg가 뒤따르면 소비만 하고 결과에서 뺌.
+        short_ascii: 이 길이 이하의 영문 키는 latin_context_ok일 때만 인정(아니면 소비하지 않음 → 잔여로 남음).
+        """
+        hits = []
+        for key in sorted(lex, key=len, reverse=True):
+            short = len(key) <= short_ascii and key.isascii()
+            for m in _compiled(key).finditer(self.text):
+                s, e = m.span()
+                if not self._free(s, e):
+                    continue
+                if short and not self.latin_context_ok(s, e, lex):
+                    continue
+                self._take(s, e)
+                if not self.negated(e, extra_neg):
+                    hits.append((s, lex[key], self.raw[s:e]))
+        return sorted(hits, key=lambda h: h[0])
+
+    def regex(self, rx: re.Pattern, extra_neg: Optional[re.Pattern] = None) -> List[re.Match]:
+        out = []
+        for m in rx.finditer(self.text):
+            s, e = m.span()
+            if self._free(s, e):
+                self._take(s, e)
+                if not self.negated(e, extra_neg):
+                    out.append(m)
+        return out
+
+    def residual(self) -> List[str]:
+        rest = "".join(c if not u else " " for c, u in zip(self.text, self.used))
+        out = []
+        for tok in re.findall(r"[가-힣]+|[a-z][a-z0-9+#.]*", rest):
+            tok = _JOSA_RE.sub("", tok) if re.match(r"[가-힣]", tok) else tok.strip(".")
+            if len(tok) < 2 or tok in _STOP:
+                continue
+            out.append(tok)
+        return out
+
+def _uniq(vals: Iterable[Any]) -> List[Any]:
+    return [v for v in dict.fromkeys(v for v in vals if v)]
+
+class RuleSpec:
+    """extract_spec 결과: spec + 필드별 확신도(0~1) + 사전으로 설명되지 않은 잔여 토큰."""
+    def __init__(self, spec: Spec, confidence: Dict[str, float], residual: List[str]):
+        self.spec = spec
+        self.confidence = confidence
+        self.residual = residual
+
+    @property
+    def unresolved(self) -> List[str]:
+        return [f for f in FIELDS if self.confidence.get(f, 0.0) < SPEC_RULES_MIN_CONF]
+
+    @property
+    def needs_llm(self) -> bool:
+        """사전이 설명하지 못한 내용이 남아 있고, 그 내용이 들어갈 빈 필드가 있을 때만 LLM 호출."""
+        return bool(self.residual) and bool(self.unresolved)
+
+def provisional_roles(user_text: str, limit: Optional[int] = None) -> List[str]:
+    """
+    LLM 없이 원문에서 잠정 직무 추출(role_map 사전).
+    직무명/별칭(ROLE_ALIASES → canonical_role)을 먼저, 기술 스택(role_from_skills)을 다음으로, 각각 등장 순서대로.
+    """
+    sc = _Scan(user_text)
+    named = [v for _, v, _ in sc.lexicon(_NAMED_ROLES)]
+    from_skills = [role_from_skills([k]) for _, k, _ in sc.lexicon({k: k for k in SKILL_TO_ROLE})]
+    out = _uniq(named + from_skills)
+    return out if limit is None else out[:max(0, limit)]
+
+def extract_spec(user_text: str) -> RuleSpec:
+    sc = _Scan(user_text)
+    spec = Spec()
+    conf: Dict[str, float] = {}
+
+    def _single(field: str, hits: List[Tuple[int, Any, str]], full: float = 1.0):
+        vals = _uniq(v for _, v, _ in hits)
+        if vals:
+            conf[field] = full if len(vals) == 1 else full * 0.85
+        return vals
+
+    # 자격증을 먼저: 전산회계의 '회계', 정보보안기사의 '보안'이 직무로 잡히지 않도록. '준비 중/취득 예정'은 보유 아님
+    certs = _uniq([v for _, v, _ in sc.lexicon(_CERTS, _CERT_PENDING_RE)]
+                  + [m.group(0) for m in sc.regex(_CERT_RE, _CERT_PENDING_RE)])
+    if certs:
+        spec.certifications, conf["certifications"] = certs, 1.0
+    elif sc.regex(re.compile(r"자격증\s*(?:없음|없어|x)")):
+        conf["certifications"] = 1.0
+
+    # 직무: 명시된 직무명/별칭만 role로(기술 스택에서 유추한 직무는 LLM/매핑 단계에 맡김)
+    roles = _single("role", sc.lexicon(_ROLES))
+    if roles:
+        spec.role = roles[0]
+
+    locs = [h for h in sc.lexicon(_LOCATION) if h[1]]
+    vals = _single("location", locs)
+    if vals:
+        spec.location = vals[0]
+
+    edus = _single("education", sc.lexicon(_EDUCATION))
+    if edus:
+        spec.education = max(edus, key=lambda v: _EDU_RANK.get(v, -1))
+    elif sc.regex(re.compile(r"[1-4]\s*학년|졸업\s*예정")):
+        spec.education, conf["education"] = "대졸(4년)", 0.7   # 재학/졸업 예정 → 추정
+
+    levels = {level: c for rx, level, c in _CAREER_RE if sc.regex(rx)}
+    if "무관" in levels:
+        spec.career.level, conf["career.level"] = "무관", levels["무관"]
+    elif len(levels) == 2:   # '신입인데 인턴 경력 1년' 등 → 신입으로 두되 LLM에 다시 물음
+        spec.career.level, conf["career.level"] = "신입", 0.6
+    elif levels:
+        (spec.career.level, conf["career.level"]), = levels.items()
+
+    emps = _single("employment_type", sc.lexicon(_EMPLOYMENT))
+    if emps:
+        spec.employment_type = emps[0]
+
+    majors = [v for _, v, _ in sc.lexicon(_MAJORS)]
+    majors += [_major_name(m) for m in sc.regex(_MAJOR_RE)]
+    majors = _uniq(majors)
+    if majors:
+        spec.major, conf["major"] = majors[0], (1.0 if len(majors) == 1 else 0.85)
+
+    kws = _uniq(v for _, v, _ in sc.lexicon(_KEYWORDS))
+    if kws:
+        spec.keywords, conf["keywords"] = kws, 0.9
+
+    skills = _uniq(v if v else raw for _, v, raw in sc.lexicon(_SKILLS, short_ascii=2))
+    if skills:
+        spec.skills, conf["skills"] = skills, 1.0
+
+    inds = _single("industry", sc.lexicon(_INDUSTRY), full=0.9)
+    if inds:
+        spec.industry = inds[0]
+
+    # PARSE_SYS 밖이지만 사전으로 확실한 보조 필드(매핑 단계에서 사용)
+    spec.company_types = _uniq(v for _, v, _ in sc.lexicon(_COMPANY_TYPES))
+    spec.pref_conditions = _uniq(v for _, v, _ in sc.lexicon(_PREF_CONDITIONS))
+    for m in sc.regex(_SALARY_RE):
+        amount, cmp_ = int(m.group(1)), m.group(2) or "이상"
+        if cmp_ == "이상" and amount >= 5000:
+            spec.salary_brackets = ["5000만 이상"]
+        elif cmp_ == "이하" and amount <= 3000:
+            spec.salary_brackets = ["3000만 이하"]
+        else:
+            lo = max(3000, min(4000, amount // 1000 * 1000))
+            spec.salary_brackets = [f"{lo}만-{lo + 1000}만"]
+
+    _count(spec, conf)
+    return RuleSpec(spec, conf, sc.residual())
+
+# ---------- 통계 ----------
+_stats_lock = threading.Lock()
+_counters = {"calls": 0, "skipped_llm": 0, "partial_llm": 0, "fields_from_rules": 0, "fields_from_llm": 0}
+
+def _count(spec: Spec, conf: Dict[str, float]):
+    with _stats_lock:
+        _counters["calls"] += 1
+        _counters["fields_from_rules"] += sum(1 for f in FIELDS if conf.get(f, 0.0) >= SPEC_RULES_MIN_CONF)
+
+def record_outcome(result: RuleSpec, llm_fields: int = 0):
+    """parse_spec이 LLM을 건너뛰었는지/몇 필드를 물었는지 기록."""
+    with _stats_lock:
+        if llm_fields:
+            _counters["partial_llm"] += 1
+            _counters["fields_from_llm"] += llm_fields
+        else:
+            _counters["skipped_llm"] += 1
+
+def rules_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        out = dict(_counters)
+    out["skip_rate"] = round(out["skipped_llm"] / out["calls"], 3) if out["calls"] else 0.0
+    return out
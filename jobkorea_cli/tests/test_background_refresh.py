@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+from jobkorea_cli import crawler_rolesearch as cr
+from jobkorea_cli.models import PostingDoc
+
+def _doc(n):
+    return PostingDoc(gi_no=str(n), title="", url=f"https://example.com/{n}")
+
+def test_refreshes_without_service_run_one_at_a_time(monkeypatch):
+    state = {"now": 0, "max": 0, "done": []}
+
+    async def fake_refresh(store, docs, backend, service=None):
+        state["now"] += 1
+        state["max"] = max(state["max"], state["now"])
+        await asyncio.sleep(0.02)
+        state["now"] -= 1
+        state["done"].extend(d.gi_no for d in docs)
+
+    monkeypatch.setattr(cr, "_refresh_docs", fake_refresh)
+    for i in range(4):
+        cr._refresh_in_background(None, [_doc(i)], "http")
+    cr._refresh_in_background(None, [_doc(0)], "http")   # 갱신 중인 공고는 다시 넣지 않음
+
+    deadline = time.time() + 5
+    while (cr._refresh_worker_running or cr._refreshing) and time.time() < deadline:
+        time.sleep(0.01)
+    assert sorted(state["done"]) == ["0", "1", "2", "3"]
+    assert state["max"] == 1
+    assert not cr._refreshing and not cr._refresh_queue
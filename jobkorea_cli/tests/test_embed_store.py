@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from jobkorea_cli.embed_store import EmbedStore
+
+DIM = 4
+
+def _vecs(n, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, DIM)).astype("float32")
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbedStore("test/model", DIM, root=str(tmp_path))
+
+def test_put_then_lookup_roundtrip(store):
+    v = _vecs(3)
+    store.put(["a", "b", "c"], v)
+    out, missing = store.lookup(["c", "x", "a"])
+    assert missing == [1]
+    np.testing.assert_array_equal(out[0], v[2])
+    np.testing.assert_array_equal(out[2], v[0])
+
+def test_put_is_idempotent_per_text(store):
+    store.put(["a"], _vecs(1, 1))
+    store.put(["a", "b"], _vecs(2, 2))
+    assert store.stats()["rows"] == 2
+    np.testing.assert_array_equal(store.lookup(["a"])[0][0], _vecs(1, 1)[0])
+
+def test_other_process_sees_rows(store, tmp_path):
+    v = _vecs(2)
+    store.put(["a", "b"], v)
+    other = EmbedStore("test/model", DIM, root=str(tmp_path))
+    out, missing = other.lookup(["b"])
+    assert missing == []
+    np.testing.assert_array_equal(out[0], v[1])
+
+def test_compact_keeps_recent_and_remaps_other_readers(store, tmp_path):
+    v = _vecs(3)
+    store.put(["a", "b", "c"], v)
+    other = EmbedStore("test/model", DIM, root=str(tmp_path))
+    other.lookup(["a"])   # 이전 generation을 매핑해 둠
+    store.lookup(["c"])
+    assert store.compact(max_rows=1) == {"before": 3, "after": 1, "evicted": 2}
+    out, missing = other.lookup(["c", "a"])
+    assert missing == [1]
+    np.testing.assert_array_equal(out[0], v[2])
+    # 압축 후에도 추가/조회 정상
+    store.put(["d"], _vecs(1, 9))
+    np.testing.assert_array_equal(other.lookup(["d"])[0][0], _vecs(1, 9)[0])
+
+def test_compact_empty_store(store):
+    assert store.compact(max_rows=10) == {"before": 0, "after": 0, "evicted": 0}
+    store.put(["a"], _vecs(1))
+    assert store.lookup(["a"])[1] == []
+
+def test_compact_without_vector_file(store, tmp_path):
+    store.put(["a"], _vecs(1))
+    store.path.unlink()
+    fresh = EmbedStore("test/model", DIM, root=str(tmp_path))   # 매핑해 둔 것이 없는 프로세스
+    assert fresh.compact(max_rows=10)["evicted"] == 1
+    assert fresh.lookup(["a"])[1] == [0]
+
+def test_lookup_buffers_access_updates(store):
+    store.put(["a", "b", "c"], _vecs(3))
+    store.lookup(["a", "a", "b"])
+    # 조회는 쓰지 않음 — 접근 기록은 메모리에 모였다가 flush/compact/stats 때 한 번에
+    assert store._conn.execute("SELECT SUM(hits) FROM vectors").fetchone()[0] == 0
+    assert store.stats()["stored_hits"] == 2
+    assert store.counters["touch_flushes"] == 1
+
+def test_compact_uses_buffered_access_order(store):
+    v = _vecs(3)
+    store.put(["a", "b", "c"], v)
+    store.lookup(["a"])
+    assert store.compact(max_rows=1)["after"] == 1
+    out, missing = store.lookup(["a", "b"])
+    assert missing == [1]
+    np.testing.assert_array_equal(out[0], v[0])
+    assert not out[1].any()
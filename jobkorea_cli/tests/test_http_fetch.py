@@ -0,0 +1,14 @@
+import asyncio
+
+from jobkorea_cli import http_fetch
+
+def test_aclose_clients_closes_the_loop_client():
+    async def run():
+        async with http_fetch.get_client() as c:
+            pass
+        await http_fetch.aclose_clients()
+        await http_fetch.aclose_clients()   # 두 번 불러도 무해
+        return c
+    c = asyncio.run(run())
+    assert c.is_closed
+    assert not any(cl is c for cl in http_fetch._clients.values())
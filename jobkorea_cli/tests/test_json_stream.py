@@ -0,0 +1,100 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+
+from jobkorea_cli import llm
+from jobkorea_cli.json_stream import IncrementalJSONParser, find_json_block
+
+DOC = '```json\n{"expanded_roles": ["백엔드 개발자", "서버 개발자"], "note": "a,b]}", "n": 2}\n```'
+
+def _feed_all(chunks):
+    p, events = IncrementalJSONParser(), []
+    for c in chunks:
+        events += p.feed(c)
+    return p, events
+
+def test_items_and_fields_in_order():
+    p, events = _feed_all([DOC])
+    assert events == [("item", "expanded_roles", "백엔드 개발자"), ("item", "expanded_roles", "서버 개발자"),
+                      ("field", "expanded_roles", ["백엔드 개발자", "서버 개발자"]),
+                      ("field", "note", "a,b]}"), ("field", "n", 2)]
+    assert p.done and p.result()["n"] == 2
+
+def test_split_at_every_character_gives_same_events():
+    _, whole = _feed_all([DOC])
+    _, split = _feed_all(list(DOC))
+    assert split == whole
+
+def test_truncated_object_keeps_finished_fields():
+    p, events = _feed_all(['{"a": 1, "roles": ["x", "y'])
+    assert not p.done
+    assert ("item", "roles", "x") in events
+    assert p.result() == {"a": 1}
+
+def test_buf_read_between_chunks_keeps_offsets():
+    p, events = IncrementalJSONParser(), []
+    for c in DOC:
+        events += p.feed(c)
+        assert DOC.startswith(p.buf)   # 중간에 합쳐도 이후 슬라이스 위치가 어긋나지 않음
+    assert p.buf == DOC
+    assert events == _feed_all([DOC])[1]
+
+def test_many_small_chunks_do_not_rescan():
+    body = ", ".join(f'"r{i}"' for i in range(20000))
+    p, events = _feed_all(list('{"roles": [' + body + '], "n": 1}'))
+    assert p._i == p._n and p.done
+    assert len(events) == 20000 + 2
+
+def test_find_json_block():
+    assert find_json_block('설명 "따옴표" {"a": [1, {"b": "}"}]} 뒤') == '{"a": [1, {"b": "}"}]}'
+    assert find_json_block('{"a": {"b": 1}, "c": ') == '{"b": 1}'
+    assert find_json_block("json 없음") is None
+
+def _sse(*events):
+    lines = [f"data: {json.dumps(e, ensure_ascii=False)}" for e in events]
+    return ("\n\n".join([": keep-alive", *lines, "data: not-json", "data: [DONE]", 'data: {"choices": '
+                         '[{"delta": {"content": "after done"}}]}']) + "\n\n").encode()
+
+def test_sse_stream_yields_content_pieces(monkeypatch):
+    body = _sse({"choices": [{"delta": {"role": "assistant"}}]},
+                {"choices": [{"delta": {"content": '{"a":'}}]},
+                {"choices": [{"delta": {"content": " 1}"}}]},
+                {"choices": [], "usage": {"total_tokens": 42}})
+    transport = httpx.MockTransport(lambda req: httpx.Response(200, content=body,
+                                                               headers={"content-type": "text/event-stream"}))
+
+    @asynccontextmanager
+    async def client():
+        async with httpx.AsyncClient(transport=transport) as c:
+            yield c
+
+    monkeypatch.setattr(llm, "get_client", client)
+
+    async def run():
+        return [p async for p in llm._stream_chat({"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "x"}]})]
+    assert asyncio.run(run()) == ['{"a":', " 1}"]
+
+def test_sse_slow_consumer_not_counted_as_latency(monkeypatch):
+    body = _sse(*[{"choices": [{"delta": {"content": str(i)}}]} for i in range(3)])
+    transport = httpx.MockTransport(lambda req: httpx.Response(200, content=body))
+
+    @asynccontextmanager
+    async def client():
+        async with httpx.AsyncClient(transport=transport) as c:
+            yield c
+
+    observed = []
+    lim = llm.get_limiter(llm.OPENAI_HOST)
+    monkeypatch.setattr(llm, "get_client", client)
+    monkeypatch.setattr(lim, "observe", lambda latency, status: observed.append((latency, status)))
+
+    async def run():
+        out = []
+        async for p in llm._stream_chat({"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "x"}]}):
+            out.append(p)
+            await asyncio.sleep(0.1)   # 느린 SSE 클라이언트
+        return out
+    assert asyncio.run(run()) == ["0", "1", "2"]
+    assert len(observed) == 1 and observed[0][1] == 200 and observed[0][0] < 0.1
@@ -0,0 +1,34 @@
+import asyncio
+
+from jobkorea_cli import llm
+from jobkorea_cli.models import Spec
+
+def test_wrongly_typed_fields_are_coerced():
+    spec, applied = llm._split_parse_map({"spec": {"skills": "Python, SQL", "career": "신입", "location": "서울"},
+                                          "expanded_roles": ["백엔드 개발자"]})
+    assert spec.skills == ["Python", "SQL"] and spec.career.level == "신입"
+    assert applied["expanded_roles"] == ["백엔드 개발자"]
+
+def test_unusable_spec_returns_none():
+    assert llm._split_parse_map({"spec": {"career": {"level": ["신입"]}}}) is None
+
+def test_parse_and_map_falls_back_to_two_calls(monkeypatch):
+    calls = []
+
+    async def call_llm(messages, **kw):
+        return '{"spec": {"career": {"level": ["신입"]}}, "expanded_roles": ["x"]}'
+
+    async def parse_spec(text):
+        calls.append("parse_spec")
+        return Spec(role="백엔드 개발자")
+
+    async def map_filters(spec):
+        calls.append("map_filters")
+        return {"expanded_roles": ["백엔드 개발자"]}
+
+    monkeypatch.setattr(llm, "call_llm", call_llm)
+    monkeypatch.setattr(llm, "parse_spec", parse_spec)
+    monkeypatch.setattr(llm, "map_filters", map_filters)
+    spec, applied = asyncio.run(llm.parse_and_map("백엔드 신입"))
+    assert calls == ["parse_spec", "map_filters"]
+    assert spec.role == "백엔드 개발자" and applied["expanded_roles"] == ["백엔드 개발자"]
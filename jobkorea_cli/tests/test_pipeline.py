@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from jobkorea_cli import pipeline
+from jobkorea_cli.models import Spec, PostingDoc
+
+class FakeSession:
+    """역할마다 공고 2개를 0.02초 간격으로 on_result에 넘기는 가짜 CrawlSession."""
+    closed = False
+
+    def __init__(self, per_role, on_result=None, **_):
+        self.on_result, self.roles = on_result, {}
+
+    def add(self, role):
+        async def crawl():
+            docs = []
+            for i in range(2):
+                await asyncio.sleep(0.02)
+                d = PostingDoc(gi_no=f"{role}-{i}", title=f"{role} {i}", url="")
+                docs.append(d)
+                if self.on_result:
+                    self.on_result(role, d)
+            return docs, {}
+        return self.roles.setdefault(role, asyncio.ensure_future(crawl()))
+
+    async def aclose(self, stats=None):
+        FakeSession.closed = True
+        for f in self.roles.values():
+            f.cancel()
+        await asyncio.gather(*self.roles.values(), return_exceptions=True)
+
+@pytest.fixture
+def fake(monkeypatch):
+    async def events(text, mode, stream_map):
+        await asyncio.sleep(0.01)
+        yield "role", "백엔드 개발자"
+        await asyncio.sleep(0.05)
+        yield "done", (Spec(role="백엔드 개발자"), {"expanded_roles": ["백엔드 개발자", "서버 개발자"]})
+
+    FakeSession.closed = False
+    monkeypatch.setattr(pipeline, "CrawlSession", FakeSession)
+    monkeypatch.setattr(pipeline, "_spec_map_events", events)
+    monkeypatch.setattr(pipeline, "provisional_roles", lambda text, limit: ["데이터 분석가", "백엔드 개발자"])
+    monkeypatch.setattr(pipeline, "HYBRID_RANK", False)
+    monkeypatch.setattr(pipeline, "POSTING_RERANK", False)
+
+def test_stream_matches_non_streaming_result(fake):
+    async def run():
+        evs = [ev async for ev in pipeline.iter_speculative_search("백엔드", speculate=True)]
+        _, _, grouped = await pipeline.speculative_search("백엔드", speculate=True)
+        return evs, grouped
+    evs, grouped = asyncio.run(run())
+    kinds = [k for k, _ in evs]
+    assert kinds[0] == "role" and kinds[-1] == "done"
+    # 빗나간 추측(데이터 분석가)의 공고는 내보내지 않음
+    roles = [v for k, v in evs if k == "role"]
+    assert roles == ["백엔드 개발자", "서버 개발자"]
+    posted = {(r, d.gi_no) for k, (r, d) in ((k, v) for k, v in evs if k == "posting")}
+    assert {r for r, _ in posted} == {"백엔드 개발자", "서버 개발자"} and len(posted) == 4
+    done = evs[-1][1][2]
+    assert {r: [d.gi_no for d in ds] for r, ds in done.items()} == \
+           {r: [d.gi_no for d in ds] for r, ds in grouped.items()}
+
+def test_closing_stream_cancels_pipeline(fake):
+    async def run():
+        agen = pipeline.iter_speculative_search("백엔드", speculate=True)
+        first = await agen.__anext__()
+        await agen.aclose()
+        return first
+    assert asyncio.run(run())[0] == "role"
+    assert FakeSession.closed
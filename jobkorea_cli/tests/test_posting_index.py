@@ -0,0 +1,74 @@
+import json
+import time
+
+import numpy as np
+
+from jobkorea_cli.posting_index import PostingIndex, text_hash
+
+DIM = 8
+
+def _unit(n, seed=0):
+    x = np.random.default_rng(seed).standard_normal((n, DIM)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+def test_upsert_and_scores():
+    idx = PostingIndex(DIM, "flat")
+    v = _unit(3)
+    idx.add(["1", "2", "3"], v, ["h1", "h2", "h3"])
+    idx.add(["2"], v[:1], ["h2b"])   # 같은 gi_no는 교체
+    assert len(idx) == 3
+    sims = idx.scores(v[0], ["1", "2", "404"])
+    assert set(sims) == {"1", "2"}
+    assert abs(sims["2"] - 1.0) < 1e-5
+
+def test_needs_reembed_when_text_changes():
+    idx = PostingIndex(DIM, "flat")
+    card = "passage: 백엔드 개발자 회사"
+    idx.add(["1"], _unit(1), [text_hash(card)])
+    assert not idx.needs("1", text_hash(card))
+    assert idx.needs("1", text_hash(card + " Django FastAPI 경력 3년"))
+    assert idx.needs("2", text_hash(card))
+
+def test_save_load_roundtrip(tmp_path):
+    path = str(tmp_path / "p.faiss")
+    idx = PostingIndex(DIM, "flat")
+    idx.add(["1", "2"], _unit(2), ["a", "b"])
+    idx.save(path)
+    back = PostingIndex.load(path)
+    assert back is not None and len(back) == 2
+    assert not back.needs("2", "b")
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_load_rejects_mismatched_sidecar(tmp_path):
+    path = tmp_path / "p.faiss"
+    idx = PostingIndex(DIM, "flat")
+    idx.add(["1", "2"], _unit(2))
+    idx.save(str(path))
+    side = tmp_path / "p.faiss.json"
+    meta = json.loads(side.read_text(encoding="utf-8"))
+    meta["ntotal"] = 1   # 인덱스와 사이드카 중 하나만 교체된 상태
+    side.write_text(json.dumps(meta), encoding="utf-8")
+    assert PostingIndex.load(str(path)) is None
+
+def test_save_later_coalesces(tmp_path):
+    idx = PostingIndex(DIM, "flat")
+    idx.path = str(tmp_path / "p.faiss")
+    idx.add(["1"], _unit(1))
+    idx.save_later(0.05)
+    idx.add(["2"], _unit(1, 1))
+    idx.save_later(0.05)
+    time.sleep(0.3)
+    back = PostingIndex.load(idx.path)
+    assert back is not None and len(back) == 2
+
+def test_delete_schedules_save(tmp_path, monkeypatch):
+    monkeypatch.setattr("jobkorea_cli.posting_index.POSTING_INDEX_SAVE_SEC", 0.05)
+    idx = PostingIndex(DIM, "flat")
+    idx.path = str(tmp_path / "p.faiss")
+    idx.add(["1", "2"], _unit(2))
+    idx.save()
+    assert idx.delete(["1", "404"]) == 1
+    assert idx.delete(["404"]) == 0
+    time.sleep(0.3)
+    back = PostingIndex.load(idx.path)
+    assert back is not None and len(back) == 1 and not back.has("1")
@@ -0,0 +1,54 @@
+from jobkorea_cli.models import Spec, Career, PostingDoc
+from jobkorea_cli.ranking import BM25Index, hard_filter, rank, regions, location_matches
+
+def _doc(gi_no, title, location="", jd_text=""):
+    return PostingDoc(gi_no=gi_no, title=title, url="", company="회사", location=location, jd_text=jd_text)
+
+def test_bm25_prefers_matching_terms():
+    ix = BM25Index(["파이썬 백엔드 개발자 django", "회계 담당자 채용", "프론트엔드 react 개발자"])
+    s = ix.scores("백엔드 python django")
+    assert s.argmax() == 0 and s[1] == 0.0
+
+def test_bm25_empty_and_unknown_query():
+    assert BM25Index([]).scores("백엔드").shape == (0,)
+    assert not BM25Index(["회계 담당자"]).scores("kubernetes").any()
+
+def test_region_aliases():
+    assert regions("성남시 분당구", leading=True) == {"경기"}
+    assert regions("서울특별시 강남구", leading=True) == {"서울"}
+    assert regions("경기 광주시", leading=True) == {"경기"}
+    assert location_matches("경기", "성남시 분당구")
+    assert location_matches("판교", "경기 성남시")
+    assert not location_matches("서울", "부산 해운대구")
+    assert location_matches("서울", "전국")
+
+def test_hard_filter_location_uses_region_table():
+    spec = Spec(location="경기")
+    assert hard_filter(spec, _doc("1", "백엔드", "성남시 분당구")) is None
+    assert hard_filter(spec, _doc("2", "백엔드", "서울 강남구")) == "location"
+
+def test_filtered_postings_are_demoted_by_default():
+    spec = Spec(location="서울", career=Career(level="신입"), skills=["Python"])
+    docs = [_doc("1", "python 백엔드", "부산 해운대구"), _doc("2", "자바 개발", "서울 마포구"),
+            _doc("3", "python 개발", "서울 강남구")]
+    st = {}
+    out = rank(spec, docs, stats=st)
+    assert [d.gi_no for d, _ in out] == ["3", "2", "1"]
+    assert out[-1][1]["filtered"] == "location"
+    assert st["filtered"] == {"location": 1} and st["ranked"] == 2 and st["demoted"] == 1
+
+def test_drop_mode_removes_filtered():
+    spec = Spec(location="서울")
+    docs = [_doc("1", "python", "부산"), _doc("2", "python", "서울")]
+    assert [d.gi_no for d, _ in rank(spec, docs, filter_mode="drop")] == ["2"]
+
+def test_cross_role_copies_share_one_document():
+    spec = Spec(skills=["Python"])
+    a, b = _doc("1", "python 백엔드"), _doc("1", "python 백엔드")
+    st = {}
+    out = rank(spec, [a, b, _doc("2", "회계 담당자"), _doc("3", "영업 관리")], stats=st)
+    assert st["unique"] == 3
+    assert a.score == b.score and {d.gi_no for d, _ in out[:2]} == {"1"}
+    # 사본을 따로 세면 df가 2가 되어 점수가 달라짐
+    assert out[0][1]["bm25"] == round(float(BM25Index(["python 백엔드 회사", "회계 담당자 회사", "영업 관리 회사"])
+                                            .scores("Python")[0]), 4)
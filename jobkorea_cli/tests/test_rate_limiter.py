@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from jobkorea_cli.rate_limiter import AdaptiveLimiter
+
+def _limiter(**kw):
+    conf = dict(rate_per_sec=4.0, burst=100, min_rate=0.1, max_rate=10.0, cooldown=0.0)
+    conf.update(kw)
+    return AdaptiveLimiter(**conf)
+
+def test_success_increases_rate():
+    lim = _limiter(increase=0.5)
+    lim.observe(0.01, 200)
+    assert lim.rate == pytest.approx(4.5)
+
+def test_429_halves_rate():
+    lim = _limiter()
+    lim.observe(0.01, 429)
+    assert lim.rate == pytest.approx(2.0)
+
+def test_decrease_respects_cooldown():
+    lim = _limiter(cooldown=60.0)
+    lim.observe(0.01, 503)
+    lim.observe(0.01, 503)
+    assert lim.rate == pytest.approx(2.0)
+    assert lim.counters["throttled"] == 2 and lim.counters["decreases"] == 1
+
+def test_slow_response_decreases_gently():
+    lim = _limiter(target_latency=1.0, latency_decrease=0.5)
+    lim.observe(2.0, 200)
+    assert lim.rate == pytest.approx(2.0)
+
+def test_exception_in_slot_counts_as_5xx():
+    lim = _limiter()
+
+    async def run():
+        with pytest.raises(ValueError):
+            async with lim.slot():
+                raise ValueError
+
+    asyncio.run(run())
+    assert lim.rate == pytest.approx(2.0)
+
+def test_cancelled_slot_is_not_observed():
+    lim = _limiter()
+
+    async def run():
+        async def body():
+            async with lim.slot():
+                await asyncio.sleep(10)
+        t = asyncio.ensure_future(body())
+        await asyncio.sleep(0.01)
+        t.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await t
+
+    asyncio.run(run())
+    assert lim.rate == pytest.approx(4.0)
+    assert lim.counters["requests"] == 0
+
+def test_closed_generator_is_not_observed():
+    lim = _limiter()
+
+    async def gen():
+        async with lim.slot():
+            yield 1
+            yield 2
+
+    async def run():
+        g = gen()
+        await g.__anext__()
+        await g.aclose()
+
+    asyncio.run(run())
+    assert lim.rate == pytest.approx(4.0)
+    assert lim.counters["requests"] == 0
+
+def _cancel_one_waiter(lim):
+    """토큰 하나를 쓰고, 다음 take()를 대기 중에 취소한 뒤 새 예약의 대기 시간을 반환."""
+    async def run():
+        await lim.take()
+        t = asyncio.ensure_future(lim.take())
+        await asyncio.sleep(0.01)
+        t.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await t
+        return lim.reserve()
+    return asyncio.run(run())
+
+def test_cancelled_take_refunds_reservation():
+    lim = _limiter(rate_per_sec=2.0, burst=1)
+    # 환불이 없으면 취소된 예약만큼 0.5초 더 밀려 약 0.99초
+    assert _cancel_one_waiter(lim) == pytest.approx(0.49, abs=0.05)
+    assert lim.waiting == 0
+
+# ---------- 프로세스 간 공유 ----------
+from jobkorea_cli.rate_limiter import SharedAdaptiveLimiter
+
+def _shared(path, **kw):
+    conf = dict(rate_per_sec=4.0, burst=100, min_rate=0.1, max_rate=10.0, increase=0.1, cooldown=0.0)
+    conf.update(kw)
+    return SharedAdaptiveLimiter("test", path=str(path), **conf)
+
+def test_shared_decrease_is_not_overwritten_by_other_worker(tmp_path):
+    a, b = _shared(tmp_path / "rl.sqlite3"), _shared(tmp_path / "rl.sqlite3")
+    a.observe(0.01, 429)
+    assert a.shared.rate == pytest.approx(2.0)
+    b.observe(0.01, 200)   # B는 아직 4.0을 보고 있었음
+    b.reserve()
+    assert b.shared.rate == pytest.approx(2.1)
+    a.reserve()
+    assert a.rate == pytest.approx(2.1)
+
+def test_shared_cooldown_spans_workers(tmp_path):
+    a, b = _shared(tmp_path / "rl.sqlite3", cooldown=60.0), _shared(tmp_path / "rl.sqlite3", cooldown=60.0)
+    a.observe(0.01, 429)
+    b.observe(0.01, 429)
+    b.reserve()
+    assert b.rate == pytest.approx(2.0)
+
+def test_shared_increases_are_batched_into_reserve(tmp_path):
+    a, b = _shared(tmp_path / "rl.sqlite3"), _shared(tmp_path / "rl.sqlite3")
+    for _ in range(5):
+        a.observe(0.01, 200)
+    b.reserve()
+    assert b.rate == pytest.approx(4.0)   # 아직 A의 다음 reserve 전
+    a.reserve()
+    assert a.rate == pytest.approx(4.5)
+
+def test_shared_congestion_drops_pending_increase(tmp_path):
+    a = _shared(tmp_path / "rl.sqlite3")
+    for _ in range(5):
+        a.observe(0.01, 200)
+    a.observe(0.01, 503)
+    a.reserve()
+    assert a.rate == pytest.approx(2.0)
+
+def test_shared_rates_converge_under_mixed_feedback(tmp_path):
+    workers = [_shared(tmp_path / "rl.sqlite3") for _ in range(3)]
+    for i in range(30):
+        w = workers[i % 3]
+        w.observe(0.01, 429 if i % 10 == 9 else 200)
+        w.reserve()
+    for w in workers:
+        w.shared.tokens()   # 공유 행을 다시 읽음
+    assert len({round(w.shared.rate, 6) for w in workers}) == 1
+
+def test_shared_cancelled_take_refunds_reservation(tmp_path):
+    lim = _shared(tmp_path / "rl.sqlite3", rate_per_sec=2.0, burst=1)
+    assert _cancel_one_waiter(lim) == pytest.approx(0.49, abs=0.05)
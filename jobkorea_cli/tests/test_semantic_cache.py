@@ -0,0 +1,43 @@
+import numpy as np
+
+from jobkorea_cli.models import Spec, Career
+from jobkorea_cli.semantic_cache import SemanticCache, guard_key, spec_text
+
+def _vec(seed=0, dim=8):
+    v = np.random.default_rng(seed).standard_normal(dim).astype("float32")
+    return v / np.linalg.norm(v)
+
+def _spec(**kw):
+    base = dict(location="서울", career=Career(level="신입"), education="대졸(4년)", employment_type="정규직",
+                skills=["Python", "SQL"])
+    base.update(kw)
+    return Spec(**base)
+
+def test_specs_differing_only_in_role_do_not_share_entry():
+    cache = SemanticCache(threshold=0.95)
+    a, b = _spec(role="백엔드 개발자"), _spec(role="프론트엔드 개발자")
+    cache.put(spec_text(a), guard_key(a), _vec(), {"expanded_roles": ["백엔드"]})
+    # 임베딩이 완전히 같아도(코사인 1.0) 역할이 다르면 재사용하지 않음
+    hit, sim = cache.lookup(_vec(), guard_key(b))
+    assert hit is None and sim > 0.99
+    assert cache.stats()["guard_rejects"] == 1
+    assert cache.lookup_exact(spec_text(b), guard_key(b)) is None
+
+def test_industry_and_major_are_guarded():
+    a = _spec(role="데이터 분석가", industry="금융", major="통계학")
+    assert guard_key(a) != guard_key(_spec(role="데이터 분석가", industry="게임", major="통계학"))
+    assert guard_key(a) != guard_key(_spec(role="데이터 분석가", industry="금융", major="경영학"))
+
+def test_near_duplicate_with_same_guard_hits():
+    cache = SemanticCache(threshold=0.95)
+    a = _spec(role="백엔드 개발자")
+    b = _spec(role="백엔드 개발자", skills=["SQL", "Python", "Django"])
+    cache.put(spec_text(a), guard_key(a), _vec(), {"expanded_roles": ["백엔드"]})
+    hit, _ = cache.lookup(_vec(), guard_key(b))
+    assert hit == {"expanded_roles": ["백엔드"]}
+
+def test_location_mismatch_is_rejected():
+    cache = SemanticCache(threshold=0.95)
+    a, b = _spec(role="백엔드 개발자"), _spec(role="백엔드 개발자", location="부산")
+    cache.put(spec_text(a), guard_key(a), _vec(), {"expanded_roles": ["백엔드"]})
+    assert cache.lookup(_vec(), guard_key(b))[0] is None
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from jobkorea_cli import llm
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """캐시는 메모리 dict, 요청은 호출 횟수만 세는 가짜."""
+    cache, calls = {}, []
+
+    async def chat_uncached(payload, ck):
+        calls.append(ck)
+        await asyncio.sleep(0.05)
+        if payload["messages"][0]["content"] == "boom":
+            raise RuntimeError("boom")
+        cache[ck] = "ok"
+        return "ok"
+
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "test")
+    monkeypatch.setattr(llm, "_cache_get", cache.get)
+    monkeypatch.setattr(llm, "_cache_set", cache.__setitem__)
+    monkeypatch.setattr(llm, "_chat_uncached", chat_uncached)
+    monkeypatch.setattr(llm.llm_cache, "count_coalesced", lambda prefix: None)
+    return calls
+
+def _msg(text="hi"):
+    return [{"role": "user", "content": text}]
+
+def test_concurrent_calls_send_one_request(fake_llm):
+    async def run():
+        return await asyncio.gather(*[llm.call_llm(_msg()) for _ in range(5)])
+    assert asyncio.run(run()) == ["ok"] * 5
+    assert len(fake_llm) == 1
+    assert not llm._inflight
+
+def test_leader_error_reaches_waiters(fake_llm):
+    async def run():
+        return await asyncio.gather(*[llm.call_llm(_msg("boom")) for _ in range(3)], return_exceptions=True)
+    outs = asyncio.run(run())
+    assert all(isinstance(o, RuntimeError) for o in outs)
+    assert len(fake_llm) == 1
+
+def test_cancelled_leader_hands_over_to_waiter(fake_llm):
+    async def run():
+        leader = asyncio.ensure_future(llm.call_llm(_msg()))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(llm.call_llm(_msg()))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+    assert asyncio.run(run()) == "ok"
+    assert len(fake_llm) == 2   # 대기자가 새 leader로 다시 보냄
+    assert not llm._inflight
+
+def test_call_after_leader_finished_hits_cache(fake_llm):
+    async def run():
+        await llm.call_llm(_msg())
+        return await llm.call_llm(_msg())
+    assert asyncio.run(run()) == "ok"
+    assert len(fake_llm) == 1
@@ -0,0 +1,30 @@
+from jobkorea_cli.spec_rules import extract_spec
+
+def test_pending_certification_is_not_held():
+    r = extract_spec("정보보안기사 준비 중이고 파이썬 가능")
+    assert r.spec.certifications == []
+    assert r.spec.skills == ["Python"]
+    # '보안'이 직무로 새지 않도록 소비는 됨
+    assert r.spec.role is None or "보안" not in r.spec.role
+
+def test_pending_and_held_certifications_mixed():
+    r = extract_spec("SQLD 취득 예정, 정처기 보유")
+    assert r.spec.certifications == ["정보처리기사"]
+
+def test_negated_certification():
+    assert extract_spec("정보처리기사 말고 다른 자격증 없음").spec.certifications == []
+
+def test_short_skill_inside_english_phrase_is_not_a_skill():
+    r = extract_spec("go to market 전략 기획 희망")
+    assert "Go" not in r.spec.skills
+    assert "go" in r.residual and r.needs_llm
+
+def test_short_skill_with_context():
+    assert extract_spec("Python, Go 가능한 백엔드").spec.skills == ["Python", "Go"]
+    assert extract_spec("Python Go SQL 가능").spec.skills == ["Python", "Go", "SQL"]
+    assert extract_spec("C 언어, R 통계 가능").spec.skills == ["C", "R"]
+    assert extract_spec("golang 개발").spec.skills == ["Go"]
+
+def test_single_letter_in_compound_is_not_a_skill():
+    assert extract_spec("R&D 직무 희망").spec.skills == []
+    assert extract_spec("c-level 보고 경험").spec.skills == []
@@ -14,7 +14,8 @@ from langgraph.graph.message import add_messages
 # jobkorea_cli 모듈 (외부 의존)
 from jobkorea_cli.models import Spec
 from jobkorea_cli.llm import parse_spec, ask_required_batch, map_filters
-from jobkorea_cli.cli import crawl_by_roles_multi
+from jobkorea_cli.crawler_rolesearch import iter_crawl_by_roles
+from jobkorea_cli.http_fetch import aclose_clients
 
 # -------- 모델 및 DB 연결 -----------
 model = ChatOpenAI(model="gpt-5-2025-08-07")
@@ -157,32 +158,49 @@ if option == "공고 검색":
 
     if st.button("검색 실행"):
 
+        st.write("## 검색 결과")
+        status = st.empty()
+        status.info("🔍 스펙 분석 중...")
+
+        def render_doc(box, d):
+            box.markdown(f"**{d.title if d.title else '(제목 없음)'}**")
+            meta = " · ".join(x for x in [d.company, d.location, d.deadline] if x)
+            if meta:
+                box.write(meta)
+            box.write(f"🔗 [링크]({d.url})")
+            box.markdown("---")
+
+        # 역할 섹션을 먼저 그리고, 공고가 확정되는 대로 해당 섹션에 바로 추가
         async def run_cli_side(text):
             spec = await parse_spec(text)
             applied = await map_filters(spec)
             expanded_roles = applied.get("expanded_roles") or []
-            results = {}
+            boxes, counts = {}, {}
+            for role_kw in expanded_roles:
+                st.subheader(f"▶ {role_kw}")
+                boxes[role_kw] = st.container()
+                counts[role_kw] = 0
             if expanded_roles:
-                results = await crawl_by_roles_multi(expanded_roles, per_role=2)
-            return applied, results
-
-        applied, grouped = asyncio.run(run_cli_side(user_text))
-
-        st.write("## 검색 결과")
-
-        for role_kw in (applied.get("expanded_roles") or []):
-
-            docs = grouped.get(role_kw, [])
-
-            st.subheader(f"▶ {role_kw}")
+                status.info("📥 공고 수집 중...")
+                async for role_kw, d in iter_crawl_by_roles(expanded_roles, per_role=2):
+                    box = boxes.get(role_kw)
+                    if box is None:
+                        continue
+                    render_doc(box, d)
+                    counts[role_kw] += 1
+            for role_kw, n in counts.items():
+                if not n:
+                    boxes[role_kw].write("- (결과 없음)")
+            status.empty()
+
+        async def run_and_close(text):
+            # 실행마다 새 루프 → 끝나면 그 루프의 HTTP 클라이언트를 닫음
+            try:
+                await run_cli_side(text)
+            finally:
+                await aclose_clients()
 
-            if not docs:
-                st.write("- (결과 없음)")
-            else:
-                for d in docs:
-                    st.markdown(f"**{d.title if d.title else '(제목 없음)'}**")
-                    st.write(f"🔗 [링크]({d.url})")
-                    st.markdown("---")
+        asyncio.run(run_and_close(user_text))
 
 elif option == "자기소개서 작성":
 
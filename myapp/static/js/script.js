@@ -53,46 +53,121 @@ document.addEventListener('DOMContentLoaded', function() {
     updateGenerateButtonState();
 
     /**
-     * @description '공고 검색' 버튼 클릭 시, API를 호출하여 채용 공고를 검색하고 결과를 화면에 표시합니다.
+     * @description 공고 한 건을 결과 목록 요소로 만듭니다.
+     */
+    function renderJobItem(job) {
+        // 제목/회사/지역/마감일은 외부에서 긁어온 값 → innerHTML에 넣지 않고 textContent로만
+        const jobItem = document.createElement('div');
+        jobItem.classList.add('job-result-item');
+
+        const title = document.createElement('h4');
+        title.textContent = job.title || '(제목 없음)';
+        jobItem.appendChild(title);
+
+        const meta = [job.company, job.location, job.deadline].filter(Boolean).join(' · ');
+        if (meta) {
+            const metaP = document.createElement('p');
+            metaP.textContent = meta;
+            jobItem.appendChild(metaP);
+        }
+
+        const linkP = document.createElement('p');
+        linkP.textContent = '🔗 ';
+        const link = document.createElement('a');
+        link.textContent = '링크';
+        if (typeof job.url === 'string' && job.url.startsWith('https://')) {
+            link.href = job.url;
+            link.target = '_blank';
+            link.rel = 'noopener noreferrer';
+        }
+        linkP.appendChild(link);
+        jobItem.appendChild(linkP);
+        return jobItem;
+    }
+
+    /**
+     * @description '공고 검색' 버튼 클릭 시, 스트리밍 API(SSE)를 호출하여
+     * 역할 섹션을 먼저 그리고, 공고가 확정되는 대로 해당 역할 아래에 바로 추가합니다.
      */
     searchButton.addEventListener('click', async () => {
         const specText = document.getElementById('search-spec').value;
         const resultsDiv = document.getElementById('search-results');
         resultsDiv.innerHTML = '<p>🔍 검색 중입니다... 잠시만 기다려 주세요.</p>';
 
+        const roleLists = {};
+        const ensureRole = (role) => {
+            if (roleLists[role]) return roleLists[role];
+            if (Object.keys(roleLists).length === 0) resultsDiv.innerHTML = '';
+            const roleHeader = document.createElement('h3');
+            roleHeader.textContent = `▶ ${role}`;
+            const list = document.createElement('div');
+            list.innerHTML = '<p class="pending">⏳ 수집 중...</p>';
+            resultsDiv.appendChild(roleHeader);
+            resultsDiv.appendChild(list);
+            roleLists[role] = list;
+            return list;
+        };
+        const handleEvent = (event, data) => {
+            if (event === 'role') {
+                ensureRole(data);
+            } else if (event === 'roles') {
+                data.forEach(ensureRole);
+                if (Object.keys(roleLists).length === 0) {
+                    resultsDiv.innerHTML = '<p>- (결과 없음)</p>';
+                }
+            } else if (event === 'posting') {
+                const list = roleLists[data.role];
+                if (!list) return;
+                const pending = list.querySelector('.pending');
+                if (pending) pending.remove();
+                list.appendChild(renderJobItem(data));
+            } else if (event === 'done') {
+                // 최종 순서(랭킹 반영)로 다시 그림 — /api/search_jobs 결과와 같음
+                const results = (data && data.results) || {};
+                Object.entries(roleLists).forEach(([role, list]) => {
+                    const jobs = results[role];
+                    if (jobs && jobs.length > 0) {
+                        list.innerHTML = '';
+                        jobs.forEach(job => list.appendChild(renderJobItem(job)));
+                    } else if (!list.querySelector('.job-result-item')) {
+                        list.innerHTML = '<p class="pending">- (결과 없음)</p>';
+                    }
+                });
+            } else if (event === 'error') {
+                throw new Error(data.error);
+            }
+        };
+
         try {
-            const response = await fetch('/api/search_jobs/', {
+            const response = await fetch('/api/search_jobs/stream/', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ spec: specText })
             });
 
-            if (!response.ok) {
+            if (!response.ok || !response.body) {
                 throw new Error('Network response was not ok');
             }
 
-            const data = await response.json();
-            resultsDiv.innerHTML = '';
-            
-            for (const role in data) {
-                const roleHeader = document.createElement('h3');
-                roleHeader.textContent = `▶ ${role}`;
-                resultsDiv.appendChild(roleHeader);
-
-                if (data[role].length === 0) {
-                    const noResults = document.createElement('p');
-                    noResults.textContent = '- (결과 없음)';
-                    resultsDiv.appendChild(noResults);
-                } else {
-                    data[role].forEach(job => {
-                        const jobItem = document.createElement('div');
-                        jobItem.classList.add('job-result-item');
-                        jobItem.innerHTML = `
-                            <h4>${job.title || '(제목 없음)'}</h4>
-                            <p>🔗 <a href="${job.url}" target="_blank">링크</a></p>
-                        `;
-                        resultsDiv.appendChild(jobItem);
+            // SSE 파싱: 빈 줄로 구분된 "event: ...\ndata: ..." 블록
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                let sep;
+                while ((sep = buffer.indexOf('\n\n')) >= 0) {
+                    const block = buffer.slice(0, sep);
+                    buffer = buffer.slice(sep + 2);
+                    let event = 'message';
+                    let data = '';
+                    block.split('\n').forEach(line => {
+                        if (line.startsWith('event: ')) event = line.slice(7);
+                        else if (line.startsWith('data: ')) data += line.slice(6);
                     });
+                    handleEvent(event, data ? JSON.parse(data) : null);
                 }
             }
         } catch (error) {
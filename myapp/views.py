@@ -1,11 +1,13 @@
 import json
 import re
 import asyncio
+import queue
+import threading
 from typing import Annotated, TypedDict
 import pandas as pd
 from sqlalchemy import create_engine, text
 from django.shortcuts import render
-from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseServerError
+from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseServerError, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 import traceback
 
@@ -19,8 +21,8 @@ from langgraph.graph.message import add_messages
 # main.py에서 가져온 외부 의존 모듈
 # 실제 프로젝트 구조에 맞게 임포트 경로를 수정해야 합니다.
 from jobkorea_cli.models import Spec
-from jobkorea_cli.llm import parse_spec, map_filters
-from jobkorea_cli.cli import crawl_by_roles_multi
+from jobkorea_cli.pipeline import speculative_search, iter_speculative_search
+from jobkorea_cli.http_fetch import aclose_clients
 
 # -------- 모델 및 DB 연결 -----------
 # 이 부분은 서버가 시작될 때 한 번만 연결되도록 전역 변수로 설정하는 것이 좋습니다.
@@ -161,6 +163,69 @@ def upsert_ideal_to_db(engine, company_name, keywords, summary, language='ko'):
     except Exception as e:
         print(f"DB upsert error: {e}")
 
+# --- 검색 결과 직렬화/스트리밍 헬퍼 ---
+
+def _doc_to_dict(d):
+    return {'title': d.title, 'url': d.url, 'company': d.company,
+            'location': d.location, 'deadline': d.deadline}
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _iter_async(agen_factory):
+    """
+    비동기 제너레이터를 WSGI용 동기 이터레이터로 변환.
+    별도 스레드의 asyncio.run에서 돌리고, 항목은 큐로 넘겨받아 즉시 흘려보냄.
+    클라이언트가 끊겨 Django가 이 제너레이터를 닫으면(GeneratorExit) 수집 태스크를 취소해
+    브라우저 page/리미터 토큰/저장소 쓰기를 바로 놓게 함.
+    """
+    q = queue.Queue()
+    done = object()
+    started = threading.Event()
+    handle = {}
+
+    def _run():
+        async def _pump():
+            loop, task = asyncio.get_running_loop(), asyncio.current_task()
+            handle['cancel'] = lambda: loop.call_soon_threadsafe(task.cancel)
+            started.set()
+            agen = agen_factory()
+            try:
+                async for item in agen:
+                    q.put(item)
+            finally:
+                await agen.aclose()
+                await aclose_clients()   # 이 스레드의 루프는 곧 버려짐
+        try:
+            asyncio.run(_pump())
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            q.put(e)
+        finally:
+            started.set()
+            q.put(done)
+
+    threading.Thread(target=_run, daemon=True).start()
+    finished = False
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                finished = True
+                return
+            if isinstance(item, Exception):
+                finished = True
+                raise item
+            yield item
+    finally:
+        if not finished:
+            started.wait()
+            try:
+                handle.get('cancel', lambda: None)()
+            except RuntimeError:   # 루프가 이미 닫힘(방금 끝남)
+                pass
+
 # --- Django 뷰 함수 ---
 
 def index(request):
@@ -177,19 +242,18 @@ def search_jobs(request):
                 return HttpResponseBadRequest(json.dumps({'error': 'Spec text is required.'}), content_type="application/json")
             
             async def run_cli_side(text):
-                spec = await parse_spec(text)
-                applied = await map_filters(spec)
-                expanded_roles = applied.get("expanded_roles") or []
-                results = {}
-                if expanded_roles:
-                    results = await crawl_by_roles_multi(expanded_roles, per_role=2)
+                # parse_spec/map_filters를 기다리는 동안 잠정 역할로 크롤을 먼저 시작(pipeline.speculative_search)
+                try:
+                    _, _, results = await speculative_search(text, per_role=2)
+                finally:
+                    await aclose_clients()   # 요청마다 새 루프 → 그 루프의 HTTP 클라이언트를 닫음
                 return results
             
             results = asyncio.run(run_cli_side(user_spec))
             
             serializable_results = {}
             for role, docs in results.items():
-                serializable_results[role] = [{'title': d.title, 'url': d.url} for d in docs]
+                serializable_results[role] = [_doc_to_dict(d) for d in docs]
             
             return JsonResponse(serializable_results)
         except json.JSONDecodeError:
@@ -202,6 +266,54 @@ def search_jobs(request):
             return HttpResponseServerError(json.dumps({'error': str(e)}), content_type="application/json")
     return HttpResponseBadRequest(json.dumps({'error': 'Only POST method is allowed.'}), content_type="application/json")
 
+@csrf_exempt
+def search_jobs_stream(request):
+    """
+    search_jobs의 스트리밍 버전 (Server-Sent Events). search_jobs와 같은 pipeline(추측 크롤 + 랭킹)을 씀.
+    - role: 역할이 확정되는 즉시(스트리밍 map_filters) — 화면에 역할 섹션을 먼저 그리도록
+    - posting: 확정된 역할의 공고가 수집될 때마다 {role, ...공고}
+    - roles: LLM이 끝난 뒤 최종 expanded_roles
+    - done: {results: {role: [공고, ...]}} — search_jobs 응답과 같은 최종 순서(랭킹 반영)
+    - error
+    """
+    if request.method != 'POST':
+        return HttpResponseBadRequest(json.dumps({'error': 'Only POST method is allowed.'}), content_type="application/json")
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return HttpResponseBadRequest(json.dumps({'error': 'Invalid JSON.'}), content_type="application/json")
+    user_spec = data.get('spec')
+    if not user_spec:
+        return HttpResponseBadRequest(json.dumps({'error': 'Spec text is required.'}), content_type="application/json")
+
+    async def run_cli_side():
+        roles = []
+        async for kind, val in iter_speculative_search(user_spec, per_role=2):
+            if kind == 'role':
+                roles.append(val)
+                yield _sse('role', val)
+            elif kind == 'posting':
+                role, doc = val
+                yield _sse('posting', {'role': role, **_doc_to_dict(doc)})
+            elif kind == 'done':
+                _, applied, results = val
+                yield _sse('roles', applied.get("expanded_roles") or roles)
+                yield _sse('done', {'results': {role: [_doc_to_dict(d) for d in docs]
+                                                for role, docs in results.items()}})
+
+    def events():
+        try:
+            yield from _iter_async(run_cli_side)
+        except Exception as e:
+            tb = traceback.format_exc()
+            print("오류 발생 | Exception\n", tb)
+            yield _sse('error', {'error': str(e)})
+
+    resp = StreamingHttpResponse(events(), content_type='text/event-stream')
+    resp['Cache-Control'] = 'no-cache'
+    resp['X-Accel-Buffering'] = 'no'   # nginx 버퍼링 끄기
+    return resp
+
 # --- 새로운 뷰 함수: 회사 정보 및 자소서 문항 로드 ---
 @csrf_exempt
 def get_company_info(request):